@@ -0,0 +1,414 @@
+"""
+The crawl benchmark runs JASA, JSLHR and JPhon crawls end to end against a local server.
+
+Pages are served from a fixtures directory with a configurable latency and bandwidth,
+so the numbers only depend on the scraper and can be compared between commits:
+
+    python benchmarks/crawl.py --latency-ms 50 --bandwidth-kbps 2000 JASA:150 JSLHR:64 JPhon:110
+
+Fixtures are recorded from the real journals with `--record` (this needs network access):
+
+    python benchmarks/crawl.py --record --fixtures benchmarks/fixtures/crawl JPhon:110
+
+Without recorded fixtures, a synthetic site with pages of a similar size is served.
+The JSON report has the papers per second, the request latency (including the wait for
+a scheduler slot), the parse time per page and the peak RSS of the crawling process.
+`peak_rss_kb` does not include the workers of `--pool process`: `worker_peak_rss_kb` is the
+peak RSS of the largest child process that exited, i.e. of the largest worker, so the crawl
+used at most `peak_rss_kb` plus that much per worker.
+"""
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import resource
+import tempfile
+import statistics
+import multiprocessing
+from pathlib import Path
+from functools import partial
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+# the benchmark runs from a checkout, without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiohttp import web
+from usgscraper import JASA, JSLHR, JPhon, Crawl
+from usgscraper.downloader.discovery import INDEXES
+from usgscraper.downloader.jphon_downloader import SingleJSONStrategy
+from usgscraper.parser.pool import ParsePool, set_parse_pool
+from usgscraper.util.metrics import get_stats
+from usgscraper.transport import (
+    HTTPResponse,
+    Scheduler,
+    Transport,
+    TransportConfig,
+    set_transport,
+)
+
+
+JOURNALS = {"JASA": JASA, "JSLHR": JSLHR, "JPhon": JPhon}
+
+
+# --------------------------------------------------------------------
+# fixtures
+
+
+class Fixtures:
+    """
+    The Fixtures object keeps recorded pages in a directory, one file per page and an
+    `index.json` mapping every url to its file and content type.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        index = self.path / "index.json"
+        self.index = json.loads(index.read_text()) if index.exists() else {}
+
+    def add(self, url: str, content: bytes, content_type: str = "text/html; charset=utf-8") -> None:
+        name = hashlib.sha1(url.encode()).hexdigest() + ".html"
+        (self.path / name).write_bytes(content)
+        self.index[url] = {"file": name, "content_type": content_type}
+
+    def get(self, url: str) -> Optional[tuple[bytes, str]]:
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        return (self.path / entry["file"]).read_bytes(), entry["content_type"]
+
+    def save(self) -> None:
+        (self.path / "index.json").write_text(json.dumps(self.index, indent=1))
+
+
+def chrome(size: int) -> str:
+    """The chrome function creates about `size` bytes of navigation around the content of a page."""
+    block = '<div class="nav"><a href="/link">link</a><p>' + "text " * 20 + "</p></div>"
+    return block * max(size // len(block), 1)
+
+
+def synthetic_site(fixtures: Fixtures, specs: list, papers: int, page_size: int) -> None:
+    """The synthetic_site function writes table of contents, index and article pages for `specs`
+    in the markup the scrapers expect.
+    """
+    padding = chrome(page_size)
+    for journal, volume, issue in specs:
+        issues = [issue] if issue else INDEXES[journal].fallback(volume)
+        fixtures.add(
+            INDEXES[journal].index_url(volume),
+            "".join(f'<a href="{toc_path(journal, volume, issue)}">' for issue in issues).encode(),
+        )
+        for issue in issues:
+            if journal == "JASA":
+                cards = "".join(
+                    f'<section class="card"><span class="hlFld-Title">Paper {volume}-{issue}-{n}</span>'
+                    f'<div class="open-access item-access">Full October 2021</div>'
+                    f'<div class="meta-article"><a>https://doi.org/10.1121/10.{volume}{issue}{n}</a></div>'
+                    f'<div class="entryAuthor"><span class="hlFld-ContribAuthor">Author {n}</span></div></section>'
+                    for n in range(papers)
+                )
+                page = f'<html><body>{padding}<div class="sub-section">{cards}</div>{padding}</body></html>'
+                fixtures.add(toc_url(journal, volume, issue), page.encode())
+                for n in range(papers):
+                    article = (
+                        f'<html><body>{padding[: page_size // 4]}<div class="abstractSection"><p>{"abstract " * 100}</p></div>'
+                        f'<ul class="topicTags"><li><a>Ultrasound</a></li><li><a>Tongue</a></li></ul>{padding}</body></html>'
+                    )
+                    fixtures.add(f"https://asa.scitation.org/doi/full/10.1121/10.{volume}{issue}{n}", article.encode())
+            if journal == "JSLHR":
+                items = "".join(
+                    f'<div class="issue-item"><div class="issue-item__header">Research Article 1 Jan 2021</div>'
+                    f'<div class="issue-item__title">Paper {volume}-{issue}-{n}</div>'
+                    f'<div class="issue-item__authors"><ul><li><a title="Author {n}">Author {n}</a></li></ul></div>'
+                    f'<div class="accordion__content card--shadow">{"abstract " * 100}</div></div>'
+                    for n in range(papers)
+                )
+                page = f'<html><body>{padding}<div class="titled_issues">{items}</div>{padding}</body></html>'
+                fixtures.add(toc_url(journal, volume, issue), page.encode())
+            if journal == "JPhon":
+                articles = []
+                for n in range(papers):
+                    href = f"/science/article/pii/S{volume:04d}{issue or 0:02d}{n:04d}"
+                    articles.append(
+                        {
+                            "title": f"Paper {volume}-{issue}-{n}",
+                            "coverDateText": "September 2021",
+                            "authors": [{"id": "auth-0", "givenName": "Author", "surname": str(n)}],
+                            "href": href,
+                        }
+                    )
+                    article = (
+                        f'<html><body>{padding[: page_size // 4]}<div id="abstracts"><h2>Abstract</h2>'
+                        f'<p>{"abstract " * 100}</p></div><div class="keywords-section"><h2>Keywords</h2>'
+                        f"<div>tongue</div><div>ultrasound</div></div>{padding}</body></html>"
+                    )
+                    fixtures.add(f"https://www.sciencedirect.com{href}", article.encode())
+                data = json.dumps({"articles": {"ihp": {"data": {"issueBody": {"includeItem": articles}}}}})
+                page = f'<html><body>{padding}<script type="application/json">{data}</script></body></html>'
+                fixtures.add(toc_url(journal, volume, issue), page.encode())
+    fixtures.save()
+
+
+def toc_path(journal: str, volume: int, issue: Optional[int]) -> str:
+    """The toc_path function creates the path of a table of contents page, as linked from an index."""
+    return urlsplit(toc_url(journal, volume, issue)).path
+
+
+def toc_url(journal: str, volume: int, issue: Optional[int]) -> str:
+    """The toc_url function creates the table of contents url the scrapers request."""
+    if journal == "JASA":
+        return f"https://asa.scitation.org/toc/jas/{volume}/{issue}?size=all"
+    if journal == "JSLHR":
+        return f"https://pubs.asha.org/toc/jslhr/{volume}/{issue}"
+    return SingleJSONStrategy(volume=volume, issue=issue).create_url(issue)
+
+
+# --------------------------------------------------------------------
+# server
+
+
+def serve(path: Path, latency: float, bandwidth: float, connection) -> None:
+    """The serve function serves the fixtures at `path` on a free local port, which it sends
+    through `connection`. Every response waits `latency` seconds and is sent at `bandwidth`
+    bytes per second, or at once if `bandwidth` is 0.
+    """
+    fixtures = Fixtures(path)
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        url = "https://" + request.path.lstrip("/")
+        if request.query_string:
+            url += "?" + request.query_string
+        await asyncio.sleep(latency)
+        page = fixtures.get(url)
+        if page is None:
+            return web.Response(status=404)
+        content, content_type = page
+        response = web.StreamResponse(headers={"content-type": content_type})
+        response.content_length = len(content)
+        await response.prepare(request)
+        chunk_size = 16384
+        for start in range(0, len(content), chunk_size):
+            chunk = content[start : start + chunk_size]
+            await response.write(chunk)
+            if bandwidth:
+                await asyncio.sleep(len(chunk) / bandwidth)
+        await response.write_eof()
+        return response
+
+    async def main() -> None:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        connection.send(site._server.sockets[0].getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+# --------------------------------------------------------------------
+# instrumentation
+
+
+class ReplayTransport(Transport):
+    """
+    The ReplayTransport object sends every request to the local server, keeping the original
+    host in the path, and records the latency of every request.
+    """
+
+    def __init__(self, base_url: Optional[str], *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.base_url = base_url
+        self.latencies: list[float] = []
+
+    def route(self, url: str) -> str:
+        if self.base_url is None:
+            return url
+        return f"{self.base_url}/{url.split('://', 1)[1]}"
+
+    async def timed(self, request: Callable, url: str, *args, **kwargs) -> HTTPResponse:
+        start = time.perf_counter()
+        try:
+            return await request(self.route(url), *args, **kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def aget(self, url: str, *args, **kwargs) -> HTTPResponse:
+        return await self.timed(super().aget, url, *args, **kwargs)
+
+    async def astream(self, url: str, *args, **kwargs) -> HTTPResponse:
+        return await self.timed(super().astream, url, *args, **kwargs)
+
+
+class RecordingTransport(ReplayTransport):
+    """
+    The RecordingTransport object fetches the real pages and stores them as fixtures.
+
+    A streamed page is stored as far as it was read, which is all the scrapers need of it.
+    """
+
+    def __init__(self, fixtures: Fixtures, *args, **kwargs) -> None:
+        super().__init__(None, *args, **kwargs)
+        self.fixtures = fixtures
+
+    async def timed(self, request: Callable, url: str, *args, **kwargs) -> HTTPResponse:
+        response = await super().timed(request, url, *args, **kwargs)
+        if response.status == 200:
+            self.fixtures.add(
+                url, response.content, response.headers.get("content-type", "text/html")
+            )
+        return response
+
+
+def timed(func: Callable, *args: Any) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+class TimedParsePool(ParsePool):
+    """
+    The TimedParsePool object records how long every page takes to parse inside the pool.
+
+    The page stays the first argument of the pool, so the `parse` stage still counts its bytes.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.durations: list[float] = []
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        duration, result = await super().run(partial(timed, func), *args)
+        self.durations.append(duration)
+        return result
+
+
+# --------------------------------------------------------------------
+# benchmark
+
+
+def parse_spec(spec: str) -> tuple[str, int, Optional[int]]:
+    """The parse_spec function reads a `JOURNAL:VOLUME[:ISSUE]` argument."""
+    journal, volume, *issue = spec.split(":")
+    if journal not in JOURNALS:
+        raise argparse.ArgumentTypeError(f"unknown journal {journal!r}")
+    return journal, int(volume), int(issue[0]) if issue else None
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def milliseconds(values: list[float]) -> dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": round(statistics.mean(values) * 1000, 3) if values else 0.0,
+        "p50": round(percentile(values, 0.5) * 1000, 3),
+        "p99": round(percentile(values, 0.99) * 1000, 3),
+    }
+
+
+def crawl(
+    specs: list, transport: ReplayTransport, pool: TimedParsePool, enrich: bool = False
+) -> dict[str, Any]:
+    """The crawl function scrapes every spec in one crawl and measures it."""
+    set_transport(transport)
+    set_parse_pool(pool)
+    scrapers = [JOURNALS[journal](volume=volume, issue=issue) for journal, volume, issue in specs]
+    for scraper in scrapers:
+        if enrich and isinstance(scraper, JASA):
+            scraper.enrich = True
+    start, papers = time.perf_counter(), 0
+    for result in Crawl(scrapers):
+        papers += len(result.papers)
+    seconds = time.perf_counter() - start
+    # the workers must have exited to be counted in RUSAGE_CHILDREN, unlike the running server
+    pool.shutdown()
+    return {
+        "papers": papers,
+        "seconds": round(seconds, 3),
+        "papers_per_s": round(papers / seconds, 2) if seconds else 0.0,
+        "request_ms": milliseconds(transport.latencies),
+        "parse_ms": milliseconds(pool.durations),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "worker_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        "stages": get_stats().snapshot(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("specs", nargs="+", type=parse_spec, metavar="JOURNAL:VOLUME[:ISSUE]")
+    parser.add_argument("--fixtures", type=Path)
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--bandwidth-kbps", type=float, default=0.0, help="0 for unlimited")
+    parser.add_argument("--papers", type=int, default=30, help="papers per synthetic issue")
+    parser.add_argument("--page-kb", type=int, default=100, help="size of a synthetic page")
+    parser.add_argument("--per-host", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=1e6, help="requests per second per host")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread")
+    parser.add_argument("--enrich", action="store_true", help="download the JASA article pages")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    config = TransportConfig(pool_size_per_host=args.per_host)
+    scheduler = Scheduler(max_per_host=args.per_host, rate_per_host=args.rate, burst=args.rate)
+    pool = TimedParsePool(kind=args.pool)
+
+    if args.record:
+        if args.fixtures is None:
+            parser.error("--record needs --fixtures")
+        fixtures = Fixtures(args.fixtures)
+        result = crawl(
+            args.specs, RecordingTransport(fixtures, config, scheduler=scheduler), pool, args.enrich
+        )
+        fixtures.save()
+        print(json.dumps({"recorded": len(fixtures.index), **result}, indent=2))
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.fixtures
+        if path is None:
+            path = Path(directory)
+            synthetic_site(Fixtures(path), args.specs, args.papers, args.page_kb * 1024)
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        server = multiprocessing.Process(
+            target=serve,
+            args=(path, args.latency_ms / 1000, args.bandwidth_kbps * 1024, sender),
+            daemon=True,
+        )
+        server.start()
+        try:
+            base_url = f"http://127.0.0.1:{receiver.recv()}"
+            transport = ReplayTransport(base_url, config, scheduler=scheduler)
+            result = crawl(args.specs, transport, pool, args.enrich)
+        finally:
+            server.terminate()
+            server.join()
+
+    report = {
+        "specs": [":".join(str(part) for part in spec if part) for spec in args.specs],
+        "fixtures": str(args.fixtures) if args.fixtures else "synthetic",
+        "latency_ms": args.latency_ms,
+        "bandwidth_kbps": args.bandwidth_kbps,
+        "pool": args.pool,
+        **result,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+The import_time benchmark measures the startup cost of `usgscraper` in fresh interpreters.
+
+It fails with a non-zero exit status if importing the package pulls in a heavy dependency
+or if the median import time exceeds the budget, so it can guard against regressions:
+
+    python benchmarks/import_time.py --runs 20 --budget-ms 30
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+
+HEAVY_MODULES = ("aiohttp", "requests", "bs4", "lxml", "pydantic", "fake_useragent")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import usgscraper, usgscraper.downloader, usgscraper.scraper, usgscraper.transport, usgscraper.util
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(runs: int) -> tuple[list[float], set[str]]:
+    """The measure function imports the package in `runs` fresh interpreters.
+
+    Args:
+        runs (int): the number of interpreters to start
+
+    Returns:
+        a tuple of the import times in milliseconds and the heavy modules that were imported
+    """
+    timings, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        timings.append(float(output[0]) * 1000)
+        if len(output) > 1:
+            heavy.update(output[1].split(","))
+    return timings, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    timings, heavy = measure(args.runs)
+    result = {
+        "runs": args.runs,
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "heavy_modules": sorted(heavy),
+    }
+    print(json.dumps(result))
+    return int(bool(heavy) or result["median_ms"] > args.budget_ms)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+The parse_toc benchmark compares a full BeautifulSoup tree with the targeted parsers
+on saved table of contents pages.
+
+Fixture pages are read from `--fixtures`, by default the small pages in `benchmarks/fixtures`,
+named after their journal (`jasa-*.html`, `jslhr-*.html`, `jphon-*.html`). Without fixtures,
+synthetic pages with a large page chrome are used:
+
+    python benchmarks/parse_toc.py --fixtures benchmarks/fixtures --repeat 20
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+# the benchmark runs from a checkout, without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from usgscraper.parser.toc import find_json_script, find_subtree
+from usgscraper.downloader.jasa_downloader import ARTICLE_SECTION
+from usgscraper.downloader.jslhr_downloader import TITLED_ISSUES
+
+
+def full_jasa(html: bytes):
+    return BeautifulSoup(html, "lxml").find("div", class_="sub-section")
+
+
+def full_jslhr(html: bytes):
+    return BeautifulSoup(html, "lxml").find(class_="titled_issues")
+
+
+def full_jphon(html: bytes):
+    script = BeautifulSoup(html, "lxml").find("script", {"type": "application/json"})
+    return json.loads(script.text)
+
+
+PARSERS = {
+    "jasa": (full_jasa, lambda html: find_subtree(html, ARTICLE_SECTION)),
+    "jslhr": (full_jslhr, lambda html: find_subtree(html, TITLED_ISSUES)),
+    "jphon": (full_jphon, find_json_script),
+}
+
+
+def synthetic_pages() -> dict[str, bytes]:
+    """The synthetic_pages function creates pages with a large page chrome around the target element."""
+    chrome = "".join(
+        f'<div class="nav"><a href="/link/{index}">link {index}</a><p>{"text " * 20}</p></div>'
+        for index in range(3000)
+    )
+    card = '<section class="card"><span class="hlFld-Title">Title</span></section>'
+    item = '<div class="issue-item"><div class="issue-item__title">Title</div></div>'
+    articles = json.dumps({"articles": {"ihp": {"data": {"issueBody": {"includeItem": [{"title": "Title"}] * 50}}}}})
+    return {
+        "jasa": f'<html><body>{chrome}<div class="sub-section">{card * 50}</div>{chrome}</body></html>'.encode(),
+        "jslhr": f'<html><body>{chrome}<div class="titled_issues">{item * 50}</div>{chrome}</body></html>'.encode(),
+        "jphon": f'<html><body>{chrome}<script type="application/json">{articles}</script>{chrome}</body></html>'.encode(),
+    }
+
+
+def load_pages(fixtures: Path) -> dict[str, bytes]:
+    """The load_pages function reads the fixture pages, keyed by `<journal>-<name>`."""
+    pages = {}
+    if fixtures.is_dir():
+        for path in sorted(fixtures.glob("*.html")):
+            if path.name.split("-")[0] in PARSERS:
+                pages[path.stem] = path.read_bytes()
+    return pages or synthetic_pages()
+
+
+def measure(parse, html: bytes, repeat: int) -> dict[str, float]:
+    """The measure function times `parse` and records its peak traced memory."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(html)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    parse(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": round(elapsed * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, default=Path(__file__).parent / "fixtures")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for name, html in load_pages(args.fixtures).items():
+        full, fast = PARSERS[name.split("-")[0]]
+        results[name] = {
+            "bytes": len(html),
+            "full": measure(full, html, args.repeat),
+            "fast": measure(fast, html, args.repeat),
+        }
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import json
+import pytest
+from usgscraper.transport import FetchError, HTTPResponse, Transport, set_transport
+from usgscraper.transport import client
+
+
+class FakeTransport(Transport):
+    """
+    The FakeTransport object answers every request from `pages`, and 404 for any other url.
+    A url in `failing` raises FetchError as many times as its count.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pages: dict[str, str] = {}
+        self.requested: list[str] = []
+        self.failing: dict[str, int] = {}
+
+    def respond(self, url: str) -> HTTPResponse:
+        self.requested.append(url)
+        if self.failing.get(url):
+            self.failing[url] -= 1
+            raise FetchError(url, "HTTP 503", 503)
+        if url not in self.pages:
+            return HTTPResponse(url=url, status=404)
+        return HTTPResponse(
+            url=url,
+            status=200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            content=self.pages[url].encode(),
+        )
+
+    def get(self, url, headers=None):
+        return self.respond(url)
+
+    async def aget(self, url, headers=None):
+        return self.respond(url)
+
+    async def astream(self, url, consumer, headers=None, chunk_size=16384):
+        response = self.respond(url)
+        consumer(response.content)
+        return response
+
+
+def jasa_toc_url(volume: int, issue: int) -> str:
+    return f"https://asa.scitation.org/toc/jas/{volume}/{issue}?size=all"
+
+
+def jasa_toc(volume: int, issue: int, papers: int) -> str:
+    """The jasa_toc function creates a JASA table of contents page with `papers` papers."""
+    cards = "".join(
+        f'<section class="card"><span class="hlFld-Title">Paper {volume}-{issue}-{n}</span>'
+        f'<div class="open-access item-access">Full October 2021</div>'
+        f'<div class="meta-article"><a>https://doi.org/10.1121/10.{volume}{issue}{n}</a></div>'
+        f'<div class="entryAuthor"><span class="hlFld-ContribAuthor">Author {n}</span></div></section>'
+        for n in range(papers)
+    )
+    return f'<html><body><div class="sub-section">{cards}</div></body></html>'
+
+
+def jslhr_toc_url(volume: int, issue: int) -> str:
+    return f"https://pubs.asha.org/toc/jslhr/{volume}/{issue}"
+
+
+def jslhr_toc(volume: int, issue: int, papers: int) -> str:
+    """The jslhr_toc function creates a JSLHR table of contents page with `papers` papers."""
+    items = "".join(
+        f'<div class="issue-item"><div class="issue-item__header">Research Article 10 March 2021</div>'
+        f'<div class="issue-item__title"><a href="/doi/10.1044/{volume}-{issue}-{n}">Study {volume}-{issue}-{n}</a></div>'
+        f'<div class="issue-item__authors"><ul><li><a title="Author {n}">Author {n}</a></li></ul></div>'
+        f'<div class="accordion__content card--shadow">Abstract {n}</div></div>'
+        for n in range(papers)
+    )
+    return f'<html><body><div class="titled_issues">{items}</div></body></html>'
+
+
+def jphon_issue_url(volume: int) -> str:
+    return f"https://www.sciencedirect.com/journal/journal-of-phonetics/vol/{volume}/suppl/C"
+
+
+def jphon_article_url(volume: int, n: int) -> str:
+    return f"https://www.sciencedirect.com/science/article/pii/S{volume}{n:04d}"
+
+
+def jphon_issue(volume: int, titles: list[str]) -> str:
+    """The jphon_issue function creates a JPhon issue page listing a paper per title."""
+    items = [
+        {
+            "title": title,
+            "coverDateText": "September 2021",
+            "authors": [{"id": f"au{n}", "givenName": "Lisa", "surname": f"Davidson {n}"}],
+            "doi": f"10.1016/j.wocn.{volume}.{n}",
+            "href": jphon_article_url(volume, n).replace("https://www.sciencedirect.com", ""),
+        }
+        for n, title in enumerate(titles)
+    ]
+    payload = json.dumps({"articles": {"ihp": {"data": {"issueBody": {"includeItem": items}}}}})
+    return f'<html><body><script type="application/json">{payload}</script></body></html>'
+
+
+def jphon_article(abstract: str, keywords: list[str]) -> str:
+    """The jphon_article function creates a JPhon article page with an abstract and keywords."""
+    tags = "".join(f'<div class="keyword"><span>{keyword}</span></div>' for keyword in keywords)
+    return (
+        f'<html><body><div id="abstracts"><h2>Abstract</h2><p>{abstract}</p></div>'
+        f'<div class="keywords-section"><h2>Keywords</h2>{tags}</div>'
+        f'<div id="body">{"<p>text</p>" * 50}</div></body></html>'
+    )
+
+
+@pytest.fixture
+def transport(tmp_path, monkeypatch):
+    """The transport fixture serves fake pages from a fresh working directory."""
+    monkeypatch.chdir(tmp_path)
+    previous = client._transport
+    fake = FakeTransport()
+    set_transport(fake)
+    yield fake
+    set_transport(previous)
@@ -0,0 +1,37 @@
+import os
+from usgscraper.transport import HTTPResponse, PageArchive
+
+
+def page(url: str, text: str, **headers: str) -> HTTPResponse:
+    return HTTPResponse(url=url, status=200, headers=headers, content=text.encode())
+
+
+def test_archive_keeps_the_newest_record_across_segments(tmp_path):
+    archive = PageArchive(str(tmp_path), segment_size=64)
+    for n in range(5):
+        archive.put(f"https://example.org/{n}", page(f"https://example.org/{n}", f"page {n}" * 20))
+    archive.put("https://example.org/0", page("https://example.org/0", "page 0 again"))
+    archive.close()
+
+    archive = PageArchive(str(tmp_path), segment_size=64)
+    assert archive.segment > 0
+    assert archive.get("https://example.org/0").content == b"page 0 again"
+    assert archive.get("https://example.org/4").content == b"page 4" * 20
+    assert archive.get("https://example.org/5") is None
+    assert len(list(archive)) == 6
+    archive.close()
+
+
+def test_archive_drops_an_entry_cut_short(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.put("https://example.org/a", page("https://example.org/a", "a"))
+    archive.put("https://example.org/b", page("https://example.org/b", "b"))
+    archive.close()
+    log = archive.file(0, "log")
+    with open(log, "r+b") as file:
+        file.truncate(os.path.getsize(log) - 1)
+
+    archive = PageArchive(str(tmp_path))
+    assert "https://example.org/a" in archive
+    assert "https://example.org/b" not in archive
+    archive.close()
@@ -0,0 +1,68 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from usgscraper.parser.article import SubtreeCollector, has_class, has_id
+from usgscraper.transport import Transport
+
+HEAD = (
+    b'<html><body><div id="abstracts"><p>Abstract Tone contrasts are...</p></div>'
+    b'<div class="keywords-section"><div class="keyword">Tone</div><div class="keyword">Hmong</div></div>'
+)
+FILLER = b"<p>" + b"reference " * 1000 + b"</p>"
+
+
+def collector() -> SubtreeCollector:
+    return SubtreeCollector({"abstract": has_id("abstracts"), "keywords": has_class("keywords-section")})
+
+
+def test_collector_is_done_once_every_element_is_closed():
+    found = collector()
+    assert not found.feed(HEAD[:60])
+    assert found.feed(HEAD[60:] + b"<p>")
+    assert found.feed(FILLER)
+    soup = found.soup()
+    assert soup.find(id="abstracts").text == "Abstract Tone contrasts are..."
+    assert [keyword.text for keyword in soup.find_all(class_="keyword")] == ["Tone", "Hmong"]
+
+
+def test_collector_keeps_what_it_found_at_the_end_of_the_page():
+    found = collector()
+    assert not found.feed(b'<html><body><div id="abstracts">Short</div>')
+    soup = found.soup()
+    assert soup.find(id="abstracts").text == "Short"
+    assert soup.find(class_="keywords-section") is None
+
+
+def test_astream_stops_reading_once_the_consumer_is_satisfied():
+    async def article(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"content-type": "text/html"})
+        await response.prepare(request)
+        try:
+            await response.write(HEAD)
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                await response.write(FILLER)
+            await response.write_eof()
+        except ConnectionResetError:
+            pass
+        return response
+
+    app = web.Application()
+    app.router.add_get("/article", article)
+    transport = Transport()
+
+    async def main():
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            found = collector()
+            response = await transport.astream(str(server.make_url("/article")), found.feed)
+            return found, response
+        finally:
+            await server.close()
+
+    found, response = transport.run(main())
+    assert found.done
+    assert response.status == 200
+    assert response.content.startswith(HEAD)
+    assert len(response.content) < len(HEAD) + 10 * len(FILLER)
@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from usgscraper.scraper import JASA, JSLHR
+from conftest import jasa_toc, jasa_toc_url, jslhr_toc, jslhr_toc_url
+
+
+async def collect(papers):
+    return [paper async for paper in papers]
+
+
+def test_journals_are_scraped_concurrently_on_the_callers_loop(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jslhr_toc_url(64, 1)] = jslhr_toc(64, 1, 2)
+
+    async def main():
+        return await asyncio.gather(
+            collect(JASA(volume=150, issue=1).aiter_papers()),
+            collect(JSLHR(volume=64, issue=1).aiter_papers()),
+        )
+
+    jasa, jslhr = asyncio.run(main())
+    assert jasa == list(JASA(volume=150, issue=1).extract_data())
+    assert [paper["title"] for paper in jslhr] == ["Study 64-1-0", "Study 64-1-1"]
+
+
+def test_a_crawl_yields_its_papers_asynchronously(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(150, 2)] = jasa_toc(150, 2, 2)
+    crawl = JASA.range(150, 151)
+    titles = {paper["title"] for paper in asyncio.run(collect(crawl.aiter_papers()))}
+    assert titles == {f"Paper 150-1-{n}" for n in range(3)} | {f"Paper 150-2-{n}" for n in range(2)}
+
+
+def test_the_synchronous_api_refuses_to_run_inside_an_event_loop(transport):
+    async def main():
+        list(JASA(volume=150, issue=1).extract_data())
+
+    with pytest.raises(RuntimeError, match="async for"):
+        asyncio.run(main())
@@ -0,0 +1,106 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from usgscraper.parser.article import SubtreeCollector, has_id
+from usgscraper.transport import HTTPResponse, ResponseCache, Transport
+
+HEAD = b'<html><body><div id="abstracts"><p>Abstract Tone contrasts are...</p></div>'
+FILLER = b"<p>" + b"reference " * 1000 + b"</p>"
+
+
+def page(url: str, text: str, **headers: str) -> HTTPResponse:
+    return HTTPResponse(url=url, status=200, headers=headers, content=text.encode())
+
+
+def test_cache_revalidates_with_conditional_headers(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0)
+    cache.store("https://example.org/toc", page("https://example.org/toc", "toc", etag='"1"'))
+    cached = cache.get("https://example.org/toc")
+    assert cached.response.content == b"toc"
+    assert not cached.is_fresh(cache.ttl)
+    assert cached.conditional_headers == {"if-none-match": '"1"'}
+    assert cache.get("https://example.org/other") is None
+    cache.close()
+
+
+def test_cache_evicts_the_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size=10)
+    cache.store("https://example.org/a", page("https://example.org/a", "aaaa"))
+    cache.store("https://example.org/b", page("https://example.org/b", "bbbb"))
+    cache.get("https://example.org/a")
+    cache.store("https://example.org/c", page("https://example.org/c", "cccc"))
+    assert cache.get("https://example.org/b") is None
+    assert cache.get("https://example.org/a") is not None
+    assert cache.get("https://example.org/c") is not None
+    cache.close()
+
+
+def test_a_stale_page_is_revalidated_by_the_transport(tmp_path):
+    answers = []
+
+    async def toc(request: web.Request) -> web.Response:
+        if request.headers.get("if-none-match") == '"1"':
+            answers.append(304)
+            return web.Response(status=304, headers={"etag": '"1"'})
+        answers.append(200)
+        return web.Response(text="toc", content_type="text/html", headers={"etag": '"1"'})
+
+    app = web.Application()
+    app.router.add_get("/toc", toc)
+    transport = Transport(cache=ResponseCache(str(tmp_path), ttl=0))
+
+    async def main():
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            url = str(server.make_url("/toc"))
+            return [await transport.aget(url) for _ in range(2)]
+        finally:
+            await server.close()
+
+    responses = transport.run(main())
+    assert answers == [200, 304]
+    assert [(response.status, response.content) for response in responses] == [(200, b"toc")] * 2
+    transport.close()
+
+
+def test_a_page_streamed_in_part_is_cached_for_streams_only(tmp_path):
+    answers = []
+
+    async def article(request: web.Request) -> web.StreamResponse:
+        answers.append(request.path)
+        response = web.StreamResponse(headers={"content-type": "text/html"})
+        await response.prepare(request)
+        try:
+            await response.write(HEAD)
+            for _ in range(20):
+                await asyncio.sleep(0.01)
+                await response.write(FILLER)
+            await response.write_eof()
+        except ConnectionResetError:
+            pass
+        return response
+
+    app = web.Application()
+    app.router.add_get("/article", article)
+    transport = Transport(cache=ResponseCache(str(tmp_path), ttl=None))
+
+    async def main():
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            url = str(server.make_url("/article"))
+            streamed = []
+            for _ in range(2):
+                found = SubtreeCollector({"abstract": has_id("abstracts")})
+                await transport.astream(url, found.feed)
+                streamed.append(found)
+            return streamed, await transport.aget(url)
+        finally:
+            await server.close()
+
+    streamed, response = transport.run(main())
+    assert [found.done for found in streamed] == [True, True]
+    assert len(answers) == 2
+    assert len(response.content) == len(HEAD) + 20 * len(FILLER)
+    transport.close()
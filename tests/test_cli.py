@@ -0,0 +1,47 @@
+import sqlite3
+import pytest
+import usgscraper.__main__ as cli
+from conftest import jasa_toc, jasa_toc_url
+
+
+@pytest.fixture
+def watches(transport, monkeypatch):
+    """The watches fixture runs the CLI on the fake transport and collects the watches it creates."""
+    created = []
+
+    class RecordingWatch(cli.Watch):
+        def __post_init__(self) -> None:
+            super().__post_init__()
+            created.append(self)
+
+    monkeypatch.setattr(cli, "set_transport", lambda transport: None)
+    monkeypatch.setattr(cli, "Watch", RecordingWatch)
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    return created
+
+
+def closed(watch) -> bool:
+    try:
+        watch.connection.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_watch_is_closed(watches, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["usgscraper", "JASA:150:1", "--watch", "watch.sqlite", "--quiet"])
+    cli.main()
+    assert len(watches) == 1 and closed(watches[0])
+    with sqlite3.connect("watch.sqlite") as connection:
+        assert connection.execute("SELECT volume, issue FROM latest").fetchall() == [(150, 1)]
+
+
+def test_watch_is_closed_when_interrupted(watches, transport, monkeypatch):
+    def interrupt(coroutine):
+        coroutine.close()
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(transport, "run", interrupt)
+    monkeypatch.setattr("sys.argv", ["usgscraper", "JASA:150:1", "--watch", "watch.sqlite", "--quiet"])
+    assert cli.main() == 130
+    assert len(watches) == 1 and closed(watches[0])
@@ -0,0 +1,36 @@
+from usgscraper.scraper import JASA
+from usgscraper.transport import HTTPResponse, Transport, get_transport, set_transport
+from conftest import FakeTransport, jasa_toc, jasa_toc_url
+
+
+def test_transport_is_shared_until_replaced(transport):
+    assert get_transport() is transport
+    other = FakeTransport()
+    set_transport(other)
+    assert get_transport() is other
+
+
+def test_downloaders_fetch_through_the_shared_transport(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    papers = list(JASA(volume=150, issue=1).extract_data())
+    assert [paper["title"] for paper in papers] == ["Paper 150-1-0", "Paper 150-1-1", "Paper 150-1-2"]
+    assert transport.requested == [jasa_toc_url(150, 1)]
+
+
+def test_one_session_per_event_loop_closed_by_run():
+    transport = Transport()
+
+    async def sessions():
+        return await transport.async_session(), await transport.async_session()
+
+    first, second = transport.run(sessions())
+    assert first is second
+    assert first.closed
+    assert transport.run(transport.async_session()) is not first
+
+
+def test_response_text_is_decoded_with_its_charset():
+    content = "Phonétique".encode("latin-1")
+    response = HTTPResponse("https://example.org", 200, {"content-type": "text/html; charset=latin-1"}, content)
+    assert response.text == "Phonétique"
+    assert HTTPResponse("https://example.org", 200, {}, "Phonétique".encode()).text == "Phonétique"
@@ -0,0 +1,98 @@
+import os
+import gzip
+import json
+import sqlite3
+import pytest
+from usgscraper import JASA, JPhon
+from usgscraper.util import converter
+from usgscraper.util.converter import jsonify, jsonlify
+from usgscraper.util.seen import SeenIndex
+from conftest import (
+    jasa_toc,
+    jasa_toc_url,
+    jphon_article,
+    jphon_article_url,
+    jphon_issue,
+    jphon_issue_url,
+)
+
+
+def test_jsonify_append_keeps_existing_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jsonify("JASA", 150, 1, [{"title": "a"}])
+    jsonify("JASA", 150, 1, iter([{"title": "b"}]), append=True)
+    with open("JASA - 150 - 1.json", encoding="utf-8") as file:
+        assert json.load(file) == [{"title": "a"}, {"title": "b"}]
+
+
+def test_an_interrupted_append_keeps_the_earlier_file(transport):
+    def interrupted():
+        yield {"title": "b"}
+        raise KeyboardInterrupt
+
+    jsonify("JASA", 150, 1, [{"title": "a"}])
+    with pytest.raises(KeyboardInterrupt):
+        jsonify("JASA", 150, 1, interrupted(), append=True)
+    with open("JASA - 150 - 1.json", encoding="utf-8") as file:
+        assert json.load(file) == [{"title": "a"}]
+    assert os.listdir() == ["JASA - 150 - 1.json"]
+
+
+def test_papers_of_an_interrupted_write_are_not_marked_seen(transport, monkeypatch):
+    def interrupt(*args):
+        raise KeyboardInterrupt
+
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    seen = SeenIndex("seen.sqlite")
+    JASA(volume=150, issue=1, seen=seen).to_json()
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 5)
+    with monkeypatch.context() as patch:
+        patch.setattr(converter.os, "replace", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            JASA(volume=150, issue=1, seen=seen).to_json()
+    JASA(volume=150, issue=1, seen=seen).to_json()
+    with open("JASA - 150 - 1.json", encoding="utf-8") as file:
+        assert [paper["title"] for paper in json.load(file)] == [f"Paper 150-1-{n}" for n in range(5)]
+    seen.close()
+
+
+def test_jsonlify_append_to_compressed_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jsonlify("JASA", 150, 1, [{"title": "a"}], compress=True)
+    jsonlify("JASA", 150, 1, [{"title": "b"}], compress=True, append=True)
+    with gzip.open("JASA - 150 - 1.jsonl.gz", "rt", encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == [{"title": "a"}, {"title": "b"}]
+
+
+def test_to_sqlite_positional_path(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    JASA(volume=150, issue=1).to_sqlite("other.sqlite")
+    assert not os.path.exists("papers.sqlite")
+    connection = sqlite3.connect("other.sqlite")
+    assert connection.execute("SELECT COUNT(*) FROM papers").fetchone() == (3,)
+    connection.close()
+
+
+def test_to_sqlite_run_again_replaces_papers_by_their_doi(transport):
+    transport.pages[jphon_issue_url(100)] = jphon_issue(100, ["Erratum", "Erratum"])
+    for n in range(2):
+        transport.pages[jphon_article_url(100, n)] = jphon_article(f"Abstract {n}", ["Tone"])
+    JPhon(volume=100).to_sqlite()
+    JPhon(volume=100).to_sqlite()
+    connection = sqlite3.connect("papers.sqlite")
+    assert connection.execute("SELECT COUNT(*) FROM papers").fetchone() == (2,)
+    assert connection.execute("SELECT COUNT(*) FROM papers WHERE key IS NULL").fetchone() == (0,)
+    connection.close()
+
+
+def test_to_jsonl_positional_compress(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    JASA(volume=150, issue=1).to_jsonl(True, 1)
+    assert not os.path.exists("JASA - 150 - 1.jsonl")
+    with gzip.open("JASA - 150 - 1.jsonl.gz", "rt", encoding="utf-8") as file:
+        assert len(file.readlines()) == 3
+
+
+def test_unknown_argument_is_rejected(transport):
+    with pytest.raises(TypeError):
+        JASA(volume=150, issue=1).to_jsonl(compres=True)
@@ -0,0 +1,60 @@
+import json
+import asyncio
+import pytest
+from usgscraper.scraper import JASA, JSLHR, Crawl
+from usgscraper.util.loop import iterate
+from conftest import jasa_toc, jasa_toc_url, jslhr_toc, jslhr_toc_url
+
+
+def test_a_range_crawls_every_volume_of_every_journal(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(151, 2)] = jasa_toc(151, 2, 2)
+    transport.pages[jslhr_toc_url(64, 1)] = jslhr_toc(64, 1, 2)
+    crawl = JASA.range(150, 152) + JSLHR.range(64, 65)
+    assert isinstance(crawl, Crawl)
+    assert [(scraper.__class__.__name__, scraper.volume) for scraper in crawl.scrapers] == [
+        ("JASA", 150),
+        ("JASA", 151),
+        ("JSLHR", 64),
+    ]
+    found = {
+        (result.journal, result.volume, result.issue): [paper["title"] for paper in result.papers]
+        for result in crawl
+        if result.papers
+    }
+    assert found == {
+        ("JASA", 150, 1): ["Paper 150-1-0", "Paper 150-1-1", "Paper 150-1-2"],
+        ("JASA", 151, 2): ["Paper 151-2-0", "Paper 151-2-1"],
+        ("JSLHR", 64, 1): ["Study 64-1-0", "Study 64-1-1"],
+    }
+
+
+def test_a_crawl_writes_every_issue_to_its_own_file(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(150, 2)] = jasa_toc(150, 2, 1)
+    JASA.range(150, 151).to_json()
+    for issue, count in ((1, 3), (2, 1)):
+        with open(f"JASA - 150 - {issue}.json", encoding="utf-8") as file:
+            assert len(json.load(file)) == count
+
+
+def test_an_interrupted_step_closes_the_iterator_and_keeps_the_interrupt(transport):
+    closed = []
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    async def results():
+        try:
+            yield 1
+            asyncio.get_running_loop().call_soon(interrupt)
+            await asyncio.sleep(10)
+            yield 2
+        finally:
+            closed.append(True)
+
+    steps = iterate(results())
+    assert next(steps) == 1
+    with pytest.raises(KeyboardInterrupt):
+        next(steps)
+    assert closed == [True]
@@ -0,0 +1,64 @@
+from usgscraper.util.database import PaperDatabase
+
+
+def paper(title, href=None, authors=None):
+    return {
+        "title": title,
+        "published_date": "2021",
+        "authors": authors or {"auth-1": "Author"},
+        "abstract": "an abstract",
+        "href": href,
+    }
+
+
+def count(database, table="papers"):
+    return database.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_papers_with_the_same_title_are_kept(tmp_path):
+    with PaperDatabase(str(tmp_path / "papers.sqlite")) as database:
+        database.insert(
+            "JASA",
+            150,
+            1,
+            [paper("Erratum", "https://doi.org/10.1121/10.1"), paper("Erratum", "https://doi.org/10.1121/10.2")],
+        )
+        database.insert("JSLHR", 64, 1, [paper("no info"), paper("no info")])
+        assert count(database) == 4
+
+
+def test_a_paper_written_again_replaces_its_copy(tmp_path):
+    with PaperDatabase(str(tmp_path / "papers.sqlite")) as database:
+        database.insert("JASA", 150, 1, [paper("Old title", "https://doi.org/10.1121/10.1")])
+        # the same DOI, from another link and with a corrected title
+        database.insert("JASA", 150, 1, [paper("New title", "10.1121/10.1")])
+        assert count(database) == 1
+        assert count(database, "authors") == 1
+        assert [row["title"] for row in database.search("title")] == ["New title"]
+
+
+def test_keys_identify_records_without_href(tmp_path):
+    with PaperDatabase(str(tmp_path / "papers.sqlite")) as database:
+        records = [{"title": "Same", "authors": []}, {"title": "Same", "authors": []}]
+        database.insert("JPhon", 100, None, records, keys=["10.1016/a", "10.1016/b"])
+        database.insert("JPhon", 100, None, records[:1], keys=["10.1016/a"])
+        assert count(database) == 2
+
+
+def test_jslhr_papers_without_title_or_link_are_kept(transport):
+    from usgscraper import Crawl, JSLHR
+
+    items = "".join(
+        f'<div class="issue-item"><div class="issue-item__header">Research Article 1 Jan 2021</div>'
+        f'<div class="issue-item__authors"><ul><li><a title="Author {n}">Author {n}</a></li></ul></div>'
+        f'<div class="accordion__content card--shadow">abstract {n}</div></div>'
+        for n in range(2)
+    )
+    transport.pages["https://pubs.asha.org/toc/jslhr/64/1"] = (
+        f'<html><body><div class="titled_issues">{items}</div></body></html>'
+    )
+    for _ in range(2):
+        Crawl([JSLHR(volume=64, issue=1)]).to_sqlite("papers.sqlite")
+    with PaperDatabase("papers.sqlite") as database:
+        titles = database.connection.execute("SELECT title FROM papers").fetchall()
+        assert titles == [("no info",), ("no info",)]
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from usgscraper.scraper import JASA
+from usgscraper.downloader import discovery
+from usgscraper.downloader.discovery import INDEXES, IssueDiscovery
+from conftest import jasa_toc, jasa_toc_url
+
+JASA_INDEX = INDEXES["JASA"].index_url(150)
+JASA_LINKS = '<a href="/toc/jas/150/1">1</a><a href="/toc/jas/150/2">2</a><a href="/toc/jas/149/6">6</a>'
+
+
+@pytest.fixture
+def issue_discovery(transport, monkeypatch):
+    """The issue_discovery fixture replaces the shared issue discovery with an empty one."""
+    fresh = IssueDiscovery()
+    monkeypatch.setattr(discovery, "_issue_discovery", fresh)
+    return fresh
+
+
+def test_a_crawl_requests_only_the_listed_issues(transport, issue_discovery):
+    assert JASA_INDEX == "https://asa.scitation.org/loi/jas/group/d2020.y2021"
+    transport.pages[JASA_INDEX] = f"<html><body>{JASA_LINKS}</body></html>"
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(150, 2)] = jasa_toc(150, 2, 2)
+    found = {result.issue: len(result.papers) for result in JASA.range(150, 151)}
+    assert found == {1: 3, 2: 2}
+    assert sorted(transport.requested) == sorted([JASA_INDEX, jasa_toc_url(150, 1), jasa_toc_url(150, 2)])
+
+
+def test_an_index_page_is_requested_once_per_loop(transport, issue_discovery):
+    transport.pages[JASA_INDEX] = f"<html><body>{JASA_LINKS}</body></html>"
+
+    async def discover():
+        return await asyncio.gather(*(issue_discovery.issues("JASA", 150) for _ in range(3)))
+
+    assert asyncio.run(discover()) == [[1, 2]] * 3
+    assert transport.requested == [JASA_INDEX]
+
+
+def test_an_unreadable_index_falls_back_to_the_usual_issues(transport, issue_discovery):
+    assert asyncio.run(issue_discovery.issues("JSLHR", 64)) == [*range(1, 13)]
+    assert asyncio.run(issue_discovery.issues("JPhon", 100)) == [None]
+    assert asyncio.run(issue_discovery.issues("JPhon", 30)) == [*range(1, 7)]
+
+
+def test_jphon_supplements_are_discovered_once(transport, issue_discovery):
+    index = INDEXES["JPhon"].index_url(100)
+    transport.pages[index] = (
+        '<a href="/journal/journal-of-phonetics/vol/100/suppl/C">C</a>'
+        '<a href="/journal/journal-of-phonetics/vol/100/suppl/C#toc">C</a>'
+    )
+    assert asyncio.run(issue_discovery.issues("JPhon", 100)) == [None]
+
+
+def test_discovered_issues_are_kept_in_a_file(transport, tmp_path):
+    transport.pages[JASA_INDEX] = f"<html><body>{JASA_LINKS}</body></html>"
+    path = str(tmp_path / "issues.json")
+    assert asyncio.run(IssueDiscovery(path).issues("JASA", 150)) == [1, 2]
+    transport.requested.clear()
+    assert asyncio.run(IssueDiscovery(path).issues("JASA", 150)) == [1, 2]
+    assert transport.requested == []
+    assert asyncio.run(IssueDiscovery(path, ttl=0).issues("JASA", 150)) == [1, 2]
+    assert transport.requested == [JASA_INDEX]
@@ -0,0 +1,65 @@
+import asyncio
+from usgscraper.scraper import JASA
+from conftest import jasa_toc, jasa_toc_url
+
+
+def jasa_article_url(volume: int, issue: int, n: int) -> str:
+    return f"https://asa.scitation.org/doi/full/10.1121/10.{volume}{issue}{n}"
+
+
+def jasa_article(abstract: str, topics: list[str]) -> str:
+    links = "".join(f'<li><a href="/topic/{topic}">{topic}</a></li>' for topic in topics)
+    return (
+        f'<html><body><div class="abstractSection"><p>{abstract}</p></div>'
+        f'<div class="topicTags"><ul>{links}</ul></div><p>{"reference " * 100}</p></body></html>'
+    )
+
+
+def test_enriched_papers_get_the_abstract_and_topics_of_their_page(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 2)
+    for n in range(2):
+        transport.pages[jasa_article_url(150, 1, n)] = jasa_article(f"Abstract  {n}", ["Speech", f"Tone {n}"])
+    plain = list(JASA(volume=150, issue=1).extract_data())
+    papers = list(JASA(volume=150, issue=1, enrich=True).extract_data())
+    assert papers == [
+        {**paper, "abstract": f"Abstract {n}", "keywords": ["Speech", f"Tone {n}"]}
+        for n, paper in enumerate(plain)
+    ]
+    assert sorted(transport.requested[-2:]) == [jasa_article_url(150, 1, n) for n in range(2)]
+
+
+def test_a_paper_whose_page_fails_is_a_failure_of_its_issue(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    for n in range(3):
+        transport.pages[jasa_article_url(150, 1, n)] = jasa_article(f"Abstract {n}", [])
+    transport.failing[jasa_article_url(150, 1, 2)] = 1
+    result = JASA(volume=150, issue=1, enrich=True).collect()
+    assert [paper["abstract"] for paper in result.papers] == ["Abstract 0", "Abstract 1"]
+    assert [paper["keywords"] for paper in result.papers] == [[], []]
+    [failure] = result.failures
+    assert (failure.issue, failure.url) == (1, jasa_article_url(150, 1, 2))
+
+
+def test_a_paper_without_a_page_has_no_abstract(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 1)
+    [paper] = JASA(volume=150, issue=1, enrich=True).extract_data()
+    assert paper["abstract"] is None and paper["keywords"] == []
+
+
+def test_a_cancelled_paper_is_a_failure_of_its_issue(transport, monkeypatch):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 2)
+    for n in range(2):
+        transport.pages[jasa_article_url(150, 1, n)] = jasa_article(f"Abstract {n}", [])
+    astream = transport.astream
+
+    async def cancel_second(url, consumer, headers=None, chunk_size=16384):
+        if url == jasa_article_url(150, 1, 1):
+            raise asyncio.CancelledError
+        return await astream(url, consumer, headers, chunk_size)
+
+    monkeypatch.setattr(transport, "astream", cancel_second)
+    result = JASA(volume=150, issue=1, enrich=True).collect()
+    assert [paper["abstract"] for paper in result.papers] == ["Abstract 0"]
+    assert [(failure.url, failure.error) for failure in result.failures] == [
+        (jasa_article_url(150, 1, 1), "CancelledError")
+    ]
@@ -0,0 +1,40 @@
+import pickle
+from usgscraper.scraper import JASA, JPhon, ULTRASOUND, match
+from conftest import (
+    jasa_toc,
+    jasa_toc_url,
+    jphon_article,
+    jphon_article_url,
+    jphon_issue,
+    jphon_issue_url,
+)
+
+
+def test_term_filter_searches_nested_fields_ignoring_case():
+    by_author = match("davidson", fields=("title", "authors"))
+    assert by_author({"title": "Tone", "authors": {"auth-1": "Lisa Davidson"}})
+    assert by_author({"title": "Tone", "authors": [{"au1": "Lisa DAVIDSON"}]})
+    assert not by_author({"title": "Tone", "authors": "no author"})
+    assert not match("tone")({"abstract": "tone"})
+    assert ULTRASOUND({"title": "Tongue shape during vowels"})
+    assert pickle.loads(pickle.dumps(by_author)) == by_author
+
+
+def test_jphon_filters_papers_before_their_pages_are_fetched(transport):
+    transport.pages[jphon_issue_url(100)] = jphon_issue(100, ["Vowel duration", "Ultrasound of the tongue root"])
+    for n in range(2):
+        transport.pages[jphon_article_url(100, n)] = jphon_article(f"Abstract {n}", ["Tongue"])
+    papers = list(JPhon(volume=100, filter=ULTRASOUND).extract_data())
+    assert [paper["title"] for paper in papers] == ["Ultrasound of the tongue root"]
+    assert papers[0]["abstract"] == "Abstract 1"
+    assert jphon_article_url(100, 1) in transport.requested
+    assert jphon_article_url(100, 0) not in transport.requested
+
+
+def test_jasa_filters_the_records_of_its_table_of_contents(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    papers = list(JASA(volume=150, issue=1, filter=match("150-1-1")).extract_data())
+    assert [paper["title"] for paper in papers] == ["Paper 150-1-1"]
+    assert papers == [
+        paper for paper in JASA(volume=150, issue=1).extract_data() if paper["title"] == "Paper 150-1-1"
+    ]
@@ -0,0 +1,50 @@
+from usgscraper import JASA
+from usgscraper.worker import JobQueue, Worker
+from usgscraper.worker.jobs import DONE, FAILED
+from conftest import jasa_toc, jasa_toc_url
+
+
+def run(queue):
+    Worker(queue, concurrency=4, poll_interval=0.01).run()
+
+
+def test_a_failing_issue_is_retried(transport, tmp_path):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.failing[jasa_toc_url(150, 1)] = 2
+    queue = JobQueue(str(tmp_path / "queue.sqlite"), max_attempts=3)
+    queue.submit([JASA(volume=150, issue=1)])
+    run(queue)
+    assert queue.counts()[DONE] == 2
+    assert queue.failures() == []
+    assert queue.merge("jsonl") == 1
+    with open("JASA - 150 - 1.jsonl", encoding="utf-8") as file:
+        assert len(file.readlines()) == 3
+
+
+def test_an_issue_fails_once_its_attempts_run_out(transport, tmp_path):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.failing[jasa_toc_url(150, 1)] = 3
+    queue = JobQueue(str(tmp_path / "queue.sqlite"), max_attempts=3)
+    queue.submit([JASA(volume=150, issue=1)])
+    run(queue)
+    assert queue.counts()[FAILED] == 1
+    [failure] = queue.failures()
+    assert (failure.journal, failure.volume, failure.issue) == ("JASA", 150, 1)
+    assert "HTTP 503" in failure.message
+
+
+def test_an_issue_with_a_failed_job_is_merged_once_retried(transport, tmp_path):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.failing[jasa_toc_url(150, 1)] = 3
+    queue = JobQueue(str(tmp_path / "queue.sqlite"), max_attempts=3)
+    queue.submit([JASA(volume=150, issue=1)])
+    run(queue)
+    assert queue.merge("jsonl") == 0
+    assert not (tmp_path / "JASA - 150 - 1.jsonl").exists()
+
+    assert queue.retry() == 1
+    run(queue)
+    assert queue.merge("jsonl") == 1
+    assert queue.merge("jsonl") == 0
+    with open("JASA - 150 - 1.jsonl", encoding="utf-8") as file:
+        assert len(file.readlines()) == 3
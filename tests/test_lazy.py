@@ -0,0 +1,42 @@
+import sys
+import subprocess
+from pathlib import Path
+import pytest
+import usgscraper
+from usgscraper.transport.useragent import USER_AGENTS, user_agent
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("aiohttp", "requests", "bs4", "lxml", "pydantic", "fake_useragent")
+
+
+def imported(code: str) -> list[str]:
+    """The imported function runs `code` in a fresh interpreter and lists the heavy modules it loaded."""
+    probe = f"import sys\n{code}\nprint(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    return output.split(",") if output else []
+
+
+def test_importing_the_packages_loads_no_heavy_module():
+    assert imported(
+        "import usgscraper, usgscraper.downloader, usgscraper.scraper, usgscraper.transport, usgscraper.util"
+    ) == []
+
+
+def test_a_name_loads_its_module_on_first_access():
+    assert "bs4" in imported("from usgscraper import JASA")
+    assert "fake_useragent" not in imported(
+        "from usgscraper.downloader.jasa_downloader import JASADownloader\n"
+        "JASADownloader(volume=150, issue=1).headers"
+    )
+
+
+def test_unknown_names_raise_attribute_error():
+    assert "JASA" in dir(usgscraper)
+    with pytest.raises(AttributeError):
+        usgscraper.JSAS
+
+
+def test_user_agents_come_from_the_local_pool():
+    assert {user_agent() for _ in range(50)} <= set(USER_AGENTS)
@@ -0,0 +1,57 @@
+import json
+import pickle
+import asyncio
+import pytest
+from usgscraper.scraper import JASA
+from usgscraper.util.manifest import FETCHED, PARSED, WRITTEN, Manifest, Unit, checkpoint
+from conftest import jasa_toc, jasa_toc_url
+
+
+def test_a_rerun_does_not_download_parsed_issues_again(transport, tmp_path):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    assert len(list(JASA(volume=150, issue=1, manifest=manifest).extract_data())) == 3
+    assert manifest.state(jasa_toc_url(150, 1)) == PARSED
+
+    transport.requested.clear()
+    JASA(volume=150, issue=1, manifest=manifest).to_json()
+    assert transport.requested == []
+    with open("JASA - 150 - 1.json", encoding="utf-8") as file:
+        assert len(json.load(file)) == 3
+    assert manifest.summary() == {WRITTEN: 1}
+
+
+def test_a_unit_is_fetched_again_until_its_record_is_stored(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    unit = Unit("JASA", 150, 1, jasa_toc_url(150, 1))
+    fetched = []
+
+    async def fetch():
+        fetched.append(unit.url)
+        return "<html></html>"
+
+    async def crash(page):
+        raise KeyboardInterrupt
+
+    async def parse(page):
+        return [{"title": "Tone"}]
+
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(checkpoint(manifest, unit, fetch, crash))
+    assert manifest.state(unit.url) == FETCHED
+    assert manifest.record(unit.url) is None
+    assert asyncio.run(checkpoint(manifest, unit, fetch, parse)) == [{"title": "Tone"}]
+    assert asyncio.run(checkpoint(manifest, unit, fetch, parse)) == [{"title": "Tone"}]
+    assert len(fetched) == 2
+
+    manifest.mark_written("JASA", 150, 1)
+    assert manifest.state(unit.url) == WRITTEN
+    assert manifest.record(unit.url) == [{"title": "Tone"}]
+
+
+def test_a_manifest_is_reopened_from_its_path_when_unpickled(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    manifest.mark(Unit("JPhon", 100, None, "https://example.org/a"), PARSED, {"title": "Tone"})
+    copy = pickle.loads(pickle.dumps(manifest))
+    assert copy.path == manifest.path
+    assert copy.record("https://example.org/a") == {"title": "Tone"}
@@ -0,0 +1,90 @@
+import asyncio
+from bisect import bisect_left
+import pytest
+from usgscraper.scraper import JASA
+from usgscraper.util import metrics
+from usgscraper.util.metrics import BUCKETS, StageStats, Stats, get_stats, measure
+from conftest import jasa_toc, jasa_toc_url
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """The stats fixture replaces the shared stats with empty ones."""
+    fresh = Stats()
+    monkeypatch.setattr(metrics, "_stats", fresh)
+    return fresh
+
+
+def test_stage_stats_estimate_quantiles_from_their_buckets():
+    stage = StageStats()
+    for seconds in (0.002, 0.002, 0.002, 0.3):
+        stage.observe(seconds, size=10)
+    assert (stage.count, stage.bytes, stage.errors) == (4, 40, 0)
+    assert stage.quantile(0.5) == 0.005
+    assert stage.quantile(0.99) == 0.5
+    assert StageStats().quantile(0.5) == 0.0
+    stage.observe(60.0)
+    assert stage.buckets[len(BUCKETS)] == 1
+    stage.observe(0.02, calls=10)
+    assert stage.count == 15
+    assert stage.buckets[bisect_left(BUCKETS, 0.002)] == 13
+
+
+def test_timer_counts_failed_calls_as_errors():
+    stats = Stats()
+    with stats.timer("fetch") as call:
+        call["bytes"] = 100
+    with pytest.raises(ValueError):
+        with stats.timer("fetch"):
+            raise ValueError
+    with stats.timer("fetch") as call:
+        call["error"] = True
+    fetch = stats.snapshot()["fetch"]
+    assert (fetch["count"], fetch["errors"], fetch["bytes"]) == (3, 2, 100)
+
+
+def test_drained_stages_are_merged_into_other_stats():
+    worker, parent = Stats(), Stats()
+    worker.observe("parse", 0.01, 500)
+    parent.observe("parse", 0.02, 100)
+    parent.merge(worker.drain())
+    assert worker.stages == {}
+    assert parent.stages["parse"].count == 2
+    assert parent.stages["parse"].bytes == 600
+
+
+def test_prometheus_buckets_are_cumulative():
+    stats = Stats()
+    stats.observe("write", 0.002, 10)
+    stats.observe("write", 0.2, 20)
+    text = stats.to_prometheus()
+    assert 'usgscraper_stage_seconds_bucket{stage="write",le="0.005"} 1' in text
+    assert 'usgscraper_stage_seconds_bucket{stage="write",le="0.25"} 2' in text
+    assert 'usgscraper_stage_seconds_bucket{stage="write",le="+Inf"} 2' in text
+    assert 'usgscraper_stage_seconds_count{stage="write"} 2' in text
+    assert 'usgscraper_stage_bytes_total{stage="write"} 30' in text
+
+
+def test_measure_times_functions_and_coroutine_functions(stats):
+    @measure("clean_data")
+    def clean(record):
+        return record
+
+    @measure("clean_data")
+    async def aclean(record):
+        return record
+
+    assert clean({"title": "Tone"}) == {"title": "Tone"}
+    assert asyncio.run(aclean({"title": "Tone"})) == {"title": "Tone"}
+    assert get_stats().stages["clean_data"].count == 2
+
+
+def test_a_crawl_records_its_parse_and_write_stages(transport, stats):
+    page = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(150, 1)] = page
+    JASA(volume=150, issue=1).to_json()
+    assert stats.stages["parse"].count == 1
+    assert stats.stages["parse"].bytes == len(page)
+    assert stats.stages["clean_data"].count == 3
+    assert stats.stages["write"].count == 3
+    assert "parse" in stats.summary()
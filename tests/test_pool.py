@@ -0,0 +1,31 @@
+import pytest
+from usgscraper.scraper import JASA, JSLHR
+from usgscraper.parser import pool as parse_pool
+from usgscraper.parser.pool import ParsePool
+from conftest import jasa_toc, jasa_toc_url, jslhr_toc, jslhr_toc_url
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    """The process_pool fixture parses every page in a worker process."""
+    pool = ParsePool("process", max_workers=1)
+    monkeypatch.setattr(parse_pool, "_parse_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_soups_are_built_from_pages_parsed_in_a_process_pool(transport, process_pool):
+    # a large issue, since the tree of a Tag is too deep to pickle
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 300)
+    transport.pages[jslhr_toc_url(64, 2)] = jslhr_toc(64, 2, 300)
+    assert len(JASA(volume=150, issue=1).soup.find_all("section", class_="card")) == 300
+    assert [issue for issue, _ in JASA(volume=150, issue=1).soups()] == [1]
+    soups = [(issue, len(soup.find_all(class_="issue-item"))) for issue, soup in JSLHR(volume=64).soups()]
+    assert soups == [(2, 300)]
+    assert JASA(volume=150, issue=2).soup == "no such issue"
+
+
+def test_papers_are_parsed_in_a_process_pool(transport, process_pool):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    papers = list(JASA(volume=150, issue=1).extract_data())
+    assert [paper["title"] for paper in papers] == [f"Paper 150-1-{n}" for n in range(3)]
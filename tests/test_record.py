@@ -0,0 +1,32 @@
+import pytest
+from usgscraper.scraper import JSLHR
+from usgscraper.scraper.jasa_scraper import JASAInfo
+from conftest import jslhr_toc, jslhr_toc_url
+
+ROW = {"title": "Tone", "published_date": "October 2021", "authors": ["Ann", "Bo"], "href": "https://a.org"}
+
+
+def test_records_are_slotted_and_normalized():
+    record = JASAInfo(**ROW)
+    assert not hasattr(record, "__dict__")
+    assert record.authors == {"auth-1": "Ann", "auth-2": "Bo"}
+    assert list(record.dict()) == ["title", "published_date", "authors", "href"]
+    assert record == JASAInfo(**ROW)
+    assert record != JASAInfo(**{**ROW, "title": "Vowels"})
+    assert repr(record).startswith("JASAInfo(title='Tone'")
+    with pytest.raises(TypeError, match="missing href"):
+        JASAInfo(title="Tone", published_date="October 2021", authors="no author")
+
+
+def test_validate_many_equals_a_record_per_row():
+    rows = [ROW, {**ROW, "authors": "no author"}]
+    assert JASAInfo.validate_many(rows) == [JASAInfo(**row).dict() for row in rows]
+    assert JASAInfo.validate_many(iter(rows))[1]["authors"] == "no author"
+
+
+def test_a_jslhr_header_without_a_date_does_not_fail_the_issue(transport):
+    page = jslhr_toc(64, 1, 2).replace("Research Article 10 March 2021", "Research Article", 1)
+    transport.pages[jslhr_toc_url(64, 1)] = page
+    papers = list(JSLHR(volume=64, issue=1).extract_data())
+    assert [paper["published_date"] for paper in papers] == ["no date", "March 2021"]
+    assert [paper["abstract"] for paper in papers] == ["Abstract 0", "Abstract 1"]
@@ -0,0 +1,136 @@
+import time
+import random
+import asyncio
+import pytest
+from usgscraper.scraper import JASA, JPhon, Crawl
+from usgscraper.transport import FetchError, HTTPResponse, Transport, TransportConfig
+from usgscraper.transport.breaker import CircuitBreaker, CircuitOpenError
+from conftest import (
+    jasa_toc,
+    jasa_toc_url,
+    jphon_article,
+    jphon_article_url,
+    jphon_issue,
+    jphon_issue_url,
+)
+
+URL = "https://asa.scitation.org/toc/jas/150/1"
+
+
+def answers(*statuses):
+    """The answers function creates a request that answers with every status in turn."""
+    sent = []
+
+    async def request():
+        sent.append(statuses[len(sent)])
+        return HTTPResponse(url=URL, status=sent[-1])
+
+    return request, sent
+
+
+def test_server_errors_are_retried_until_an_answer():
+    transport = Transport(TransportConfig(backoff=0.001))
+    request, sent = answers(503, 429, 200)
+    assert asyncio.run(transport.retry(URL, request)).status == 200
+    assert sent == [503, 429, 200]
+
+
+def test_a_request_that_keeps_failing_raises_fetch_error():
+    transport = Transport(TransportConfig(retries=2, backoff=0.001))
+    request, sent = answers(503, 503, 503)
+    with pytest.raises(FetchError) as error:
+        asyncio.run(transport.retry(URL, request))
+    assert (error.value.url, error.value.status, error.value.attempts) == (URL, 503, 3)
+    request, sent = answers(404)
+    assert asyncio.run(transport.retry(URL, request)).status == 404
+
+
+def test_backoff_has_full_jitter_up_to_its_cap():
+    config = TransportConfig(backoff=0.5, max_backoff=3.0)
+    random.seed(0)
+    for attempt in range(6):
+        delays = [config.delay(attempt) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= min(3.0, 0.5 * 2**attempt)
+    assert max(config.delay(5) for _ in range(200)) > 2.0
+
+
+def test_circuit_opens_and_lets_a_single_probe_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record(URL, False)
+    breaker.check(URL)
+    breaker.record(URL, False)
+    with pytest.raises(CircuitOpenError):
+        breaker.check(URL)
+    breaker.check("https://pubs.asha.org/toc/jslhr/64/1")
+    time.sleep(0.06)
+    breaker.check(URL)
+    with pytest.raises(CircuitOpenError):
+        breaker.check(URL)
+    breaker.record(URL, True)
+    breaker.check(URL)
+
+
+def test_an_open_circuit_fails_fast():
+    transport = Transport(TransportConfig(backoff=0.001), breaker=CircuitBreaker(failure_threshold=1))
+    request, sent = answers(503, 200)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(transport.retry(URL, request))
+    assert sent == [503]
+
+
+def test_a_failed_issue_does_not_stop_the_crawl(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(150, 2)] = jasa_toc(150, 2, 2)
+    transport.failing[jasa_toc_url(150, 1)] = 1
+    result = Crawl([JASA(volume=150, issue=1), JASA(volume=150, issue=2)]).collect()
+    assert [paper["title"] for paper in result.papers] == ["Paper 150-2-0", "Paper 150-2-1"]
+    [failure] = result.failures
+    assert (failure.journal, failure.volume, failure.issue) == ("JASA", 150, 1)
+    assert (failure.url, failure.error) == (jasa_toc_url(150, 1), "FetchError")
+
+
+def test_a_failed_article_keeps_the_rest_of_its_issue(transport):
+    transport.pages[jphon_issue_url(100)] = jphon_issue(100, ["Tone", "Vowels", "Stops"])
+    for n in range(3):
+        transport.pages[jphon_article_url(100, n)] = jphon_article(f"Abstract {n}", ["Tone"])
+    transport.failing[jphon_article_url(100, 1)] = 1
+    result = JPhon(volume=100).collect()
+    assert sorted(paper["title"] for paper in result.papers) == ["Stops", "Tone"]
+    [failure] = result.failures
+    assert failure.url == jphon_article_url(100, 1)
+    assert failure.message == f"{jphon_article_url(100, 1)}: HTTP 503"
+
+
+def test_a_probe_that_ends_without_an_answer_lets_the_next_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    transport = Transport(TransportConfig(backoff=0.001), breaker=breaker)
+    breaker.record(URL, False)
+    time.sleep(0.06)
+
+    async def cancelled():
+        raise asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(transport.retry(URL, cancelled))
+    request, sent = answers(200)
+    assert asyncio.run(transport.retry(URL, request)).status == 200
+    breaker.check(URL)
+
+
+def test_a_cancelled_article_keeps_the_rest_of_its_issue(transport, monkeypatch):
+    transport.pages[jphon_issue_url(100)] = jphon_issue(100, ["Tone", "Vowels"])
+    for n in range(2):
+        transport.pages[jphon_article_url(100, n)] = jphon_article(f"Abstract {n}", ["Tone"])
+    astream = transport.astream
+
+    async def cancel_first(url, consumer, headers=None, chunk_size=16384):
+        if url == jphon_article_url(100, 0):
+            raise asyncio.CancelledError
+        return await astream(url, consumer, headers, chunk_size)
+
+    monkeypatch.setattr(transport, "astream", cancel_first)
+    result = JPhon(volume=100).collect()
+    assert [paper["title"] for paper in result.papers] == ["Vowels"]
+    assert [(failure.url, failure.error) for failure in result.failures] == [
+        (jphon_article_url(100, 0), "CancelledError")
+    ]
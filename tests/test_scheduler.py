@@ -0,0 +1,69 @@
+import time
+import asyncio
+from email.utils import formatdate
+from usgscraper.transport import Scheduler
+from usgscraper.transport.scheduler import HostState, TokenBucket, parse_retry_after
+
+
+def test_token_bucket_spaces_requests_after_a_burst():
+    bucket = TokenBucket(rate=10.0, burst=2.0)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert 0.09 < bucket.reserve() <= 0.1
+
+
+def test_host_rate_is_halved_when_throttled_and_recovers_additively():
+    state = HostState(max_rate=8.0, burst=8.0, recovery=1.0)
+    state.slow_down(None)
+    assert state.bucket.rate == 4.0
+    state.slow_down(None)
+    assert state.bucket.rate == 2.0
+    for _ in range(10):
+        state.speed_up()
+    assert state.bucket.rate == 8.0
+    for _ in range(10):
+        state.slow_down(0)
+    assert state.bucket.rate == state.min_rate
+
+
+def test_retry_after_is_read_as_seconds_or_a_date():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("-1") == 0.0
+    assert 55 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_throttled_host_is_paused_for_retry_after():
+    scheduler = Scheduler(rate_per_host=100.0, burst=100.0)
+    scheduler.feedback("https://pubs.asha.org/a", 429, {"retry-after": "3"})
+    scheduler.feedback("https://asa.scitation.org/b", 200, {})
+    assert scheduler.host_state("pubs.asha.org").delay() > 2.9
+    assert scheduler.host_state("pubs.asha.org").bucket.rate == 50.0
+    assert scheduler.host_state("asa.scitation.org").delay() == 0.0
+
+
+def test_slots_cap_the_requests_per_host_and_in_total():
+    scheduler = Scheduler(max_concurrency=3, max_per_host=2, rate_per_host=1000.0, burst=1000.0)
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    peak_total = 0
+
+    async def fetch(url: str) -> None:
+        nonlocal peak_total
+        host = url.split("/")[2]
+        async with scheduler.slot(url):
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            peak_total = max(peak_total, sum(active.values()))
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    async def main() -> None:
+        await asyncio.gather(
+            *(fetch(f"https://{host}/{n}") for host in ("a.org", "b.org") for n in range(6))
+        )
+
+    asyncio.run(main())
+    assert peak == {"a.org": 2, "b.org": 2}
+    assert peak_total == 3
@@ -0,0 +1,42 @@
+import json
+from usgscraper import JASA, Crawl
+from usgscraper.util import SeenIndex
+from conftest import jasa_toc, jasa_toc_url
+
+
+def read_titles(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line)["title"] for line in file]
+
+
+def test_seen_index_normalizes_keys(tmp_path):
+    seen = SeenIndex(str(tmp_path / "seen.sqlite"))
+    seen.add(["https://doi.org/10.1121/10.0006449", None])
+    assert "10.1121/10.0006449" in seen
+    assert seen.unseen(["10.1121/10.0006449", "10.1121/10.0000001", None]) == [False, True, True]
+    seen.close()
+
+
+def test_rerun_with_seen_keeps_written_papers(transport, tmp_path):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    seen = SeenIndex(str(tmp_path / "seen.sqlite"))
+    JASA(volume=150, issue=1, seen=seen).to_jsonl()
+    JASA(volume=150, issue=1, seen=seen).to_jsonl()
+    assert len(read_titles("JASA - 150 - 1.jsonl")) == 3
+
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 5)
+    JASA(volume=150, issue=1, seen=seen).to_jsonl()
+    titles = read_titles("JASA - 150 - 1.jsonl")
+    assert len(titles) == len(set(titles)) == 5
+
+
+def test_crawl_rerun_with_seen_keeps_written_papers(transport, tmp_path):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    lines = SeenIndex(str(tmp_path / "lines.sqlite"))
+    array = SeenIndex(str(tmp_path / "array.sqlite"))
+    for _ in range(2):
+        Crawl([JASA(volume=150, issue=1, seen=lines)]).to_jsonl()
+        Crawl([JASA(volume=150, issue=1, seen=array)]).to_json()
+    assert len(read_titles("JASA - 150 - 1.jsonl")) == 3
+    with open("JASA - 150 - 1.json", encoding="utf-8") as file:
+        assert len(json.load(file)) == 3
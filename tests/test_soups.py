@@ -0,0 +1,45 @@
+import pytest
+from usgscraper.scraper import JASA, JSLHR
+from conftest import jasa_toc, jasa_toc_url, jslhr_toc, jslhr_toc_url
+
+
+def test_a_volume_is_streamed_one_issue_at_a_time(transport):
+    transport.pages[jasa_toc_url(150, 3)] = jasa_toc(150, 3, 1)
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 2)
+    soups = JASA(volume=150).soups()
+    issue, first = next(soups)
+    assert issue == 1 and len(first.find_all("section", class_="card")) == 2
+    issue, second = next(soups)
+    assert issue == 3 and len(second.find_all("section", class_="card")) == 1
+    assert first.decomposed and not second.decomposed
+    assert next(soups, None) is None
+
+
+def test_jslhr_soups_skip_missing_issues(transport):
+    transport.pages[jslhr_toc_url(64, 2)] = jslhr_toc(64, 2, 3)
+    issues = [(issue, len(soup.find_all(class_="issue-item"))) for issue, soup in JSLHR(volume=64).soups()]
+    assert issues == [(2, 3)]
+
+
+def test_the_soup_of_an_issue_is_downloaded_once(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 2)
+    jasa = JASA(volume=150, issue=1)
+    assert jasa.soup is jasa.soup
+    assert transport.requested == [jasa_toc_url(150, 1)]
+    assert [issue for issue, _ in jasa.soups()] == [1]
+    with pytest.raises(ValueError, match="soups"):
+        JASA(volume=150).soup
+
+
+def test_an_issue_that_fails_to_download_is_kept_as_a_failure(transport):
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 2)
+    transport.pages[jasa_toc_url(150, 2)] = jasa_toc(150, 2, 1)
+    transport.failing[jasa_toc_url(150, 1)] = 1
+    transport.failing[jslhr_toc_url(64, 3)] = 1
+    jasa, jslhr = JASA(volume=150), JSLHR(volume=64)
+    assert [issue for issue, _ in jasa.soups()] == [2]
+    assert [(failure.issue, failure.url, failure.error) for failure in jasa.failures] == [
+        (1, jasa_toc_url(150, 1), "FetchError")
+    ]
+    assert list(jslhr.soups()) == []
+    assert [(failure.journal, failure.issue) for failure in jslhr.failures] == [("JSLHR", 3)]
@@ -0,0 +1,35 @@
+import json
+from bs4 import BeautifulSoup
+from usgscraper.parser.toc import class_xpath, find_json_script, find_subtree
+from conftest import jasa_toc
+
+CHROME = '<div class="nav sub-sections"><a href="/">home</a></div>' * 20
+
+
+def test_subtree_matches_the_element_found_in_a_full_tree():
+    html = jasa_toc(150, 1, 3).replace("<body>", f"<body>{CHROME}").replace("</body>", f"{CHROME}</body>")
+    subtree = find_subtree(html, class_xpath("div", "sub-section"))
+    full = BeautifulSoup(html, "lxml").find("div", class_="sub-section")
+    assert subtree.name == "div" and subtree["class"] == ["sub-section"]
+    assert str(subtree) == str(full)
+    assert len(subtree.find_all("section", class_="card")) == 3
+
+
+def test_class_xpath_matches_whole_class_names_only():
+    html = '<html><body><p class="x titled_issues  y">found</p><p class="titled_issues_old">no</p></body></html>'
+    assert find_subtree(html, class_xpath(None, "titled_issues")).text == "found"
+    assert find_subtree(html, class_xpath("div", "titled_issues")) is None
+    assert find_subtree(html.encode(), class_xpath("p", "titled_issues")).text == "found"
+
+
+def test_missing_or_empty_pages_have_no_subtree():
+    assert find_subtree("<html><body>no such issue</body></html>", class_xpath("div", "sub-section")) is None
+    assert find_subtree("", class_xpath("div", "sub-section")) is None
+
+
+def test_json_script_is_decoded_without_a_tree():
+    payload = {"articles": {"ihp": {"data": {"issueBody": {"includeItem": [{"title": "Tone"}]}}}}}
+    html = f'<html><head><script src="a.js"></script><script type="application/json">{json.dumps(payload)}</script></head></html>'
+    assert find_json_script(html) == payload
+    assert find_json_script(html.encode()) == payload
+    assert find_json_script("<html><script>var a = 1;</script></html>") is None
@@ -0,0 +1,38 @@
+import json
+from usgscraper.scraper import JASA, Watch
+from conftest import jasa_toc, jasa_toc_url
+
+
+def read_titles(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line)["title"] for line in file]
+
+
+def run_watch(path: str) -> None:
+    watch = Watch([JASA(volume=150, issue=1)], path=path)
+    try:
+        watch.to_jsonl()
+    finally:
+        watch.close()
+
+
+def test_a_watch_writes_only_the_papers_published_since_its_last_run(transport, tmp_path):
+    path = str(tmp_path / "watch.sqlite")
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 2)
+    run_watch(path)
+    assert read_titles("JASA - 150 - 1.jsonl") == ["Paper 150-1-0", "Paper 150-1-1"]
+
+    transport.pages[jasa_toc_url(150, 1)] = jasa_toc(150, 1, 3)
+    transport.pages[jasa_toc_url(150, 2)] = jasa_toc(150, 2, 1)
+    transport.requested.clear()
+    run_watch(path)
+    assert read_titles("JASA - 150 - 1.jsonl") == ["Paper 150-1-0", "Paper 150-1-1", "Paper 150-1-2"]
+    assert read_titles("JASA - 150 - 2.jsonl") == ["Paper 150-2-0"]
+    assert jasa_toc_url(150, 3) in transport.requested
+
+    watch = Watch([JASA(volume=150, issue=1)], path=path)
+    try:
+        assert [paper for result in watch for paper in result.papers] == []
+        assert watch.latest("JASA") == (150, 2)
+    finally:
+        watch.close()
@@ -1 +1,14 @@
+from usgscraper.util.lazy import lazy_module
 
+
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "JASA": ".scraper.jasa_scraper",
+        "JPhon": ".scraper.jphon_scraper",
+        "JSLHR": ".scraper.jslhr_scraper",
+        "Crawl": ".scraper.crawl",
+        "Watch": ".scraper.watch",
+    },
+)
+__all__ = ["JASA", "JPhon", "JSLHR", "Crawl", "Watch"]
@@ -0,0 +1,131 @@
+import re
+import sys
+import argparse
+from typing import Any, Optional
+from usgscraper import JASA, JPhon, JSLHR, Crawl, Watch
+from usgscraper.scraper.filters import match
+from usgscraper.transport import (
+    PageArchive,
+    ResponseCache,
+    Scheduler,
+    Transport,
+    TransportConfig,
+    get_transport,
+    set_transport,
+)
+from usgscraper.util import Manifest, Progress, SeenIndex, get_stats
+
+
+JOURNALS = {"JASA": JASA, "JSLHR": JSLHR, "JPhon": JPhon}
+SPEC = re.compile(r"(?P<journal>\w+):(?P<first>\d+)(?:-(?P<last>\d+))?(?::(?P<issue>\d+))?")
+
+
+def parse_spec(spec: str) -> tuple[str, int, int, Optional[int]]:
+    """The parse_spec function reads a spec such as `JASA:150`, `JPhon:30-110` or `JSLHR:64:3`.
+
+    Args:
+        spec (str): the journal, the volume or the range of volumes, and the issue
+
+    Returns:
+        a tuple of the journal, the first and last volumes and the issue
+    """
+    found = SPEC.fullmatch(spec)
+    if found is None or found["journal"] not in JOURNALS:
+        raise argparse.ArgumentTypeError(
+            f"{spec!r} is not JOURNAL:VOLUME[-LAST][:ISSUE] with JOURNAL one of {', '.join(JOURNALS)}"
+        )
+    first = int(found["first"])
+    last = int(found["last"] or first)
+    if found["issue"] and last != first:
+        raise argparse.ArgumentTypeError(f"{spec!r} has an issue for a range of volumes")
+    return found["journal"], first, last, int(found["issue"]) if found["issue"] else None
+
+
+def create_scrapers(args: argparse.Namespace) -> list[Any]:
+    """The create_scrapers function creates a scraper per volume of every spec."""
+    options = {
+        "manifest": Manifest(args.manifest) if args.manifest else None,
+        "filter": match(*args.match) if args.match else None,
+        "seen": SeenIndex(args.seen) if args.seen else None,
+    }
+    scrapers = []
+    for journal, first, last, issue in args.specs:
+        for volume in range(first, last + 1):
+            scraper = JOURNALS[journal](volume=volume, issue=issue, **options)
+            if args.enrich and journal == "JASA":
+                scraper.enrich = True
+            scrapers.append(scraper)
+    return scrapers
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m usgscraper",
+        description="Scrape the papers of several journals concurrently, writing every issue as it completes.",
+    )
+    parser.add_argument(
+        "specs",
+        nargs="+",
+        type=parse_spec,
+        metavar="JOURNAL:VOLUME[-LAST][:ISSUE]",
+        help="e.g. JASA:150 JPhon:30-110 JSLHR:64:3",
+    )
+    parser.add_argument("--to", choices=["json", "jsonl", "sqlite"], default="jsonl")
+    parser.add_argument("--database", default="papers.sqlite", help="the file of --to sqlite")
+    parser.add_argument("--compress", action="store_true", help="gzip the JSON Lines files")
+    parser.add_argument("--match", nargs="+", metavar="TERM", help="keep the papers whose title has a term")
+    parser.add_argument("--enrich", action="store_true", help="add the abstracts and keywords of JASA papers")
+    parser.add_argument("--seen", metavar="PATH", help="skip the papers written by earlier runs")
+    parser.add_argument("--manifest", metavar="PATH", help="resume an interrupted run")
+    parser.add_argument("--watch", metavar="PATH", help="write only the papers published since the last run")
+    parser.add_argument("--cache", metavar="DIR", help="revalidate the pages fetched by earlier runs")
+    parser.add_argument("--archive", metavar="PATH", help="keep the raw pages")
+    parser.add_argument("--replay", action="store_true", help="read the pages from --archive only")
+    parser.add_argument("--per-host", type=int, default=8, help="the requests in flight per host")
+    parser.add_argument("--rate", type=float, default=10.0, help="the requests per second per host")
+    parser.add_argument("--interval", type=float, default=1.0, help="the seconds between reports")
+    parser.add_argument("--quiet", action="store_true", help="do not report the progress")
+    parser.add_argument("--summary", action="store_true", help="print the time spent in every stage")
+    args = parser.parse_args()
+    if args.replay and not args.archive:
+        parser.error("--replay needs --archive")
+
+    set_transport(
+        Transport(
+            TransportConfig(pool_size_per_host=args.per_host),
+            # a watch revalidates every page, so an unchanged table of contents costs a 304
+            cache=ResponseCache(args.cache, ttl=0 if args.watch else 86400.0) if args.cache else None,
+            scheduler=Scheduler(
+                max_per_host=args.per_host, rate_per_host=args.rate, burst=args.rate
+            ),
+            archive=PageArchive(args.archive) if args.archive else None,
+            replay=args.replay,
+        )
+    )
+    scrapers = create_scrapers(args)
+    if args.watch:
+        crawl = Watch(scrapers, path=args.watch, filter=scrapers[0].filter)
+    else:
+        crawl = Crawl(scrapers)
+    progress = None if args.quiet else Progress(args.interval)
+    kwargs = {"compress": args.compress} if args.to == "jsonl" else {}
+    try:
+        get_transport().run(crawl.awrite(args.to, args.database, progress, **kwargs))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        get_transport().close()
+        if isinstance(crawl, Watch):
+            crawl.close()
+    if args.summary:
+        print(get_stats().summary(), file=sys.stderr)
+    for failure in crawl.failures:
+        print(
+            f"failed: {failure.journal} {failure.volume} {failure.issue} {failure.url} {failure.message}",
+            file=sys.stderr,
+        )
+    return 1 if crawl.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,22 @@
-from .jphon_downloader import (
-    DownloadingJSONStrategy,
-    SingleJSONStrategy,
-    AllJSONStrategy,
-)
+from usgscraper.util.lazy import lazy_module
 
-from .jslhr_downloader import (
-    DownloadingJSLHRSoupStrategy,
-    SingleJSLHRSoupStrategy,
-    AllJSLHRSoupStrategy,
-)
 
-from .jasa_downloader import (
-    DownloadingJASASoupStrategy,
-    SingleJASASoupStrategy,
-    AllJASASoupStrategy,
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "DownloadingJSONStrategy": ".jphon_downloader",
+        "SingleJSONStrategy": ".jphon_downloader",
+        "AllJSONStrategy": ".jphon_downloader",
+        "DownloadingJSLHRSoupStrategy": ".jslhr_downloader",
+        "SingleJSLHRSoupStrategy": ".jslhr_downloader",
+        "AllJSLHRSoupStrategy": ".jslhr_downloader",
+        "DownloadingJASASoupStrategy": ".jasa_downloader",
+        "SingleJASASoupStrategy": ".jasa_downloader",
+        "AllJASASoupStrategy": ".jasa_downloader",
+        "IssueDiscovery": ".discovery",
+        "IssueIndex": ".discovery",
+        "get_issue_discovery": ".discovery",
+        "set_issue_discovery": ".discovery",
+    },
 )
+__all__ = list(__dir__())
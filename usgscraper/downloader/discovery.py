@@ -0,0 +1,184 @@
+import os
+import re
+import json
+import time
+import asyncio
+import aiohttp
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Optional
+from usgscraper.transport import FetchError, Transport, get_transport, user_agent
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass(frozen=True)
+class IssueIndex:
+    """
+    The IssueIndex object describes where a journal lists the issues of its volumes.
+
+    `url` is formatted with the volume, its year and its decade, and every link of the index
+    page matching `pattern` (with the groups `volume` and `issue`) names an existing issue.
+    An issue group that does not match, e.g. a ScienceDirect supplement, is stored as None.
+    """
+
+    url: str
+    pattern: re.Pattern
+    year_offset: int
+    fallback: Callable[[int], list]
+
+    def index_url(self, volume: int) -> str:
+        """The index_url method creates the url of the index page listing `volume`."""
+        year = volume + self.year_offset
+        return self.url.format(volume=volume, year=year, decade=year // 10 * 10)
+
+    def find_issues(self, html: str) -> dict[int, list[Optional[int]]]:
+        """The find_issues method finds the issues of every volume linked from an index page.
+
+        Args:
+            html (str): the index page
+
+        Returns:
+            a dict mapping each volume to its sorted issues
+        """
+        volumes: dict[int, set] = {}
+        for match in self.pattern.finditer(html):
+            issue = match.group("issue")
+            volumes.setdefault(int(match.group("volume")), set()).add(
+                int(issue) if issue else None
+            )
+        return {
+            volume: sorted(issues, key=lambda issue: issue or 0)
+            for volume, issues in volumes.items()
+        }
+
+
+INDEXES = {
+    "JASA": IssueIndex(
+        url="https://asa.scitation.org/loi/jas/group/d{decade}.y{year}",
+        pattern=re.compile(r"/toc/jas/(?P<volume>\d+)/(?P<issue>\d+)"),
+        year_offset=1871,
+        fallback=lambda volume: [*range(1, 7)],
+    ),
+    "JSLHR": IssueIndex(
+        url="https://pubs.asha.org/loi/jslhr/group/d{decade}.y{year}",
+        pattern=re.compile(r"/toc/jslhr/(?P<volume>\d+)/(?P<issue>\d+)"),
+        year_offset=1957,
+        fallback=lambda volume: [*range(1, 13)],
+    ),
+    "JPhon": IssueIndex(
+        url="https://www.sciencedirect.com/journal/journal-of-phonetics/vol/{volume}",
+        pattern=re.compile(
+            r"/journal/journal-of-phonetics/vol/(?P<volume>\d+)/(?:issue/(?P<issue>\d+)|suppl/\w+)"
+        ),
+        year_offset=1972,
+        fallback=lambda volume: [None] if volume >= 42 else [*range(1, 7)],
+    ),
+}
+
+
+# --------------------------------------------------------------------
+# discovery
+
+
+class IssueDiscovery:
+    """
+    The IssueDiscovery object reads the real issue list of each volume from the journal's
+    index pages, so that only existing issues are requested.
+
+    Every index page is downloaded at most once, even when many volumes are discovered at
+    the same time, and the issue lists are cached in memory and, with `path`, in a JSON file
+    for `ttl` seconds. If an index page cannot be read, the journal's usual issue range is used.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 7 * 86400,
+        transport: Optional[Transport] = None,
+    ) -> None:
+        self.path = os.path.expanduser(path) if path else None
+        self.ttl = ttl
+        self.transport = transport
+        self.volumes: dict[str, dict] = {}
+        self._pages = weakref.WeakKeyDictionary()
+        if self.path and os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as file:
+                self.volumes = json.load(file)
+
+    def save(self) -> None:
+        """The save method writes the cached issue lists to `self.path`."""
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self.volumes, file)
+
+    async def read_index(self, url: str, index: IssueIndex) -> dict[int, list]:
+        """The read_index method downloads and reads an index page once per event loop.
+
+        Args:
+            url (str): the url of the index page
+            index (IssueIndex): the index of the journal
+
+        Returns:
+            a dict mapping each volume to its issues, empty if the page cannot be read
+        """
+        pages = self._pages.setdefault(asyncio.get_running_loop(), {})
+        if url not in pages:
+            pages[url] = asyncio.ensure_future(self.fetch_index(url, index))
+        return await asyncio.shield(pages[url])
+
+    async def fetch_index(self, url: str, index: IssueIndex) -> dict[int, list]:
+        transport = self.transport or get_transport()
+        try:
+            response = await transport.aget(url, headers={"user-agent": user_agent()})
+        except (FetchError, aiohttp.ClientError, asyncio.TimeoutError):
+            return {}
+        if response.status != 200:
+            return {}
+        return index.find_issues(response.text)
+
+    async def issues(self, journal: str, volume: int) -> list[Optional[int]]:
+        """The issues method gets the existing issues of a volume.
+
+        Args:
+            journal (str): the journal name, i.e. JASA, JSLHR or JPhon
+            volume (int): the volume of the journal
+
+        Returns:
+            a list
+        """
+        key = f"{journal}/{volume}"
+        entry = self.volumes.get(key)
+        if entry and time.time() - entry["discovered_at"] < self.ttl:
+            return entry["issues"]
+        index = INDEXES[journal]
+        issues = (await self.read_index(index.index_url(volume), index)).get(volume)
+        if not issues:
+            return index.fallback(volume)
+        self.volumes[key] = {"issues": issues, "discovered_at": time.time()}
+        self.save()
+        return issues
+
+
+_issue_discovery: Optional[IssueDiscovery] = None
+
+
+def get_issue_discovery() -> IssueDiscovery:
+    """The get_issue_discovery function returns the issue discovery shared by all journals."""
+    global _issue_discovery
+    if _issue_discovery is None:
+        _issue_discovery = IssueDiscovery()
+    return _issue_discovery
+
+
+def set_issue_discovery(issue_discovery: IssueDiscovery) -> None:
+    """The set_issue_discovery function replaces the shared issue discovery, e.g. to persist it.
+
+    Args:
+        issue_discovery (IssueDiscovery): the new issue discovery
+    """
+    global _issue_discovery
+    _issue_discovery = issue_discovery
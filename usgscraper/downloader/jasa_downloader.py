@@ -1,10 +1,57 @@
-import requests
+import asyncio
+from collections import deque
 from bs4 import BeautifulSoup
 from dataclasses import dataclass
-from typing import Union, Optional
+from typing import AsyncIterator, Callable, Iterator, Union, Optional
 from abc import ABC, abstractmethod
-from fake_useragent import UserAgent
-from concurrent.futures import ThreadPoolExecutor
+from usgscraper.parser.pool import get_parse_pool
+from usgscraper.parser.toc import build_subtree, class_xpath, find_subtree_html
+from usgscraper.downloader.discovery import get_issue_discovery
+from usgscraper.transport import Transport, get_transport, user_agent
+from usgscraper.util.loop import iterate
+
+
+ARTICLE_SECTION = class_xpath("div", "sub-section")
+
+
+def find_article_html(html: str) -> Optional[str]:
+    """The find_article_html function finds the HTML of the article section of a table of contents page.
+
+    It returns a str, so that it can run in a ParsePool of either kind.
+
+    Args:
+        html (str): the table of contents page
+
+    Returns:
+        a str if a issue exists, None otherwise.
+    """
+    return find_subtree_html(html, ARTICLE_SECTION)
+
+
+def build_article_section(section: Optional[str]) -> Union[str, BeautifulSoup]:
+    """The build_article_section function builds the soup of an article section found by `find_article_html`.
+
+    Args:
+        section (str): the HTML of the article section, None if the issue does not exist
+
+    Returns:
+        a BeautifulSoup object if a issue exists, a str otherwise.
+    """
+    if section is None:
+        return "no such issue"
+    return build_subtree(section)
+
+
+def find_article_section(html: str) -> Union[str, BeautifulSoup]:
+    """The find_article_section function finds the article section of a table of contents page.
+
+    Args:
+        html (str): the table of contents page
+
+    Returns:
+        a BeautifulSoup object if a issue exists, a str otherwise.
+    """
+    return build_article_section(find_article_html(html))
 
 
 # --------------------------------------------------------------------
@@ -19,6 +66,7 @@ class JASADownloader:
 
     volume: int
     issue: int
+    transport: Optional[Transport] = None
 
     @property
     def headers(self) -> dict[str, str]:
@@ -40,7 +88,7 @@ class JASADownloader:
             "sec-fetch-site": "none",
             "sec-fetch-user": "?1",
             "upgrade-insecure-requests": "1",
-            "user-agent": UserAgent().google,
+            "user-agent": user_agent(),
         }
 
     @property
@@ -54,12 +102,30 @@ class JASADownloader:
         Returns:
             a BeautifulSoup object if a issue exists, a str otherwise.
         """
-        req = requests.get(self.url, headers=self.headers)
-        soup = BeautifulSoup(req.text, "lxml")
-        article_html = soup.find("div", class_="sub-section")
-        if article_html is None:
-            return "no such issue"
-        return article_html
+        transport = self.transport or get_transport()
+        response = transport.get(self.url, headers=self.headers)
+        return find_article_section(response.text)
+
+    async def afetch_page(self) -> str:
+        """The afetch_page method gets the table of contents page on the running event loop.
+
+        Returns:
+            a str
+        """
+        transport = self.transport or get_transport()
+        response = await transport.aget(self.url, headers=self.headers)
+        return response.text
+
+    async def adownload(self) -> Union[str, BeautifulSoup]:
+        """The adownload method gets the target BeautifulSoup object without blocking the event loop,
+        the page is parsed in the shared ParsePool and only the tree of its article section is
+        built on the loop.
+
+        Returns:
+            a BeautifulSoup object if a issue exists, a str otherwise.
+        """
+        html = await self.afetch_page()
+        return build_article_section(await get_parse_pool().run(find_article_html, html))
 
 
 # --------------------------------------------------------------------
@@ -67,9 +133,15 @@ class JASADownloader:
 
 
 class DownloadingJASASoupStrategy(ABC):
-    def __init__(self, volume: int, issue: Optional[int] = None):
+    def __init__(
+        self,
+        volume: int,
+        issue: Optional[int] = None,
+        transport: Optional[Transport] = None,
+    ):
         self.volume = volume
         self.issue = issue
+        self.transport = transport or get_transport()
 
     @abstractmethod
     def create_soup(self):
@@ -79,17 +151,70 @@ class DownloadingJASASoupStrategy(ABC):
 
 class SingleJASASoupStrategy(DownloadingJASASoupStrategy):
     def create_soup(self):
-        return JASADownloader(volume=self.volume, issue=self.issue).download()
+        return JASADownloader(
+            volume=self.volume, issue=self.issue, transport=self.transport
+        ).download()
+
+    async def acreate_soup(self):
+        return await JASADownloader(
+            volume=self.volume, issue=self.issue, transport=self.transport
+        ).adownload()
+
+    async def afetch_page(self) -> str:
+        return await JASADownloader(
+            volume=self.volume, issue=self.issue, transport=self.transport
+        ).afetch_page()
 
 
 class AllJASASoupStrategy(DownloadingJASASoupStrategy):
-    def download_multiple(self, issue: int):
-        return JASADownloader(volume=self.volume, issue=issue).download()
+    async def aiter_soups(
+        self, on_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> AsyncIterator[tuple[int, BeautifulSoup]]:
+        """The aiter_soups method downloads the issues of the volume concurrently and yields the
+        article section of every issue in issue order, skipping the issues that do not exist.
 
-    def create_soup(self):
-        with ThreadPoolExecutor() as executor:
-            pseudo_soup = BeautifulSoup("<body></body>", "lxml")
-            result = executor.map(self.download_multiple, [*range(1, 7)])
-            for soup in result:
-                pseudo_soup.append(soup)
-            return pseudo_soup
+        Only the pages wait in memory: the tree of an issue is built when the issue is yielded
+        and decomposed once the next issue is requested, so a volume costs a single tree.
+        An issue that fails to download is passed to `on_error` with its exception and skipped.
+
+        Args:
+            on_error (Callable): called with the issue and the exception of a failed download
+
+        Returns:
+            an async generator of (issue, soup) tuples
+        """
+        issues = await get_issue_discovery().issues("JASA", self.volume)
+        pages = deque(
+            (
+                issue,
+                asyncio.ensure_future(
+                    JASADownloader(
+                        volume=self.volume, issue=issue, transport=self.transport
+                    ).afetch_page()
+                ),
+            )
+            for issue in issues
+        )
+        try:
+            while pages:
+                issue, page = pages.popleft()
+                try:
+                    html = await page
+                except Exception as error:
+                    if on_error is not None:
+                        on_error(issue, error)
+                    continue
+                soup = build_article_section(await get_parse_pool().run(find_article_html, html))
+                if isinstance(soup, str):
+                    continue
+                try:
+                    yield issue, soup
+                finally:
+                    soup.decompose()
+        finally:
+            for _, page in pages:
+                page.cancel()
+
+    def create_soup(self) -> Iterator[tuple[int, BeautifulSoup]]:
+        """The create_soup method runs `aiter_soups` on a private event loop."""
+        return iterate(self.aiter_soups())
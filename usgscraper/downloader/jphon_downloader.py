@@ -1,14 +1,10 @@
-import json
 import asyncio
-import aiohttp
-import requests
-from bs4 import BeautifulSoup
 from abc import ABC, abstractmethod
-from fake_useragent import UserAgent
-from typing import Callable, Awaitable, Optional
-
-
-HEADERS = {"user-agent": UserAgent().google}
+from typing import Callable, Awaitable, Optional, Union
+from usgscraper.parser.pool import get_parse_pool
+from usgscraper.parser.toc import find_json_script
+from usgscraper.downloader.discovery import get_issue_discovery
+from usgscraper.transport import Transport, get_transport, user_agent
 
 
 class DownloadingJSONStrategy(ABC):
@@ -16,9 +12,15 @@ class DownloadingJSONStrategy(ABC):
     The DownloadingJSONStrategy object is the abstract class for downlading classes.
     """
 
-    def __init__(self, volume: int, issue: Optional[int] = None):
+    def __init__(
+        self,
+        volume: int,
+        issue: Optional[int] = None,
+        transport: Optional[Transport] = None,
+    ):
         self.volume = volume
         self.issue = issue
+        self.transport = transport or get_transport()
 
     def create_url(self, issue: str) -> str:
         """The create_url method creates a url based on the arugment `issue`.
@@ -29,26 +31,31 @@ class DownloadingJSONStrategy(ABC):
         Returns:
             a str
         """
-        if self.volume >= 42:
+        if self.volume >= 42 or issue is None:
             return f"https://www.sciencedirect.com/journal/journal-of-phonetics/vol/{self.volume}/suppl/C"
         return f"https://www.sciencedirect.com/journal/journal-of-phonetics/vol/{self.volume}/issue/{issue}"
 
-    def find_articles(self, json_data: json) -> json:
+    @staticmethod
+    def find_articles(json_data: dict) -> list[dict]:
         """The find_articles method is a strategy that finds the artice JSON data from `json_data`.
         Args:
-            json_data (json): the original JSON data
+            json_data (dict): the original JSON data
         Returns:
-            a json
+            a list
         """
-
+        issue_body = json_data["articles"]["ihp"]["data"]["issueBody"]
         try:
-            return json.loads(json_data)["articles"]["ihp"]["data"]["issueBody"][
-                "issueSec"
-            ][1]["includeItem"]
+            return issue_body["issueSec"][1]["includeItem"]
         except KeyError:
-            return json.loads(json_data)["articles"]["ihp"]["data"]["issueBody"][
-                "includeItem"
-            ]
+            return issue_body["includeItem"]
+
+    async def afetch_page(self, url: str) -> bytes:
+        response = await self.transport.aget(url, headers={"user-agent": user_agent()})
+        return response.content
+
+    async def fetch(self, url: str) -> Callable[[], Awaitable[list]]:
+        html = await self.afetch_page(url)
+        return await get_parse_pool().run(parse_articles, html)
 
     @abstractmethod
     def download_json(self):
@@ -56,6 +63,21 @@ class DownloadingJSONStrategy(ABC):
         pass
 
 
+def parse_articles(html: bytes) -> Union[list[dict], str]:
+    """The parse_articles function finds the article JSON data of an issue page.
+
+    Args:
+        html (bytes): the issue page
+
+    Returns:
+        a list if the page has JSON data, a str otherwise.
+    """
+    json_data = find_json_script(html)
+    if not json_data:
+        return "no json data"
+    return DownloadingJSONStrategy.find_articles(json_data)
+
+
 class SingleJSONStrategy(DownloadingJSONStrategy):
     """
     The SingleJSONStrategy object downloads one json at a time.
@@ -63,10 +85,11 @@ class SingleJSONStrategy(DownloadingJSONStrategy):
 
     def download_json(self) -> list[dict[str, str]]:
         url = self.create_url(self.issue)
-        req = requests.get(url, headers=HEADERS)
-        soup = BeautifulSoup(req.text, "lxml")
-        json_data = json.loads(soup.find("script", {"type": "application/json"}).text)
-        return self.find_articles(json_data)
+        response = self.transport.get(url, headers={"user-agent": user_agent()})
+        return parse_articles(response.content)
+
+    async def adownload_json(self) -> Callable[[], Awaitable[list]]:
+        return await self.fetch(self.create_url(self.issue))
 
 
 class AllJSONStrategy(DownloadingJSONStrategy):
@@ -74,17 +97,8 @@ class AllJSONStrategy(DownloadingJSONStrategy):
     The AllJSONStrategy object downloads all the json at a time.
     """
 
-    async def fetch(self, url: str, session) -> Callable[[], Awaitable[list]]:
-        async with session.get(url) as response:
-            html_body = await response.text()
-            soup = BeautifulSoup(html_body, "lxml")
-            json_info = soup.find("script", {"type": "application/json"})
-            if not json_info:
-                return "no json data"
-            return self.find_articles(json.loads(json_info.text))
-
     async def download_json(self) -> Callable[[], Awaitable[list]]:
-        url_list = list(map(self.create_url, range(1, 7)))
-        async with aiohttp.ClientSession(headers=HEADERS) as session:
-            tasks = [asyncio.create_task(self.fetch(url, session)) for url in url_list]
-            return await asyncio.gather(*tasks)
+        issues = await get_issue_discovery().issues("JPhon", self.volume)
+        url_list = list(dict.fromkeys(map(self.create_url, issues)))
+        tasks = [asyncio.create_task(self.fetch(url)) for url in url_list]
+        return await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,17 +1,69 @@
 import asyncio
-import requests
+from collections import deque
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-from aiohttp import ClientSession
 from abc import ABC, abstractmethod
-from fake_useragent import UserAgent
-from typing import Union, Callable, Awaitable, Optional
+from typing import AsyncIterator, Callable, Iterator, Union, Optional
+from usgscraper.parser.pool import get_parse_pool
+from usgscraper.parser.toc import build_subtree, class_xpath, find_subtree_html
+from usgscraper.downloader.discovery import get_issue_discovery
+from usgscraper.transport import Transport, get_transport, user_agent
+from usgscraper.util.loop import iterate
+
+
+TITLED_ISSUES = class_xpath(None, "titled_issues")
+
+
+def find_titled_issues_html(html: str) -> Optional[str]:
+    """The find_titled_issues_html function finds the HTML of the article list of a table of contents page.
+
+    It returns a str, so that it can run in a ParsePool of either kind.
+
+    Args:
+        html (str): the table of contents page
+
+    Returns:
+        a str if a issue exists, None otherwise.
+    """
+    return find_subtree_html(html, TITLED_ISSUES)
+
+
+def build_titled_issues(article_list: Optional[str]) -> Union[BeautifulSoup, str]:
+    """The build_titled_issues function builds the soup of an article list found by `find_titled_issues_html`.
+
+    Args:
+        article_list (str): the HTML of the article list, None if the issue does not exist
+
+    Returns:
+        a BeautifulSoup object if a issue exists, a str otherwise.
+    """
+    if article_list is None:
+        return "no such issue"
+    return build_subtree(article_list)
+
+
+def find_titled_issues(html: str) -> Union[BeautifulSoup, str]:
+    """The find_titled_issues function finds the article list of a table of contents page.
+
+    Args:
+        html (str): the table of contents page
+
+    Returns:
+        a BeautifulSoup object if a issue exists, a str otherwise.
+    """
+    return build_titled_issues(find_titled_issues_html(html))
 
 
 class DownloadingJSLHRSoupStrategy(ABC):
-    def __init__(self, volume: int, issue: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        volume: int,
+        issue: Optional[int] = None,
+        transport: Optional[Transport] = None,
+    ) -> None:
         self.volume = volume
         self.issue = issue
+        self.transport = transport or get_transport()
 
     @abstractmethod
     def create_soup(self) -> BeautifulSoup:
@@ -20,16 +72,24 @@ class DownloadingJSLHRSoupStrategy(ABC):
 
 
 class SingleJSLHRSoupStrategy(DownloadingJSLHRSoupStrategy):
+    @property
+    def url(self) -> str:
+        """The url property set the url based on the volume and issue number."""
+        return f"https://pubs.asha.org/toc/jslhr/{self.volume}/{self.issue}"
+
     def create_soup(self) -> Union[BeautifulSoup, str]:
-        req = requests.get(
-            f"https://pubs.asha.org/toc/jslhr/{self.volume}/{self.issue}",
-            headers={"user-agent": UserAgent().google},
+        response = self.transport.get(self.url, headers={"user-agent": user_agent()})
+        return find_titled_issues(response.text)
+
+    async def afetch_page(self) -> str:
+        response = await self.transport.aget(
+            self.url, headers={"user-agent": user_agent()}
         )
-        soup = BeautifulSoup(req.text, "lxml")
-        article_html = soup.find(class_="titled_issues")
-        if article_html is None:
-            return "no such issue"
-        return article_html
+        return response.text
+
+    async def acreate_soup(self) -> Union[BeautifulSoup, str]:
+        html = await self.afetch_page()
+        return build_titled_issues(await get_parse_pool().run(find_titled_issues_html, html))
 
 
 class AllJSLHRSoupStrategy(DownloadingJSLHRSoupStrategy):
@@ -44,25 +104,55 @@ class AllJSLHRSoupStrategy(DownloadingJSLHRSoupStrategy):
         base_url = f"https://pubs.asha.org/toc/jslhr/{self.volume}/"
         return urljoin(base_url, str(issue))
 
-    async def fetch(self, url: str, session) -> Union[BeautifulSoup, str]:
-        """The fetch method fetch the url and session to get the soup object
+    async def aiter_soups(
+        self, on_error: Optional[Callable[[int, Exception], None]] = None
+    ) -> AsyncIterator[tuple[int, BeautifulSoup]]:
+        """The aiter_soups method downloads the issues of the volume concurrently and yields the
+        article list of every issue in issue order, skipping the issues that do not exist.
+
+        Only the pages wait in memory: the tree of an issue is built when the issue is yielded
+        and decomposed once the next issue is requested, so a volume costs a single tree.
+        An issue that fails to download is passed to `on_error` with its exception and skipped.
 
         Args:
-            url (str)
-            session
+            on_error (Callable): called with the issue and the exception of a failed download
+
         Returns:
-            a BeautifulSoup object if a issue exists, a str otherwise.
+            an async generator of (issue, soup) tuples
         """
-        async with session.get(url) as response:
-            html_body = await response.text()
-            soup = BeautifulSoup(html_body, "lxml")
-            article_html = soup.find(class_="titled_issues")
-            if article_html is None:
-                return "no such issue"
-            return article_html
-
-    async def create_soup(self) -> Callable[[], Awaitable[list]]:
-        url_list = list(map(self.create_url_list, range(1, 13)))
-        async with ClientSession(headers={"user-agent": UserAgent().google}) as session:
-            tasks = [asyncio.create_task(self.fetch(url, session)) for url in url_list]
-            return await asyncio.gather(*tasks)
+        issues = await get_issue_discovery().issues("JSLHR", self.volume)
+        headers = {"user-agent": user_agent()}
+        pages = deque(
+            (
+                issue,
+                asyncio.ensure_future(
+                    self.transport.aget(self.create_url_list(issue), headers=headers)
+                ),
+            )
+            for issue in issues
+        )
+        try:
+            while pages:
+                issue, page = pages.popleft()
+                try:
+                    response = await page
+                except Exception as error:
+                    if on_error is not None:
+                        on_error(issue, error)
+                    continue
+                soup = build_titled_issues(
+                    await get_parse_pool().run(find_titled_issues_html, response.text)
+                )
+                if isinstance(soup, str):
+                    continue
+                try:
+                    yield issue, soup
+                finally:
+                    soup.decompose()
+        finally:
+            for _, page in pages:
+                page.cancel()
+
+    def create_soup(self) -> Iterator[tuple[int, BeautifulSoup]]:
+        """The create_soup method runs `aiter_soups` on a private event loop."""
+        return iterate(self.aiter_soups())
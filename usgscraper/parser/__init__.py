@@ -0,0 +1,20 @@
+from usgscraper.util.lazy import lazy_module
+
+
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "SubtreeCollector": ".article",
+        "has_class": ".article",
+        "has_id": ".article",
+        "ParsePool": ".pool",
+        "get_parse_pool": ".pool",
+        "set_parse_pool": ".pool",
+        "class_xpath": ".toc",
+        "find_json_script": ".toc",
+        "find_subtree": ".toc",
+        "find_subtree_html": ".toc",
+        "build_subtree": ".toc",
+    },
+)
+__all__ = list(__dir__())
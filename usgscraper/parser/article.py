@@ -0,0 +1,81 @@
+from lxml import etree
+from bs4 import BeautifulSoup
+from typing import Callable
+
+
+def has_id(value: str) -> Callable[[etree._Element], bool]:
+    """The has_id function creates a matcher of the element with the id `value`."""
+    return lambda element: element.get("id") == value
+
+
+def has_class(value: str) -> Callable[[etree._Element], bool]:
+    """The has_class function creates a matcher of the elements that have `value` among their classes."""
+    return lambda element: value in element.get("class", "").split()
+
+
+class SubtreeCollector:
+    """
+    The SubtreeCollector object parses a page chunk by chunk and keeps the first element matched
+    by each of its matchers, so that a download can stop as soon as every element is found.
+    """
+
+    def __init__(self, matchers: dict[str, Callable[[etree._Element], bool]]) -> None:
+        self.matchers = matchers
+        self.found: dict[str, etree._Element] = {}
+        self.parser = etree.HTMLPullParser(events=("end",))
+        self.closed = False
+
+    @property
+    def done(self) -> bool:
+        """The done property checks whether every element has been found."""
+        return len(self.found) == len(self.matchers)
+
+    def collect(self) -> None:
+        """The collect method checks the elements the parser has finished since the last call."""
+        for _, element in self.parser.read_events():
+            for name, matcher in self.matchers.items():
+                if name not in self.found and matcher(element):
+                    self.found[name] = element
+
+    def feed(self, chunk: bytes) -> bool:
+        """The feed method parses the next chunk of the page.
+
+        Args:
+            chunk (bytes): the next chunk of the page
+
+        Returns:
+            a bool, True once every element has been found
+        """
+        if not self.done and not self.closed:
+            self.parser.feed(chunk)
+            self.collect()
+        return self.done
+
+    def close(self) -> None:
+        """The close method finishes parsing, e.g. after the last chunk of a page."""
+        if not self.closed:
+            self.closed = True
+            self.parser.close()
+            self.collect()
+
+    def html(self) -> str:
+        """The html method serializes the found elements only.
+
+        Returns:
+            a str
+        """
+        if not self.done:
+            self.close()
+        fragments = (
+            etree.tostring(element, encoding="unicode", method="html", with_tail=False)
+            for element in self.found.values()
+        )
+        return f"<body>{''.join(fragments)}</body>"
+
+    def soup(self) -> BeautifulSoup:
+        """The soup method builds a small BeautifulSoup object from the found elements only.
+
+        Returns:
+            a BeautifulSoup object
+        """
+        return BeautifulSoup(self.html(), "lxml")
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Callable, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from usgscraper.util.metrics import StageStats, get_stats
+
+
+def measure_parse(func: Callable[..., Any], *args: Any) -> Any:
+    """The measure_parse function runs `func(*args)` as a call of the `parse` stage."""
+    with get_stats().timer("parse") as call:
+        if args and isinstance(args[0], (str, bytes)):
+            call["bytes"] = len(args[0])
+        return func(*args)
+
+
+def measure_in_process(func: Callable[..., Any], *args: Any) -> tuple[Any, dict[str, StageStats]]:
+    """The measure_in_process function runs `func(*args)` in a worker process and sends the
+    stages it recorded back with its result, so that they are merged into the parent's stats."""
+    return measure_parse(func, *args), get_stats().drain()
+
+
+class ParsePool:
+    """
+    The ParsePool object runs the CPU-heavy parsing of downloaded pages outside the event loop,
+    so that other downloads keep going while a large page is parsed.
+
+    The default thread pool is safe inside any host process; lxml releases the GIL while it
+    parses. A process pool uses every core, but then the parse functions and their arguments
+    must be picklable, i.e. module-level functions or methods of the journal dataclasses.
+    Every call is recorded as a call of the `parse` stage.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"unknown parse pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """The executor property lazily creates the thread or process pool."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """The run method runs `func(*args)` in the pool and waits for its result.
+
+        Args:
+            func (Callable): the parse function
+            args: the arguments of `func`, usually the raw page
+
+        Returns:
+            the result of `func`
+        """
+        loop = asyncio.get_running_loop()
+        if self.kind == "process":
+            result, stages = await loop.run_in_executor(
+                self.executor, measure_in_process, func, *args
+            )
+            get_stats().merge(stages)
+            return result
+        return await loop.run_in_executor(self.executor, measure_parse, func, *args)
+
+    def shutdown(self) -> None:
+        """The shutdown method stops the workers of the pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_parse_pool: Optional[ParsePool] = None
+
+
+def get_parse_pool() -> ParsePool:
+    """The get_parse_pool function returns the pool shared by all parsers."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ParsePool()
+    return _parse_pool
+
+
+def set_parse_pool(parse_pool: ParsePool) -> None:
+    """The set_parse_pool function replaces the shared pool, e.g. with a process pool.
+
+    Args:
+        parse_pool (ParsePool): the new pool
+    """
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
+    _parse_pool = parse_pool
@@ -0,0 +1,96 @@
+import re
+import json
+from typing import Optional, Union
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, Tag
+
+
+JSON_SCRIPT = re.compile(
+    rb"<script[^>]*\btype=[\"']application/json[\"'][^>]*>(.*?)</script>", re.DOTALL
+)
+
+
+def find_json_script(html: Union[str, bytes]) -> Optional[dict]:
+    """The find_json_script function finds the first `<script type="application/json">` payload
+    with a byte-level scan, without building any tree.
+
+    Args:
+        html (str or bytes): the page
+
+    Returns:
+        a dict if the page has a JSON script, None otherwise.
+    """
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    match = JSON_SCRIPT.search(html)
+    if match is None:
+        return None
+    return json.loads(match.group(1))
+
+
+def class_xpath(name: Optional[str], class_name: str) -> etree.XPath:
+    """The class_xpath function compiles an XPath matching the elements that have `class_name`
+    among their classes, the same way `soup.find(name, class_=...)` does.
+
+    Args:
+        name (str): the tag name, None for any tag
+        class_name (str): the class to match
+
+    Returns:
+        a compiled XPath object
+    """
+    return etree.XPath(
+        f"//{name or '*'}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+    )
+
+
+def find_subtree_html(html: Union[str, bytes], xpath: etree.XPath) -> Optional[str]:
+    """The find_subtree_html function locates an element with lxml and serializes that element only.
+
+    The page is parsed by libxml2 without creating any Python objects, so a table of contents
+    costs a fraction of the time and memory of a full BeautifulSoup tree. It returns a str, so
+    that it can run in a ParsePool of either kind.
+
+    Args:
+        html (str or bytes): the page
+        xpath (XPath): the compiled XPath of the target element, created once per module
+
+    Returns:
+        a str if the element exists, None otherwise.
+    """
+    if not html:
+        return None
+    matches = xpath(lxml.html.document_fromstring(html))
+    if not matches:
+        return None
+    return etree.tostring(matches[0], encoding="unicode", with_tail=False)
+
+
+def build_subtree(fragment: str) -> Tag:
+    """The build_subtree function builds a BeautifulSoup tree of an element found by `find_subtree_html`.
+
+    Args:
+        fragment (str): the HTML of the element
+
+    Returns:
+        a Tag object
+    """
+    return BeautifulSoup(fragment, "lxml").body.find(True)
+
+
+def find_subtree(html: Union[str, bytes], xpath: etree.XPath) -> Optional[Tag]:
+    """The find_subtree function locates an element with lxml and builds a BeautifulSoup tree of
+    that element only, see `find_subtree_html`.
+
+    Args:
+        html (str or bytes): the page
+        xpath (XPath): the compiled XPath of the target element, created once per module
+
+    Returns:
+        a Tag object if the element exists, None otherwise.
+    """
+    fragment = find_subtree_html(html, xpath)
+    if fragment is None:
+        return None
+    return build_subtree(fragment)
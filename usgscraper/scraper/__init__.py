@@ -1,3 +1,32 @@
-from .jslhr_scraper import JSLHR
-from .jphon_scraper import JPhon
-from .jasa_scraper import JASA
+from usgscraper.util.lazy import lazy_module
+
+
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "JSLHR": ".jslhr_scraper",
+        "JPhon": ".jphon_scraper",
+        "JASA": ".jasa_scraper",
+        "Crawl": ".crawl",
+        "IssueResult": ".crawl",
+        "CrawlResult": ".crawl",
+        "Failure": ".crawl",
+        "Watch": ".watch",
+        "TermFilter": ".filters",
+        "match": ".filters",
+        "ULTRASOUND": ".filters",
+    },
+)
+__all__ = [
+    "JSLHR",
+    "JPhon",
+    "JASA",
+    "Crawl",
+    "IssueResult",
+    "CrawlResult",
+    "Failure",
+    "Watch",
+    "TermFilter",
+    "match",
+    "ULTRASOUND",
+]
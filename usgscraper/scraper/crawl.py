@@ -0,0 +1,275 @@
+import sys
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator, Optional
+from usgscraper.util.converter import jsonify, jsonlify
+from usgscraper.util.database import PaperDatabase
+from usgscraper.util.metrics import get_stats
+from usgscraper.util.progress import Progress
+from usgscraper.util.loop import iterate
+
+
+@dataclass
+class Failure:
+    """
+    The Failure object describes an issue or a paper that could not be scraped, so that it
+    can be retried later.
+    """
+
+    journal: str
+    volume: int
+    issue: Optional[int]
+    url: Optional[str]
+    error: str
+    message: str
+
+    @classmethod
+    def from_exception(
+        cls,
+        journal: str,
+        volume: int,
+        issue: Optional[int],
+        error: BaseException,
+        url: Optional[str] = None,
+    ) -> "Failure":
+        """The from_exception method describes the exception that stopped an issue or a paper.
+
+        Args:
+            journal (str): the journal name
+            volume (int): the volume of a journal
+            issue (int): the issue of a volume
+            error (BaseException): the exception, e.g. a FetchError or the CancelledError of a paper
+            url (str): the page that failed, by default the url of a FetchError
+
+        Returns:
+            a Failure object
+        """
+        return cls(
+            journal=journal,
+            volume=volume,
+            issue=issue,
+            url=url or getattr(error, "url", None),
+            error=error.__class__.__name__,
+            message=str(error),
+        )
+
+
+@dataclass
+class IssueResult:
+    """
+    The IssueResult object keeps the papers of one issue of a journal volume, the DOI or href
+    of every paper, and the failures of the issue or of its papers.
+    """
+
+    journal: str
+    volume: int
+    issue: Optional[int]
+    papers: list[dict[str, Any]]
+    failures: list[Failure] = field(default_factory=list)
+    keys: list[str] = field(default_factory=list)
+
+
+@dataclass
+class CrawlResult:
+    """
+    The CrawlResult object keeps every paper of a crawl, and every failure to retry later.
+    """
+
+    papers: list[dict[str, Any]]
+    failures: list[Failure]
+
+
+@dataclass
+class Crawl:
+    """
+    The Crawl object scrapes many volumes of one or more journals on a single event loop.
+
+    The issues of every volume are read from the journal's issue index, then every issue
+    of every volume is scheduled at once, so the wall time is bounded by the
+    transport's concurrency rather than by the number of volumes, and each issue is
+    yielded as soon as it is complete, or in issue order if `ordered` is set. An issue or
+    paper that fails is kept in `failures` instead of stopping the crawl. With `summary`,
+    the time spent in every stage is printed to stderr once the crawl is over:
+
+        for result in JASA.range(140, 150) + JPhon.range(30, 110):
+            print(result.journal, result.volume, result.issue, len(result.papers))
+
+    Inside a running event loop, the same crawl is iterated with `async for`.
+    """
+
+    scrapers: list = field(default_factory=list)
+    ordered: bool = False
+    summary: bool = False
+    failures: list[Failure] = field(default_factory=list, init=False, repr=False)
+
+    def __add__(self, other: "Crawl") -> "Crawl":
+        return Crawl(
+            [*self.scrapers, *other.scrapers], ordered=self.ordered, summary=self.summary
+        )
+
+    async def extract_issue(self, scraper, issue: Optional[int]) -> IssueResult:
+        """The extract_issue method scrapes a single issue of `scraper`, turning an error into a failure
+        of the issue so that the other issues of the crawl go on.
+
+        Args:
+            scraper: a JASA, JSLHR or JPhon object
+            issue (int): the issue of the volume
+
+        Returns:
+            a IssueResult object
+        """
+        try:
+            return await scraper.extract_issue(issue)
+        except Exception as error:
+            journal = scraper.__class__.__name__
+            return IssueResult(
+                journal=journal,
+                volume=scraper.volume,
+                issue=issue,
+                papers=[],
+                failures=[Failure.from_exception(journal, scraper.volume, issue, error)],
+            )
+
+    async def __aiter__(self) -> AsyncIterator[IssueResult]:
+        issue_lists = await asyncio.gather(
+            *(scraper.discover_issues() for scraper in self.scrapers)
+        )
+        tasks = [
+            asyncio.create_task(self.extract_issue(scraper, issue))
+            for scraper, issues in zip(self.scrapers, issue_lists)
+            for issue in issues
+        ]
+        self.failures = []
+        try:
+            for task in tasks if self.ordered else asyncio.as_completed(tasks):
+                result = await task
+                self.failures.extend(result.failures)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def __iter__(self) -> Iterator[IssueResult]:
+        try:
+            yield from iterate(self.__aiter__())
+        finally:
+            if self.summary:
+                print(get_stats().summary(), file=sys.stderr)
+                print(f"{len(self.failures)} failures", file=sys.stderr)
+
+    async def aiter_papers(self) -> AsyncIterator[dict[str, Any]]:
+        """The aiter_papers method yields the papers of every issue as soon as the issue is
+        complete, on the running event loop and its transport session.
+
+        Returns:
+            an async generator
+        """
+        async for result in self:
+            for paper in result.papers:
+                yield paper
+
+    async def acollect(self) -> CrawlResult:
+        """The acollect method scrapes every issue on the running event loop and keeps the papers
+        and the failures.
+
+        Returns:
+            a CrawlResult object
+        """
+        papers = [paper async for paper in self.aiter_papers()]
+        return CrawlResult(papers=papers, failures=self.failures)
+
+    def collect(self) -> CrawlResult:
+        """The collect method scrapes every issue on a private event loop and keeps the papers
+        and the failures.
+
+        Returns:
+            a CrawlResult object
+        """
+        papers = [paper for result in self for paper in result.papers]
+        return CrawlResult(papers=papers, failures=self.failures)
+
+    def mark_written(self, result: IssueResult) -> None:
+        """The mark_written method marks an issue as written in the manifests of the crawl, and
+        adds its papers to the seen indexes of the crawl."""
+        manifests = {id(scraper.manifest): scraper.manifest for scraper in self.scrapers}
+        for manifest in manifests.values():
+            if manifest is not None:
+                manifest.mark_written(result.journal, result.volume, result.issue)
+        indexes = {id(scraper.seen): scraper.seen for scraper in self.scrapers}
+        for seen in indexes.values():
+            if seen is not None:
+                seen.add(result.keys)
+
+    def write(
+        self,
+        result: IssueResult,
+        to: str = "jsonl",
+        database: Optional[PaperDatabase] = None,
+        **kwargs: Any,
+    ) -> None:
+        """The write method writes an issue to the backend `to` and marks it written. With a seen
+        index, the papers are added to the file of the issue rather than replacing it.
+
+        Args:
+            result (IssueResult): the issue
+            to (str): `json`, `jsonl` or `sqlite`
+            database (PaperDatabase): the database if `to` is `sqlite`
+            kwargs: passed to `jsonify`, `jsonlify` or `PaperDatabase.insert`, e.g. `batch_size`
+        """
+        if to != "sqlite" and any(scraper.seen is not None for scraper in self.scrapers):
+            # only the unseen papers are written, so they are added to those of earlier runs
+            kwargs.setdefault("append", True)
+        if to == "json":
+            jsonify(result.journal, result.volume, result.issue, result.papers, **kwargs)
+        elif to == "jsonl":
+            jsonlify(result.journal, result.volume, result.issue, result.papers, **kwargs)
+        else:
+            database.insert(
+                result.journal, result.volume, result.issue, result.papers, keys=result.keys, **kwargs
+            )
+        self.mark_written(result)
+
+    async def awrite(
+        self,
+        to: str = "jsonl",
+        path: str = "papers.sqlite",
+        progress: Optional[Progress] = None,
+        **kwargs: Any,
+    ) -> None:
+        """The awrite method writes every issue as soon as it is complete, on the running event loop.
+
+        Args:
+            to (str): `json`, `jsonl` or `sqlite`
+            path (str): the database file if `to` is `sqlite`
+            progress (Progress): reports the throughput while the crawl runs
+            kwargs: passed to `write`
+        """
+        database = PaperDatabase(path) if to == "sqlite" else None
+        reporter = asyncio.create_task(progress.run()) if progress else None
+        try:
+            async for result in self:
+                self.write(result, to, database, **kwargs)
+                if progress:
+                    progress.update(result)
+        finally:
+            if reporter:
+                reporter.cancel()
+                progress.report(final=True)
+            if database is not None:
+                database.close()
+
+    def to_json(self) -> None:
+        """The to_json method writes every issue to its own JSON file as soon as it is complete."""
+        for result in self:
+            self.write(result, "json")
+
+    def to_jsonl(self, compress: bool = False, batch_size: int = 50) -> None:
+        """The to_jsonl method streams every issue to its own JSON Lines file as soon as it is complete."""
+        for result in self:
+            self.write(result, "jsonl", compress=compress, batch_size=batch_size)
+
+    def to_sqlite(self, path: str = "papers.sqlite", batch_size: int = 500) -> None:
+        """The to_sqlite method stores every issue in one SQLite database as soon as it is complete."""
+        with PaperDatabase(path) as database:
+            for result in self:
+                self.write(result, "sqlite", database, batch_size=batch_size)
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+
+def iter_text(value: Any) -> Iterator[str]:
+    """The iter_text function yields every string nested in a metadata value.
+
+    Args:
+        value: a str, or a dict or list holding strings, e.g. the authors of a paper
+
+    Returns:
+        a generator
+    """
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_text(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_text(item)
+
+
+@dataclass(frozen=True)
+class TermFilter:
+    """
+    The TermFilter object matches the papers whose metadata fields contain any of its terms,
+    ignoring case.
+
+    JPhon applies it to the table of contents JSON of a paper before the paper page is
+    downloaded; JASA and JSLHR apply it to the cleaned record.
+    """
+
+    terms: tuple[str, ...]
+    fields: tuple[str, ...] = ("title",)
+
+    def __call__(self, metadata: dict[str, Any]) -> bool:
+        text = " ".join(
+            " ".join(iter_text(metadata.get(field))) for field in self.fields
+        ).lower()
+        return any(term.lower() in text for term in self.terms)
+
+
+def match(*terms: str, fields: tuple[str, ...] = ("title",)) -> TermFilter:
+    """The match function creates a filter of the papers mentioning any of `terms`.
+
+    Args:
+        terms (str): the terms to look for
+        fields (tuple): the metadata fields to search
+
+    Returns:
+        a TermFilter object
+    """
+    return TermFilter(terms=terms, fields=fields)
+
+
+ULTRASOUND = match("ultrasound", "ultrasonograph", "tongue", "articulat")
+
+
+def apply_filter(
+    filter: Optional[Callable[[dict], bool]], metadata_list: list[dict]
+) -> list[dict]:
+    """The apply_filter function keeps the papers accepted by `filter`.
+
+    Args:
+        filter (Callable): the filter, None to keep every paper
+        metadata_list (list): the metadata of the papers
+
+    Returns:
+        a list
+    """
+    if filter is None:
+        return metadata_list
+    return [metadata for metadata in metadata_list if filter(metadata)]
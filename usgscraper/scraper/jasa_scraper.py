@@ -1,51 +1,176 @@
 import re
-import pydantic
+import asyncio
 from bs4 import BeautifulSoup
-from dataclasses import dataclass
-from typing import Union, Optional
+from functools import cached_property
+from dataclasses import dataclass, field, replace
+from typing import AsyncIterator, Union, Optional, Iterator, Callable
 from usgscraper.util import convert
+from usgscraper.transport import get_transport, user_agent
+from usgscraper.util.metrics import measure
+from usgscraper.scraper.record import Record
+from usgscraper.scraper.crawl import Crawl, CrawlResult, Failure, IssueResult
+from usgscraper.util.loop import iterate
+from usgscraper.scraper.filters import apply_filter
+from usgscraper.parser.pool import get_parse_pool
+from usgscraper.parser.article import SubtreeCollector, has_class
 from usgscraper.downloader import SingleJASASoupStrategy, AllJASASoupStrategy
+from usgscraper.util.manifest import Manifest, Unit, checkpoint
+from usgscraper.util.seen import SeenIndex, keep_unseen
+from usgscraper.downloader.discovery import get_issue_discovery
+from usgscraper.downloader.jasa_downloader import JASADownloader, find_article_section
 
 
-class JASAInfo(pydantic.BaseModel):
-    title: str
-    published_date: str
-    authors: Union[list, str]
-    href: str
+ARTICLE_DATE = re.compile(r"(?<=(Full|Open)).*")
+DOI_PATH = re.compile(r"(?<=\/)\d.*")
+
+
+def create_author_info(authors: Union[list, str]) -> Union[str, dict[str, str]]:
+    """The create_author_info function numbers the authors of a paper, keeping 'no author' as it is."""
+    if isinstance(authors, str):
+        return authors
+    return {f"auth-{index}": author for index, author in enumerate(authors, 1)}
+
+
+class JASAInfo(Record):
+    """
+    The JASAInfo object keeps the title, published date, authors and href of a paper.
+    """
+
+    __slots__ = ("title", "published_date", "authors", "href")
+    normalizers = {"authors": create_author_info}
 
-    @pydantic.validator("authors")
-    @classmethod
-    def has_author(cls, value) -> Union[str, dict[str, str]]:
-        def create_author_info(authors):
-            key = [f"auth-{author+1}" for author in range(len(authors))]
-            return dict(zip(key, authors))
 
-        if isinstance(value, str):
-            return value
-        return create_author_info(value)
+def find_abstract(soup: BeautifulSoup) -> Optional[str]:
+    """The find_abstract function gets the abstract as a str from the soup object of an article page."""
+    abstract_html = soup.find(class_="abstractSection")
+    if abstract_html:
+        return " ".join(abstract_html.text.split())
+
+
+def find_keywords(soup: BeautifulSoup) -> list[str]:
+    """The find_keywords function gets the topics of an article page as its keywords."""
+    keyword_html = soup.find(class_="topicTags")
+    if keyword_html is None:
+        return []
+    return [keyword.text.strip() for keyword in keyword_html.find_all("a")]
+
+
+def extract_article_details(html: str) -> dict[str, Union[str, list, None]]:
+    """The extract_article_details function extracts the abstract and keywords of an article page.
+
+    It returns a plain dict, so that it can run in a ParsePool of either kind.
+    Args:
+        html (str): the article page, or just its abstract and topics sections
+    Returns:
+        a dict: {'abstract': 'Fisheries surveys ...', 'keywords': ['Acoustic scattering', ...]}
+    """
+    soup = BeautifulSoup(html, "lxml")
+    try:
+        return {"abstract": find_abstract(soup), "keywords": find_keywords(soup)}
+    finally:
+        soup.decompose()
 
 
 @dataclass
 class JASA:
     """
     The JASA object extracts and cleans the data from the Journal of the Acoustical Society of America.
+
+    With `enrich`, the article page of every paper is also downloaded, concurrently within the
+    limits of the transport, and its abstract and keywords are added to the paper.
     """
 
     volume: int
     issue: Optional[int] = None
+    manifest: Optional[Manifest] = field(default=None, repr=False, compare=False)
+    filter: Optional[Callable[[dict], bool]] = field(default=None, compare=False)
+    seen: Optional[SeenIndex] = field(default=None, repr=False, compare=False)
+    enrich: bool = False
+    failures: list[Failure] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    @classmethod
+    def range(
+        cls,
+        start: int,
+        stop: int,
+        manifest: Optional[Manifest] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        seen: Optional[SeenIndex] = None,
+        enrich: bool = False,
+    ) -> Crawl:
+        """The range method creates a crawl over the volumes from `start` up to, but excluding, `stop`.
+
+        Args:
+            start (int): the first volume
+            stop (int): the volume after the last one
+            manifest (Manifest): the manifest to resume the crawl from
+            filter (Callable): keeps only the papers it accepts
+            seen (SeenIndex): skips the papers written by earlier crawls
+            enrich (bool): adds the abstract and keywords of the article pages
+
+        Returns:
+            a Crawl object
+        """
+        return Crawl(
+            [
+                cls(volume=volume, manifest=manifest, filter=filter, seen=seen, enrich=enrich)
+                for volume in range(start, stop)
+            ]
+        )
+
+    async def discover_issues(self) -> list[int]:
+        """The discover_issues method reads the issues of the volume from the journal's issue index."""
+        if self.issue:
+            return [self.issue]
+        return await get_issue_discovery().issues("JASA", self.volume)
+
+    async def aiter_soups(self) -> AsyncIterator[tuple[int, BeautifulSoup]]:
+        """The aiter_soups method yields the article section of every issue, one issue at a time,
+        on the running event loop. A soup is decomposed once the next issue is requested.
+        An issue of a volume that fails to download is kept in `failures` instead.
+
+        Returns:
+            an async generator of (issue, soup) tuples
+        """
+        if self.issue:
+            yield self.issue, await self.asoup()
+            return
+        journal = self.__class__.__name__
+        self.failures = []
 
-    @property
+        def record_failure(issue: int, error: Exception) -> None:
+            self.failures.append(Failure.from_exception(journal, self.volume, issue, error))
+
+        strategy = AllJASASoupStrategy(volume=self.volume)
+        async for issue, soup in strategy.aiter_soups(on_error=record_failure):
+            yield issue, soup
+
+    def soups(self) -> Iterator[tuple[int, BeautifulSoup]]:
+        """The soups method runs `aiter_soups` on a private event loop.
+
+        Returns:
+            a generator of (issue, soup) tuples
+        """
+        return iterate(self.aiter_soups())
+
+    async def asoup(self) -> BeautifulSoup:
+        """The asoup method gets the soup object of `self.issue` on the running event loop.
+
+        Returns:
+            a BeautifulSoup object
+        """
+        if not self.issue:
+            raise ValueError("a volume has a soup per issue, iterate `soups()` instead")
+        return await SingleJASASoupStrategy(volume=self.volume, issue=self.issue).acreate_soup()
+
+    @cached_property
     def soup(self) -> BeautifulSoup:
-        """The soup property set the soup object based on the volume and issue number.
+        """The soup property runs `asoup` on a private event loop once and keeps the soup.
 
         Returns:
             a BeautifulSoup object
         """
-        if self.issue:
-            return SingleJASASoupStrategy(
-                volume=self.volume, issue=self.issue
-            ).create_soup()
-        return AllJASASoupStrategy(volume=self.volume, issue=None).create_soup()
+        return get_transport().run(self.asoup())
 
     def create_href(self, doi: str) -> str:
         """The create_href method creates a href based on the doi.
@@ -53,9 +178,18 @@ class JASA:
         Returns:
             a str
         """
-        href = re.search("(?<=\/)\d.*", doi).group()
+        href = DOI_PATH.search(doi).group()
         return f"https://asa.scitation.org/doi/full/{href}"
 
+    def find_doi(self, article_html: BeautifulSoup) -> Optional[str]:
+        """The find_doi method finds the DOI of a paper without parsing its other fields.
+
+        Returns:
+            a str if the paper has a DOI, None otherwise.
+        """
+        meta = article_html.find(class_="meta-article")
+        return meta.a.text.strip() if meta and meta.a else None
+
     def create_author_list(self, author_html: BeautifulSoup) -> Union[list, str]:
         """The create_author_list method creates a list of authors
 
@@ -68,6 +202,30 @@ class JASA:
         except AttributeError:
             return "no author"
 
+    def extract_fields(self, article_html: BeautifulSoup) -> dict[str, Union[str, list]]:
+        """The extract_fields method finds the raw fields of a paper in the argument `article_html`.
+
+        Args:
+            article_html (BeautifulSoup): the BeautifulSoup object with paper info.
+
+        Returns:
+            a dict with the fields of a JASAInfo object
+        """
+        title = article_html.find(class_="hlFld-Title").text.strip()
+        date = article_html.find(class_="open-access item-access").text.strip()
+        article_date = ARTICLE_DATE.search(date).group()
+        doi = article_html.find(class_="meta-article").a.text.strip()
+        href = self.create_href(doi)
+        author_html = article_html.find(class_="entryAuthor")
+        authors = self.create_author_list(author_html)
+        return {
+            "title": title,
+            "published_date": article_date,
+            "authors": authors,
+            "href": href,
+        }
+
+    @measure("clean_data")
     def clean_data(self, article_html: BeautifulSoup) -> dict[str, Union[str, list]]:
         """The clean_data method cleans the BeautifulSoup object from the argument `article_html`.
 
@@ -89,29 +247,175 @@ class JASA:
                 'href': 'https://asa.scitation.org/doi/full/10.1121/10.0006449',
                 }
         """
+        return JASAInfo(**self.extract_fields(article_html)).dict()
 
-        title = article_html.find(class_="hlFld-Title").text.strip()
-        date = article_html.find(class_="open-access item-access").text.strip()
-        article_date = re.search("(?<=(Full|Open)).*", date).group()
-        doi = article_html.find(class_="meta-article").a.text.strip()
-        href = self.create_href(doi)
-        author_html = article_html.find(class_="entryAuthor")
-        authors = self.create_author_list(author_html)
+    async def aiter_papers(self) -> AsyncIterator[dict[str, Union[str, list]]]:
+        """The aiter_papers method extracts the papers issue by issue, in issue order, on the
+        running event loop and its transport session.
+
+        Returns:
+            an async generator
+        """
+        async for result in Crawl([self], ordered=True):
+            for paper in result.papers:
+                yield paper
+
+    def extract_data(self) -> Iterator[dict[str, Union[str, list]]]:
+        """The extract_data method extracts the papers issue by issue, in issue order.
+
+        It drives `aiter_papers` on a private event loop, so it cannot be called inside a running one.
+
+        Returns:
+            a generator
+        """
+        return iterate(self.aiter_papers())
+
+    async def acollect(self) -> CrawlResult:
+        """The acollect method extracts the papers on the running event loop, keeping the issues
+        and papers that failed apart instead of stopping at the first error.
+
+        Returns:
+            a CrawlResult object
+        """
+        return await Crawl([self], ordered=True).acollect()
+
+    def collect(self) -> CrawlResult:
+        """The collect method runs `acollect` on a private event loop.
+
+        Returns:
+            a CrawlResult object
+        """
+        return Crawl([self], ordered=True).collect()
+
+    async def collect_article(self, href: str) -> SubtreeCollector:
+        """The collect_article method streams an article page until its abstract and topics are parsed.
+        Args:
+            href (str): the link to a paper
+        Returns:
+            a SubtreeCollector object
+        """
+        collector = SubtreeCollector(
+            {"abstract": has_class("abstractSection"), "keywords": has_class("topicTags")}
+        )
+        await get_transport().astream(href, collector.feed, headers={"user-agent": user_agent()})
+        return collector
+
+    async def enrich_paper(self, paper: dict, issue: int) -> dict[str, Union[str, list]]:
+        """The enrich_paper method adds the abstract and keywords of the article page of a paper.
+
+        With a manifest, a paper that was enriched by an earlier run is not downloaded again.
+        Args:
+            paper (dict): the cleaned paper, see `clean_data`
+            issue (int): the issue of the paper
+        Returns:
+            a dict with the fields of the paper, `abstract` and `keywords`
+        """
+
+        async def fetch_article() -> str:
+            collector = await self.collect_article(paper["href"])
+            return collector.html()
 
-        jasa_info = JASAInfo(
-            title=title, published_date=article_date, authors=authors, href=href
+        async def parse_article(html: str) -> dict[str, Union[str, list]]:
+            details = await get_parse_pool().run(extract_article_details, html)
+            return {**paper, **details}
+
+        unit = Unit(self.__class__.__name__, self.volume, issue, paper["href"])
+        return await checkpoint(self.manifest, unit, fetch_article, parse_article)
+
+    async def enrich_papers(self, papers: list[dict], issue: int) -> IssueResult:
+        """The enrich_papers method enriches the papers of an issue concurrently.
+
+        A paper whose article page fails, or whose task is cancelled, is kept as a failure of the issue instead.
+        Args:
+            papers (list): the cleaned papers of the issue
+            issue (int): the issue of the papers
+        Returns:
+            a IssueResult object
+        """
+        journal = self.__class__.__name__
+        results = await asyncio.gather(
+            *[self.enrich_paper(paper, issue) for paper in papers], return_exceptions=True
         )
-        return jasa_info.dict()
+        enriched = [paper for paper in results if not isinstance(paper, BaseException)]
+        return IssueResult(
+            journal,
+            self.volume,
+            issue,
+            enriched,
+            keys=[paper["href"] for paper in enriched],
+            failures=[
+                Failure.from_exception(journal, self.volume, issue, error, url=paper["href"])
+                for paper, error in zip(papers, results)
+                if isinstance(error, BaseException)
+            ],
+        )
+
+    async def extract_issue(self, issue: int) -> IssueResult:
+        """The extract_issue method downloads and cleans a single issue on the running event loop.
 
-    def extract_data(self) -> map:
-        """The extract_data method extracts the BeautifulSoup object from `article_html_list`.
+        With `enrich`, the papers that pass the filter are enriched before the issue is returned.
+
+        Args:
+            issue (int): the issue of the volume
 
         Returns:
-            a map object
+            a IssueResult object
         """
-        article_html_list = self.soup.findAll("section", class_="card")
-        return map(self.clean_data, article_html_list)
+        strategy = SingleJASASoupStrategy(volume=self.volume, issue=issue)
+        url = JASADownloader(volume=self.volume, issue=issue).url
+        # the filter may not be picklable, so it is left out of a process pool
+        parse_issue = replace(self, filter=None).parse_issue
+        papers = await checkpoint(
+            self.manifest,
+            Unit(self.__class__.__name__, self.volume, issue, url),
+            strategy.afetch_page,
+            lambda html: get_parse_pool().run(parse_issue, html),
+        )
+        # papers stored by the manifest before they were seen are dropped here
+        papers = apply_filter(self.filter, papers)
+        papers = keep_unseen(self.seen, papers, [paper["href"] for paper in papers])
+        if self.enrich:
+            return await self.enrich_papers(papers, issue)
+        return IssueResult(
+            self.__class__.__name__,
+            self.volume,
+            issue,
+            papers,
+            keys=[paper["href"] for paper in papers],
+        )
+
+    def parse_issue(self, html: str) -> list[dict[str, Union[str, list]]]:
+        """The parse_issue method extracts the cleaned data of every paper of a table of contents page.
+
+        It returns plain dicts, so that it can run in a ParsePool of either kind, and validates
+        the papers of the issue in one batch. Papers in `self.seen` are not parsed. The tree
+        is freed before the method returns.
+
+        Args:
+            html (str): the table of contents page
+
+        Returns:
+            a list
+        """
+        soup = find_article_section(html)
+        if isinstance(soup, str):
+            return []
+        try:
+            cards = soup.find_all("section", class_="card")
+            cards = keep_unseen(self.seen, cards, map(self.find_doi, cards))
+            return JASAInfo.validate_many(map(self.extract_fields, cards))
+        finally:
+            # the tree is full of reference cycles, so it would wait for the cyclic collector
+            soup.decompose()
 
     @convert("json")
     def to_json(self) -> None:
         return
+
+    @convert("jsonl")
+    def to_jsonl(self, compress: bool = False, batch_size: int = 50):
+        return
+
+    @convert("sqlite")
+    def to_sqlite(self, path: str = "papers.sqlite", batch_size: int = 500):
+        return
@@ -1,117 +1,153 @@
 import re
 import asyncio
-import aiohttp
-import pydantic
-from functools import reduce
 from bs4 import BeautifulSoup
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from usgscraper.util import convert
-from fake_useragent import UserAgent
-from typing import Optional, Union, Any
-from usgscraper.downloader import SingleJSONStrategy, AllJSONStrategy
+from usgscraper.util.metrics import get_stats
+from usgscraper.scraper.record import Record
+from usgscraper.scraper.crawl import Crawl, CrawlResult, Failure, IssueResult
+from usgscraper.util.loop import iterate
+from usgscraper.scraper.filters import apply_filter
+from typing import AsyncIterator, Optional, Union, Iterator, Callable
+from usgscraper.transport import get_transport, user_agent
+from usgscraper.parser.pool import get_parse_pool
+from usgscraper.parser.article import SubtreeCollector, has_class, has_id
+from usgscraper.downloader import SingleJSONStrategy
+from usgscraper.downloader.jphon_downloader import parse_articles
+from usgscraper.util.manifest import Manifest, Unit, checkpoint
+from usgscraper.util.seen import SeenIndex, keep_unseen
+from usgscraper.downloader.discovery import get_issue_discovery
 
 
-HEADERS = {"user-agent": UserAgent().google}
+ABSTRACT = re.compile(r"(?<=Abstract).*")
 
 
-class JPhonInfo(pydantic.BaseModel):
+def create_author_info(authors: list[dict]) -> Union[str, list[dict[str, str]]]:
+    """The create_author_info function keeps the id and full name of every author of a paper."""
+    if not authors:
+        return "no author"
+    return [
+        {author["id"]: f'{author["givenName"]} {author["surname"]}'} for author in authors
+    ]
+
+
+class JPhonInfo(Record):
     """
-    The JPhonInfo object keeps track of an item in inventory, including title, published date, authors, doi and href.
+    The JPhonInfo object keeps the title, published date, authors, keywords and abstract of a paper.
     """
 
-    title: str
-    published_date: str
-    authors: list
-    #     doi: str
-    # href: str
-    keywords: Any
-    abstract: Any
+    __slots__ = ("title", "published_date", "authors", "keywords", "abstract")
+    normalizers = {"authors": create_author_info}
 
-    @pydantic.validator("authors")
-    @classmethod
-    def has_author(cls, author) -> str:
-        """The has_author method makes sure there is author value definied."""
 
-        def extract_author(value):
-            auth_id = value["id"]
-            full_name = f'{value["givenName"]} {value["surname"]}'
-            return {auth_id: full_name}
+def find_keywords(soup: BeautifulSoup) -> Optional[str]:
+    """The find_keywords function gets the keywords as a str from a soup object
+    Args:
+        soup (BeautifulSoup): the soup object
+    Returns:
+        a str
+    """
+    keyword_html = soup.find(class_="keywords-section")
+    if keyword_html:
+        keyword_list = [keyword.text for keyword in keyword_html][1:]
+        return " ".join(keyword_list)
 
-        if not author:
-            return "no author"
-        return list(map(extract_author, author))
 
-    @pydantic.validator("keywords", "abstract")
-    @classmethod
-    def has_content(cls, value):
-        """The has_content method makes sure there is keyword or abstract value definied"""
-        output = asyncio.run(value)
-        if output == None:
-            return None
-        return output
+def find_abstract(soup: BeautifulSoup) -> Optional[str]:
+    """The find_abstract function gets the abstract as a str from a soup object
+    Args:
+        soup (BeautifulSoup): the soup object
+    Returns:
+        a str
+    """
+    abstract_html = soup.find(id="abstracts")
+    if abstract_html:
+        abstract = ABSTRACT.search(abstract_html.text).group()
+        return abstract
+
+
+def extract_paper_details(html: str) -> dict[str, Optional[str]]:
+    """The extract_paper_details function extracts the keywords and abstract of an article page.
+
+    It returns a plain dict, so that it can run in a ParsePool of either kind.
+    Args:
+        html (str): the article page, or just its abstract and keywords sections
+    Returns:
+        a dict: {'keywords': 'Glottal stops ... Hawaiian', 'abstract': 'Much of the ...'}
+    """
+    soup = BeautifulSoup(html, "lxml")
+    try:
+        return {"keywords": find_keywords(soup), "abstract": find_abstract(soup)}
+    finally:
+        soup.decompose()
 
 
 @dataclass
 class JPhon:
     volume: int
     issue: Optional[int] = None
+    manifest: Optional[Manifest] = field(default=None, repr=False, compare=False)
+    filter: Optional[Callable[[dict], bool]] = field(default=None, compare=False)
+    seen: Optional[SeenIndex] = field(default=None, repr=False, compare=False)
 
-    def download_json_data(self) -> list[dict[str, Union[str, list]]]:
-        """The download_json_data method downloads the json data.
-
-        Returns:
-            a list
-        """
-        if self.volume > 42:
-            return SingleJSONStrategy(
-                volume=self.volume, issue=self.issue
-            ).download_json()
-        data_collection = asyncio.run(
-            AllJSONStrategy(volume=self.volume).download_json()
-        )
-        return reduce(lambda x, y: x + y, data_collection)
+    @classmethod
+    def range(
+        cls,
+        start: int,
+        stop: int,
+        manifest: Optional[Manifest] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        seen: Optional[SeenIndex] = None,
+    ) -> Crawl:
+        """The range method creates a crawl over the volumes from `start` up to, but excluding, `stop`.
 
-    async def get_keywords(self, soup: BeautifulSoup) -> list[str]:
-        """The get_keywords method gets the keywords as a list from a soup object
         Args:
-            soup (BeautifulSoup): the soup object
-        Returns:
-            a list
-        """
-        keyword_html = soup.find(class_="keywords-section")
-        if keyword_html:
-            keyword_list = [keyword.text for keyword in keyword_html][1:]
-            return " ".join(keyword_list)
+            start (int): the first volume
+            stop (int): the volume after the last one
+            manifest (Manifest): the manifest to resume the crawl from
+            filter (Callable): keeps only the papers it accepts
+            seen (SeenIndex): skips the papers written by earlier crawls
 
-    async def get_abstract(self, soup: BeautifulSoup) -> str:
-        """The get_abstract method gets the abstract as a str from a soup object
-        Args:
-            soup (BeautifulSoup): the soup object
         Returns:
-            a str
+            a Crawl object
         """
-        abstract_html = soup.find(id="abstracts")
-        if abstract_html:
-            abstract = re.search("(?<=Abstract).*", abstract_html.text).group()
-            return abstract
+        return Crawl(
+            [
+                cls(volume=volume, manifest=manifest, filter=filter, seen=seen)
+                for volume in range(start, stop)
+            ]
+        )
+
+    async def discover_issues(self) -> list[Optional[int]]:
+        """The discover_issues method reads the issues of the volume from the journal's issue index."""
+        if self.issue:
+            return [self.issue]
+        return await get_issue_discovery().issues("JPhon", self.volume)
 
-    async def get_paper_soup(self, href: str) -> BeautifulSoup:
-        """THe get_soup method gets the soup object from href
+    async def collect_paper(self, href: str) -> SubtreeCollector:
+        """The collect_paper method streams an article page until its abstract and keywords are parsed.
         Args:
             href (str): the link to a paper
         Returns:
-            a BeautifulSoup object
+            a SubtreeCollector object
         """
-        async with aiohttp.ClientSession(headers=HEADERS) as session:
-            async with session.get(href) as response:
-                html = await response.text()
-                soup = BeautifulSoup(html, "lxml")
-                return soup
+        collector = SubtreeCollector(
+            {"abstract": has_id("abstracts"), "keywords": has_class("keywords-section")}
+        )
+        await get_transport().astream(
+            href, collector.feed, headers={"user-agent": user_agent()}
+        )
+        return collector
 
-    async def clean_data(self, json_data: dict) -> dict[str, Union[str, list]]:
+    async def clean_data(
+        self, json_data: dict, issue: Optional[int] = None
+    ) -> dict[str, Union[str, list]]:
         """The clean_data method cleans the JSON data from the class property `self.json_data`.
+
+        With a manifest, a paper that was cleaned by an earlier run is not downloaded again.
         Args:
             json_data (dict): paper info
+            issue (int): the issue of the paper
         Returns:
             a dict: {
                 'title': 'Effects of word position and flanking vowel on the implementation of glottal stop: Evidence from Hawaiian',
@@ -128,31 +164,158 @@ class JPhon:
             }
         """
 
-        title = json_data["title"]
-        # doi = json_data["doi"]
         href = f'https://www.sciencedirect.com{json_data["href"]}'
-        paper_soup = await asyncio.create_task(self.get_paper_soup(href))
-        keywords = asyncio.create_task(self.get_keywords(paper_soup))
-        abstract = asyncio.create_task(self.get_abstract(paper_soup))
-        published_date = json_data["coverDateText"]
-        authors = json_data["authors"]
-
-        article_info = JPhonInfo(
-            title=title,
-            published_date=published_date,
-            authors=authors,
-            # doi=doi,
-            # href=href,
-            keywords=keywords,
-            abstract=abstract,
+
+        async def fetch_paper() -> str:
+            collector = await self.collect_paper(href)
+            return collector.html()
+
+        async def parse_paper(html: str) -> dict[str, Union[str, list]]:
+            details = await get_parse_pool().run(extract_paper_details, html)
+            with get_stats().timer("clean_data"):
+                article_info = JPhonInfo(
+                    title=json_data["title"],
+                    published_date=json_data["coverDateText"],
+                    authors=json_data["authors"],
+                    keywords=details["keywords"],
+                    abstract=details["abstract"],
+                )
+                return article_info.dict()
+
+        unit = Unit(self.__class__.__name__, self.volume, issue, href)
+        return await checkpoint(self.manifest, unit, fetch_paper, parse_paper)
+
+    async def aiter_papers(self) -> AsyncIterator[dict[str, str]]:
+        """The aiter_papers method extracts the papers issue by issue, in issue order, on the
+        running event loop and its transport session.
+
+        Returns:
+            an async generator
+        """
+        async for result in Crawl([self], ordered=True):
+            for paper in result.papers:
+                yield paper
+
+    def extract_data(self) -> Iterator[dict[str, str]]:
+        """The extract_data method extracts the papers issue by issue, in issue order.
+
+        It drives `aiter_papers` on a private event loop, so it cannot be called inside a running one.
+
+        Returns:
+            a generator
+        """
+        return iterate(self.aiter_papers())
+
+    async def acollect(self) -> CrawlResult:
+        """The acollect method extracts the papers on the running event loop, keeping the issues
+        and papers that failed apart instead of stopping at the first error.
+
+        Returns:
+            a CrawlResult object
+        """
+        return await Crawl([self], ordered=True).acollect()
+
+    def collect(self) -> CrawlResult:
+        """The collect method runs `acollect` on a private event loop.
+
+        Returns:
+            a CrawlResult object
+        """
+        return Crawl([self], ordered=True).collect()
+
+    def find_key(self, json_data: dict) -> str:
+        """The find_key method gets the DOI of a paper from its JSON data, or its href if it has none."""
+        return json_data.get("doi") or json_data["href"]
+
+    async def list_articles(self, issue: Optional[int]) -> Optional[list[dict]]:
+        """The list_articles method downloads the table of contents of a single issue and keeps the
+        articles that pass `self.filter` and are not in `self.seen`.
+
+        Args:
+            issue (int): the issue of the volume
+
+        Returns:
+            a list of the JSON data of every article, None if the issue does not exist
+        """
+        strategy = SingleJSONStrategy(volume=self.volume, issue=issue)
+        url = strategy.create_url(issue)
+        json_data = await checkpoint(
+            self.manifest,
+            Unit(self.__class__.__name__, self.volume, issue, url),
+            lambda: strategy.afetch_page(url),
+            lambda html: get_parse_pool().run(parse_articles, html),
+        )
+        if isinstance(json_data, str):
+            return None
+        articles = apply_filter(self.filter, json_data)
+        return keep_unseen(self.seen, articles, map(self.find_key, articles))
+
+    async def extract_articles(self, articles: list[dict], issue: Optional[int]) -> IssueResult:
+        """The extract_articles method downloads and cleans the articles of an issue concurrently.
+
+        A paper that fails, or whose task is cancelled, is kept as a failure of the issue, the other
+        papers are still returned.
+
+        Args:
+            articles (list): the JSON data of the articles, see `list_articles`
+            issue (int): the issue of the volume
+
+        Returns:
+            a IssueResult object
+        """
+        journal = self.__class__.__name__
+        results = await asyncio.gather(
+            *[self.clean_data(article, issue) for article in articles],
+            return_exceptions=True,
+        )
+        return IssueResult(
+            journal,
+            self.volume,
+            issue,
+            papers=[paper for paper in results if not isinstance(paper, BaseException)],
+            keys=[
+                self.find_key(article)
+                for article, paper in zip(articles, results)
+                if not isinstance(paper, BaseException)
+            ],
+            failures=[
+                Failure.from_exception(
+                    journal,
+                    self.volume,
+                    issue,
+                    error,
+                    url=f'https://www.sciencedirect.com{article["href"]}',
+                )
+                for article, error in zip(articles, results)
+                if isinstance(error, BaseException)
+            ],
         )
-        return article_info.dict()
 
-    def extract_data(self) -> list[dict[str, str]]:
-        json_data = self.download_json_data()
-        tasks = map(self.clean_data, json_data)
-        return asyncio.run(asyncio.gather(*tasks))
+    async def extract_issue(self, issue: Optional[int]) -> IssueResult:
+        """The extract_issue method downloads and cleans a single issue on the running event loop.
+
+        A paper that fails is kept as a failure of the issue, the other papers are still returned.
+        Papers in `self.seen` are neither downloaded nor parsed.
+
+        Args:
+            issue (int): the issue of the volume
+
+        Returns:
+            a IssueResult object
+        """
+        articles = await self.list_articles(issue)
+        if articles is None:
+            return IssueResult(self.__class__.__name__, self.volume, issue, [])
+        return await self.extract_articles(articles, issue)
 
     @convert('json')
     def to_json(self):
-        return 
+        return
+
+    @convert("jsonl")
+    def to_jsonl(self, compress: bool = False, batch_size: int = 50):
+        return
+
+    @convert("sqlite")
+    def to_sqlite(self, path: str = "papers.sqlite", batch_size: int = 500):
+        return
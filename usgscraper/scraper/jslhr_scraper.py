@@ -1,61 +1,73 @@
 import re
-import asyncio
-import pydantic
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from usgscraper.util import convert
-from typing import Optional, Any, Union
+from usgscraper.util.metrics import measure
+from usgscraper.scraper.record import Record
+from usgscraper.scraper.crawl import Crawl, CrawlResult, Failure, IssueResult
+from usgscraper.util.loop import iterate
+from usgscraper.scraper.filters import apply_filter
+from usgscraper.transport import get_transport
+from typing import AsyncIterator, Optional, Any, Union, Iterator, Callable
 from usgscraper.downloader import (
-    DownloadingJSLHRSoupStrategy,
     SingleJSLHRSoupStrategy,
     AllJSLHRSoupStrategy,
 )
+from usgscraper.parser.pool import get_parse_pool
+from usgscraper.util.manifest import Manifest, Unit, checkpoint
+from usgscraper.util.seen import SeenIndex, keep_unseen
+from usgscraper.downloader.discovery import get_issue_discovery
+from usgscraper.downloader.jslhr_downloader import find_titled_issues
 
 
-class JSLHRInfo(pydantic.BaseModel):
-    """
-    The JSLHRInfo object keeps track of an item in inventory, including title, published date, authors, and abstract.
-    """
+PUBLISHED_DATE = re.compile(r"\w*.\d{4}$")
 
-    title: Any
-    published_date: Any
-    authors: Union[list, str]
-    abstract: Any
 
-    @pydantic.validator("authors")
-    @classmethod
-    def has_author(cls, authors: Union[list, str]) -> Union[str, dict[str, str]]:
-        """The has_author method makes sure there is author value definied."""
+def create_author_info(authors: Union[list, str]) -> Union[str, dict[str, str]]:
+    """The create_author_info function numbers the authors of a paper from their links."""
+    if isinstance(authors, str):
+        return authors
+    return {
+        f"auth-{index}": author["title"].strip() for index, author in enumerate(authors, 1)
+    }
 
-        def create_author_info(author_list: list) -> dict[str, str]:
-            key = [f"auth-{author+1}" for author in range(len(author_list))]
-            return dict(zip(key, author_list))
 
-        author_list = [value["title"].strip() for value in authors]
-        if isinstance(authors, str):
-            return authors
-        return create_author_info(author_list)
+def create_date(date: Optional[str]) -> str:
+    """The create_date function finds the published date at the end of an issue item header."""
+    match = PUBLISHED_DATE.search(date) if date else None
+    return match.group() if match else "no date"
 
-    @pydantic.validator("published_date")
-    @classmethod
-    def has_date(cls, date: Any) -> str:
-        """The has_date method makes sure there is published_date value definied."""
 
-        def create_date(soup_date: BeautifulSoup) -> str:
-            is_date = re.compile("\w*.\d{4}$")
-            return re.search(is_date, soup_date).group()
+def create_content(value: Optional[BeautifulSoup]) -> str:
+    """The create_content function collapses the whitespace of the text of a title or abstract."""
+    if not value:
+        return "no info"
+    return " ".join(value.text.split())
 
-        if not date:
-            return "no date"
-        return create_date(date)
 
-    @pydantic.validator("title", "abstract")
-    @classmethod
-    def has_content(cls, value: Any) -> str:
-        """The has_content method makes sure there is title or abstract value definied"""
-        if not value:
-            return "no info"
-        return " ".join(value.text.strip().split())
+def create_key(paper: dict[str, Any]) -> str:
+    """The create_key function identifies a paper by its href, or if it has no link, by its title,
+    authors and abstract, so that two papers titled e.g. "no info" are told apart."""
+    if paper["href"]:
+        return paper["href"]
+    authors = paper["authors"]
+    names = ", ".join(authors.values()) if isinstance(authors, dict) else authors
+    return f'{paper["title"]} / {names} / {paper["abstract"]}'
+
+
+class JSLHRInfo(Record):
+    """
+    The JSLHRInfo object keeps the title, published date, authors, abstract and href of a paper.
+    """
+
+    __slots__ = ("title", "published_date", "authors", "abstract", "href")
+    normalizers = {
+        "title": create_content,
+        "published_date": create_date,
+        "authors": create_author_info,
+        "abstract": create_content,
+    }
 
 
 @dataclass
@@ -66,55 +78,236 @@ class JSLHR:
 
     volume: int
     issue: Optional[int] = None
+    manifest: Optional[Manifest] = field(default=None, repr=False, compare=False)
+    filter: Optional[Callable[[dict], bool]] = field(default=None, compare=False)
+    seen: Optional[SeenIndex] = field(default=None, repr=False, compare=False)
+    failures: list[Failure] = field(default_factory=list, init=False, repr=False, compare=False)
 
-    def merge_soup(self, soup_list: list) -> BeautifulSoup:
-        """The merge_soup method converts a list of soup objects to a single soup object.
+    @classmethod
+    def range(
+        cls,
+        start: int,
+        stop: int,
+        manifest: Optional[Manifest] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        seen: Optional[SeenIndex] = None,
+    ) -> Crawl:
+        """The range method creates a crawl over the volumes from `start` up to, but excluding, `stop`.
 
         Args:
-            soup_list (list): the list of soup objects
+            start (int): the first volume
+            stop (int): the volume after the last one
+            manifest (Manifest): the manifest to resume the crawl from
+            filter (Callable): keeps only the papers it accepts
+            seen (SeenIndex): skips the papers written by earlier crawls
 
         Returns:
-            a list
+            a Crawl object
         """
-        filterd_list = list(filter(lambda value: "no such issue" != value, soup_list))
-        pseudo_soup = BeautifulSoup("<body></body>", "lxml")
-        for soup in filterd_list:
-            pseudo_soup.append(soup)
-        return pseudo_soup
-
-    def extract_soup(self) -> DownloadingJSLHRSoupStrategy:
-        """The extract_soup method extracts the soup object based on `self.volume` and `self.issue`."""
-        if self.issue:
-            return SingleJSLHRSoupStrategy(
-                volume=self.volume, issue=self.issue
-            ).create_soup()
-        soup_list = asyncio.run(
-            AllJSLHRSoupStrategy(volume=self.volume, issue=None).create_soup()
+        return Crawl(
+            [
+                cls(volume=volume, manifest=manifest, filter=filter, seen=seen)
+                for volume in range(start, stop)
+            ]
         )
-        return self.merge_soup(soup_list)
 
-    def clean_data(self, article_html: BeautifulSoup) -> dict[str, Union[str, list]]:
+    async def discover_issues(self) -> list[int]:
+        """The discover_issues method reads the issues of the volume from the journal's issue index."""
+        if self.issue:
+            return [self.issue]
+        return await get_issue_discovery().issues("JSLHR", self.volume)
+
+    async def aiter_soups(self) -> AsyncIterator[tuple[int, BeautifulSoup]]:
+        """The aiter_soups method yields the article list of every issue, one issue at a time,
+        on the running event loop. A soup is decomposed once the next issue is requested.
+        An issue of a volume that fails to download is kept in `failures` instead.
+
+        Returns:
+            an async generator of (issue, soup) tuples
+        """
+        if self.issue:
+            yield self.issue, await self.aextract_soup()
+            return
+        journal = self.__class__.__name__
+        self.failures = []
+
+        def record_failure(issue: int, error: Exception) -> None:
+            self.failures.append(Failure.from_exception(journal, self.volume, issue, error))
+
+        strategy = AllJSLHRSoupStrategy(volume=self.volume)
+        async for issue, soup in strategy.aiter_soups(on_error=record_failure):
+            yield issue, soup
+
+    def soups(self) -> Iterator[tuple[int, BeautifulSoup]]:
+        """The soups method runs `aiter_soups` on a private event loop.
+
+        Returns:
+            a generator of (issue, soup) tuples
+        """
+        return iterate(self.aiter_soups())
+
+    async def aextract_soup(self) -> BeautifulSoup:
+        """The aextract_soup method extracts the soup object of `self.issue` on the running event loop."""
+        if not self.issue:
+            raise ValueError("a volume has a soup per issue, iterate `soups()` instead")
+        return await SingleJSLHRSoupStrategy(volume=self.volume, issue=self.issue).acreate_soup()
+
+    def extract_soup(self) -> BeautifulSoup:
+        """The extract_soup method runs `aextract_soup` on a private event loop."""
+        return get_transport().run(self.aextract_soup())
+
+    def find_href(self, article_html: BeautifulSoup) -> Optional[str]:
+        """The find_href method finds the link to a paper in its title.
+
+        Returns:
+            a str if the title links to the paper, None otherwise.
+        """
+        title = article_html.find("div", class_="issue-item__title")
+        link = title.find("a", href=True) if title else None
+        return urljoin("https://pubs.asha.org", link["href"]) if link else None
+
+    def find_key(self, article_html: BeautifulSoup) -> str:
+        """The find_key method finds the key of a paper, see `create_key`. Only a paper without a
+        link is parsed for it."""
+        href = self.find_href(article_html)
+        if href:
+            return href
+        return create_key(JSLHRInfo(**self.extract_fields(article_html)).dict())
+
+    def extract_fields(self, article_html: BeautifulSoup) -> dict[str, Any]:
+        """The extract_fields method finds the raw fields of a paper in the argument `article_html`.
+
+        Args:
+            article_html (BeautifulSoup): the BeautifulSoup object with paper info.
+
+        Returns:
+            a dict with the fields of a JSLHRInfo object
+        """
         title = article_html.find("div", class_="issue-item__title")
         date = article_html.find("div", class_="issue-item__header").text
         abstract = article_html.find("div", class_="accordion__content card--shadow")
         authors = article_html.find("div", class_="issue-item__authors").ul.find_all(
             "a"
         )
+        return {
+            "title": title,
+            "published_date": date,
+            "authors": authors,
+            "abstract": abstract,
+            "href": self.find_href(article_html),
+        }
+
+    @measure("clean_data")
+    def clean_data(self, article_html: BeautifulSoup) -> dict[str, Union[str, list]]:
+        """The clean_data method cleans the BeautifulSoup object from the argument `article_html`.
+
+        Args:
+            article_html (BeautifulSoup): the BeautifulSoup object with paper info.
+
+        Returns:
+            a dict
+        """
+        return JSLHRInfo(**self.extract_fields(article_html)).dict()
+
+    async def aiter_papers(self) -> AsyncIterator[dict[str, Union[str, list]]]:
+        """The aiter_papers method extracts the papers issue by issue, in issue order, on the
+        running event loop and its transport session.
+
+        Returns:
+            an async generator
+        """
+        async for result in Crawl([self], ordered=True):
+            for paper in result.papers:
+                yield paper
+
+    def extract_data(self) -> Iterator[dict[str, Union[str, list]]]:
+        """The extract_data method extracts the papers issue by issue, in issue order.
+
+        It drives `aiter_papers` on a private event loop, so it cannot be called inside a running one.
+
+        Returns:
+            a generator
+        """
+        return iterate(self.aiter_papers())
+
+    async def acollect(self) -> CrawlResult:
+        """The acollect method extracts the papers on the running event loop, keeping the issues
+        and papers that failed apart instead of stopping at the first error.
 
-        jslhr_info = JSLHRInfo(
-            title=title, published_date=date, abstract=abstract, authors=authors
+        Returns:
+            a CrawlResult object
+        """
+        return await Crawl([self], ordered=True).acollect()
+
+    def collect(self) -> CrawlResult:
+        """The collect method runs `acollect` on a private event loop.
+
+        Returns:
+            a CrawlResult object
+        """
+        return Crawl([self], ordered=True).collect()
+
+    async def extract_issue(self, issue: int) -> IssueResult:
+        """The extract_issue method downloads and cleans a single issue on the running event loop.
+
+        Args:
+            issue (int): the issue of the volume
+
+        Returns:
+            a IssueResult object
+        """
+        strategy = SingleJSLHRSoupStrategy(volume=self.volume, issue=issue)
+        # the filter may not be picklable, so it is left out of a process pool
+        parse_issue = replace(self, filter=None).parse_issue
+        papers = await checkpoint(
+            self.manifest,
+            Unit(self.__class__.__name__, self.volume, issue, strategy.url),
+            strategy.afetch_page,
+            lambda html: get_parse_pool().run(parse_issue, html),
         )
-        return jslhr_info.dict()
+        # papers stored by the manifest before they were seen are dropped here
+        papers = apply_filter(self.filter, papers)
+        papers = keep_unseen(self.seen, papers, [create_key(paper) for paper in papers])
+        return IssueResult(
+            self.__class__.__name__,
+            self.volume,
+            issue,
+            papers,
+            keys=[create_key(paper) for paper in papers],
+        )
+
+    def parse_issue(self, html: str) -> list[dict[str, Union[str, list]]]:
+        """The parse_issue method extracts the cleaned data of every paper of a table of contents page.
 
-    def extract_data(self) -> map:
-        """The extract_data method extracts the BeautifulSoup object from `self.extract_soup()`.
+        It returns plain dicts, so that it can run in a ParsePool of either kind, and validates
+        the papers of the issue in one batch. Papers in `self.seen` are not parsed. The tree
+        is freed before the method returns.
+
+        Args:
+            html (str): the table of contents page
 
         Returns:
-            a map object
+            a list
         """
-        articles_soup = self.extract_soup().findAll("div", class_="issue-item")
-        return map(self.clean_data, articles_soup)
+        soup = find_titled_issues(html)
+        if isinstance(soup, str):
+            return []
+        try:
+            items = soup.find_all("div", class_="issue-item")
+            items = keep_unseen(self.seen, items, map(self.find_key, items))
+            return JSLHRInfo.validate_many(map(self.extract_fields, items))
+        finally:
+            # the tree is full of reference cycles, so it would wait for the cyclic collector
+            soup.decompose()
 
     @convert("json")
     def to_json(self):
         return
+
+    @convert("jsonl")
+    def to_jsonl(self, compress: bool = False, batch_size: int = 50):
+        return
+
+    @convert("sqlite")
+    def to_sqlite(self, path: str = "papers.sqlite", batch_size: int = 500):
+        return
@@ -0,0 +1,66 @@
+from typing import Any, Callable, ClassVar, Iterable
+from usgscraper.util.metrics import get_stats
+
+
+class Record:
+    """
+    The Record object is the base of the paper records of every journal.
+
+    A record keeps its fields in `__slots__`, so it has no per-instance dict, and normalizes
+    them with the plain functions of `normalizers` when it is created. `validate_many` applies
+    the same normalizers to a whole issue at once and returns plain dicts without creating
+    a record per paper.
+    """
+
+    __slots__ = ()
+    normalizers: ClassVar[dict[str, Callable[[Any], Any]]] = {}
+
+    def __init__(self, **fields: Any) -> None:
+        missing = [name for name in self.__slots__ if name not in fields]
+        if missing:
+            raise TypeError(f"{self.__class__.__name__} is missing {', '.join(missing)}")
+        for name in self.__slots__:
+            normalize = self.normalizers.get(name)
+            value = fields[name]
+            setattr(self, name, normalize(value) if normalize else value)
+
+    @classmethod
+    def validate_many(cls, rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """The validate_many method normalizes the raw fields of many papers, e.g. of an issue.
+        The batch is timed as a `clean_data` call per paper.
+
+        Args:
+            rows (Iterable): the raw fields of every paper
+
+        Returns:
+            a list of plain dicts, equal to `cls(**row).dict()` for every row
+        """
+        fields = [(name, cls.normalizers.get(name)) for name in cls.__slots__]
+        with get_stats().timer("clean_data") as call:
+            papers = [
+                {
+                    name: normalize(row[name]) if normalize else row[name]
+                    for name, normalize in fields
+                }
+                for row in rows
+            ]
+            call["calls"] = len(papers)
+            return papers
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.dict() == other.dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.dict().items())
+        return f"{self.__class__.__name__}({fields})"
+
+    # defined last, since the method shadows the builtin in the annotations of the class body
+    def dict(self) -> dict[str, Any]:
+        """The dict method converts the record to a plain dict, in field order.
+
+        Returns:
+            a dict
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,209 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Callable, Optional
+from usgscraper.downloader.discovery import INDEXES
+from usgscraper.scraper.crawl import Crawl, IssueResult
+from usgscraper.util.database import PaperDatabase
+from usgscraper.util.seen import SeenIndex
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest (
+    journal TEXT PRIMARY KEY,
+    volume INTEGER NOT NULL,
+    issue INTEGER,
+    written_at REAL NOT NULL
+);
+"""
+
+
+def position(volume: int, issue: Optional[int]) -> tuple[int, int]:
+    """The position function orders the issues of a journal, a volume without issues first."""
+    return volume, issue or 0
+
+
+def successors(journal: str, volume: int, issue: Optional[int]) -> list[tuple[int, Optional[int]]]:
+    """The successors function finds the issues that can follow an issue: the next issue of the
+    volume, and the first issue of the next volume.
+
+    Args:
+        journal (str): the journal name, i.e. JASA, JSLHR or JPhon
+        volume (int): the volume of the journal
+        issue (int): the issue of the volume, None for a volume without issues
+
+    Returns:
+        a list of (volume, issue) tuples
+    """
+    following = [(volume + 1, INDEXES[journal].fallback(volume + 1)[0])]
+    if issue is not None:
+        following.insert(0, (volume, issue + 1))
+    return following
+
+
+@dataclass
+class Watch(Crawl):
+    """
+    The Watch object scrapes only what the journals published since its last run, for
+    weekly updates that cost a few small requests instead of a crawl of whole volumes.
+
+    The latest issue written of every journal is kept in the SQLite file `path`, next to a
+    SeenIndex of the papers written. A run polls the latest issue again, for the papers added
+    since, and the issues that can follow it, then the issues that can follow every new one,
+    and yields the new papers only. Give the transport a ResponseCache with `ttl=0`, so that
+    the tables of contents are polled with conditional requests and an unchanged page costs
+    a 304 without a body. The first run of a journal writes its scrapers in full:
+
+        watch = Watch([JASA(volume=150), JSLHR(volume=64), JPhon(volume=100)], path="watch.sqlite")
+        watch.to_jsonl()  # every week
+
+    Every new paper is scraped, so that an issue without papers for `filter` still counts as
+    published, and `filter` only chooses the papers written. The papers of an issue are added
+    to its file rather than replacing it.
+    """
+
+    path: str = "watch.sqlite"
+    filter: Optional[Callable[[dict], bool]] = field(default=None, compare=False)
+
+    def __post_init__(self) -> None:
+        self.path = os.path.expanduser(self.path)
+        self.seen = SeenIndex(self.path)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        # the keys of the papers left out by the filter, marked seen once their issue is written
+        self.dropped: dict[tuple, list] = {}
+
+    def latest(self, journal: str) -> Optional[tuple[int, Optional[int]]]:
+        """The latest method reads the latest issue written of `journal`.
+
+        Returns:
+            a (volume, issue) tuple, None if the journal has not been written yet
+        """
+        with self._lock:
+            return self.connection.execute(
+                "SELECT volume, issue FROM latest WHERE journal = ?", (journal,)
+            ).fetchone()
+
+    def advance(self, journal: str, volume: int, issue: Optional[int]) -> None:
+        """The advance method records an issue as the latest of `journal`, unless a later one is."""
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT volume, issue FROM latest WHERE journal = ?", (journal,)
+            ).fetchone()
+            if row is None or position(*row) < position(volume, issue):
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?)",
+                    (journal, volume, issue, time.time()),
+                )
+
+    async def start(self, scrapers: list[Any]) -> list[tuple[int, Optional[int]]]:
+        """The start method finds the issues to poll first for the scrapers of a journal.
+
+        Args:
+            scrapers (list): the JASA, JSLHR or JPhon objects of a single journal
+
+        Returns:
+            a list of (volume, issue) tuples
+        """
+        journal = scrapers[0].__class__.__name__
+        latest = self.latest(journal)
+        if latest is not None:
+            return [latest, *successors(journal, *latest)]
+        issue_lists = await asyncio.gather(*(scraper.discover_issues() for scraper in scrapers))
+        return [
+            (scraper.volume, issue)
+            for scraper, issues in zip(scrapers, issue_lists)
+            for issue in issues
+        ]
+
+    async def __aiter__(self) -> AsyncIterator[IssueResult]:
+        journals: dict[str, list] = {}
+        for scraper in self.scrapers:
+            journals.setdefault(scraper.__class__.__name__, []).append(scraper)
+        # the filter is applied here, once the keys of every new paper are known
+        templates = {
+            journal: replace(scrapers[0], manifest=None, filter=None, seen=self.seen)
+            for journal, scrapers in journals.items()
+        }
+        starts = await asyncio.gather(*(self.start(scrapers) for scrapers in journals.values()))
+        pending = [
+            (journal, volume, issue)
+            for journal, issues in zip(journals, starts)
+            for volume, issue in issues
+        ]
+        polled = set(pending)
+        self.failures = []
+        while pending:
+            tasks = [
+                asyncio.create_task(
+                    self.extract_issue(
+                        replace(templates[journal], volume=volume, issue=issue), issue
+                    )
+                )
+                for journal, volume, issue in pending
+            ]
+            pending = []
+            try:
+                for task in tasks if self.ordered else asyncio.as_completed(tasks):
+                    result = await task
+                    self.failures.extend(result.failures)
+                    if result.papers:
+                        # a new issue, or new papers of the latest one
+                        for volume, issue in successors(result.journal, result.volume, result.issue):
+                            if (result.journal, volume, issue) not in polled:
+                                polled.add((result.journal, volume, issue))
+                                pending.append((result.journal, volume, issue))
+                    accepted = [self.filter is None or self.filter(paper) for paper in result.papers]
+                    self.dropped[(result.journal, result.volume, result.issue)] = [
+                        key for key, keep in zip(result.keys, accepted) if not keep
+                    ]
+                    yield replace(
+                        result,
+                        papers=[paper for paper, keep in zip(result.papers, accepted) if keep],
+                        keys=[key for key, keep in zip(result.keys, accepted) if keep],
+                    )
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    def mark_written(self, result: IssueResult) -> None:
+        """The mark_written method adds the papers of an issue to the seen index of the watch, and
+        records the issue as the latest of its journal if it has new papers, even if the filter left
+        them all out."""
+        keys = [*result.keys, *self.dropped.pop((result.journal, result.volume, result.issue), [])]
+        self.seen.add(keys)
+        if keys:
+            self.advance(result.journal, result.volume, result.issue)
+
+    def write(
+        self,
+        result: IssueResult,
+        to: str = "jsonl",
+        database: Optional[PaperDatabase] = None,
+        **kwargs: Any,
+    ) -> None:
+        """The write method adds the new papers of an issue to the backend `to` and marks it written.
+        An issue without new papers is only marked written, so no empty file is created.
+
+        Args:
+            result (IssueResult): the issue
+            to (str): `json`, `jsonl` or `sqlite`
+            database (PaperDatabase): the database if `to` is `sqlite`
+            kwargs: passed to `jsonify`, `jsonlify` or `PaperDatabase.insert`, e.g. `batch_size`
+        """
+        if not result.papers:
+            self.mark_written(result)
+            return
+        if to != "sqlite":
+            kwargs["append"] = True
+        super().write(result, to, database, **kwargs)
+
+    def close(self) -> None:
+        """The close method closes the seen index and the database connection."""
+        self.seen.close()
+        with self._lock:
+            self.connection.close()
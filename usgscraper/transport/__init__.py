@@ -0,0 +1,23 @@
+from usgscraper.util.lazy import lazy_module
+
+
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "HTTPResponse": ".client",
+        "TransportConfig": ".client",
+        "Transport": ".client",
+        "get_transport": ".client",
+        "set_transport": ".client",
+        "PageArchive": ".archive",
+        "CircuitBreaker": ".breaker",
+        "CircuitOpenError": ".breaker",
+        "FetchError": ".breaker",
+        "CachedResponse": ".cache",
+        "ResponseCache": ".cache",
+        "Scheduler": ".scheduler",
+        "TokenBucket": ".scheduler",
+        "user_agent": ".useragent",
+    },
+)
+__all__ = list(__dir__())
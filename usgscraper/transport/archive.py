@@ -0,0 +1,257 @@
+import os
+import re
+import json
+import mmap
+import time
+import zlib
+import bisect
+import struct
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional
+from .client import HTTPResponse
+
+
+# hash of the url, segment, offset and length of the record, time it was stored
+ENTRY = struct.Struct("<qIQId")
+SEGMENT = re.compile(r"segment-(\d{5})\.pages")
+
+
+def url_hash(url: str) -> int:
+    """The url_hash function hashes a url to a signed 64-bit integer."""
+    digest = hashlib.blake2b(url.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class Entry:
+    """
+    The Entry object locates the record of a page in the segments of a PageArchive.
+    """
+
+    hash: int
+    segment: int
+    offset: int
+    length: int
+    stored_at: float
+
+    @classmethod
+    def unpack(cls, buffer, position: int = 0) -> "Entry":
+        return cls(*ENTRY.unpack_from(buffer, position))
+
+    def pack(self) -> bytes:
+        return ENTRY.pack(self.hash, self.segment, self.offset, self.length, self.stored_at)
+
+
+class SealedIndex:
+    """
+    The SealedIndex object searches the index of a full segment, which holds one entry per url
+    sorted by hash, through a memory map, so that a lookup reads a few pages of the file
+    instead of loading the index into memory.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.map) // ENTRY.size
+
+    def __getitem__(self, position: int) -> int:
+        return ENTRY.unpack_from(self.map, position * ENTRY.size)[0]
+
+    def find(self, hash: int) -> Optional[Entry]:
+        position = bisect.bisect_left(self, hash)
+        if position < len(self) and self[position] == hash:
+            return Entry.unpack(self.map, position * ENTRY.size)
+        return None
+
+    def entries(self) -> Iterator[Entry]:
+        for position in range(len(self)):
+            yield Entry.unpack(self.map, position * ENTRY.size)
+
+    def close(self) -> None:
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+
+# --------------------------------------------------------------------
+# archive
+
+
+class PageArchive:
+    """
+    The PageArchive object keeps the raw pages fetched by a crawl, so that the scrapers can
+    extract them again after a selector changed without crawling the sites again.
+
+    Every page is compressed on its own with zlib and appended to `segment-NNNNN.pages`. A new
+    segment is started once the current one exceeds `segment_size` bytes. The entries of the
+    current segment are appended to its `.log` file and kept in memory. A full segment is sealed
+    into an `.idx` file sorted by url hash, which is searched through a memory map.
+    The newest record of a url is the one returned.
+    """
+
+    def __init__(self, path: str, segment_size: int = 256 * 1024 * 1024, level: int = 6) -> None:
+        self.path = os.path.expanduser(path)
+        self.segment_size = segment_size
+        self.level = level
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        segments = sorted(
+            int(match.group(1)) for match in map(SEGMENT.fullmatch, os.listdir(self.path)) if match
+        )
+        self.segment = segments[-1] if segments else 0
+        for segment in segments[:-1]:
+            if os.path.exists(self.file(segment, "log")):
+                self.seal(segment)
+        self.sealed = {
+            segment: SealedIndex(self.file(segment, "idx"))
+            for segment in segments[:-1]
+        }
+        self.active = self.read_log(self.segment)
+        self.data = open(self.file(self.segment, "pages"), "ab")
+        self.log = open(self.file(self.segment, "log"), "ab")
+        self.readers: dict[int, BinaryIO] = {}
+
+    def file(self, segment: int, extension: str) -> str:
+        return os.path.join(self.path, f"segment-{segment:05d}.{extension}")
+
+    def read_log(self, segment: int) -> dict[int, Entry]:
+        """The read_log method loads the entries of a segment that is not sealed yet, dropping an
+        entry cut short by a crash and the entries of records missing from the segment.
+
+        Args:
+            segment (int): the segment number
+
+        Returns:
+            a dict from url hash to the newest entry of the url
+        """
+        path = self.file(segment, "log")
+        if not os.path.exists(path):
+            return {}
+        pages = self.file(segment, "pages")
+        size = os.path.getsize(pages) if os.path.exists(pages) else 0
+        with open(path, "rb") as file:
+            buffer = file.read()
+        entries = {}
+        for position in range(0, len(buffer) - len(buffer) % ENTRY.size, ENTRY.size):
+            entry = Entry.unpack(buffer, position)
+            if entry.offset + entry.length <= size:
+                entries[entry.hash] = entry
+        return entries
+
+    def seal(self, segment: int) -> None:
+        """The seal method sorts the entries of a full segment into its `.idx` file and removes its log.
+
+        Args:
+            segment (int): the segment number
+        """
+        entries = sorted(self.read_log(segment).values(), key=lambda entry: entry.hash)
+        temporary = self.file(segment, "idx.tmp")
+        with open(temporary, "wb") as file:
+            file.write(b"".join(entry.pack() for entry in entries))
+        os.replace(temporary, self.file(segment, "idx"))
+        os.remove(self.file(segment, "log"))
+
+    def rotate(self) -> None:
+        """The rotate method seals the current segment and starts the next one."""
+        self.data.close()
+        self.log.close()
+        self.seal(self.segment)
+        self.sealed[self.segment] = SealedIndex(self.file(self.segment, "idx"))
+        self.segment += 1
+        self.active = {}
+        self.data = open(self.file(self.segment, "pages"), "ab")
+        self.log = open(self.file(self.segment, "log"), "ab")
+
+    def find(self, url: str) -> Optional[Entry]:
+        hash = url_hash(url)
+        entry = self.active.get(hash)
+        if entry is not None:
+            return entry
+        for segment in sorted(self.sealed, reverse=True):
+            entry = self.sealed[segment].find(hash)
+            if entry is not None:
+                return entry
+        return None
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self.find(url) is not None
+
+    def __len__(self) -> int:
+        """The number of records, counting a url once per segment it was stored in."""
+        with self._lock:
+            return len(self.active) + sum(map(len, self.sealed.values()))
+
+    def put(self, url: str, response: HTTPResponse) -> None:
+        """The put method appends a page to the archive.
+
+        Args:
+            url (str): the requested url, which may differ from `response.url` after a redirect
+            response (HTTPResponse): the fully-read response
+        """
+        header = json.dumps(
+            {"url": response.url, "status": response.status, "headers": response.headers}
+        ).encode()
+        record = zlib.compress(header + b"\n" + response.content, self.level)
+        with self._lock:
+            if self.data.tell() and self.data.tell() + len(record) > self.segment_size:
+                self.rotate()
+            entry = Entry(url_hash(url), self.segment, self.data.tell(), len(record), time.time())
+            self.data.write(record)
+            self.data.flush()
+            # the entry is written after its record, so that it never points past the segment
+            self.log.write(entry.pack())
+            self.log.flush()
+            self.active[entry.hash] = entry
+
+    def read(self, entry: Entry) -> HTTPResponse:
+        reader = self.readers.get(entry.segment)
+        if reader is None:
+            reader = self.readers[entry.segment] = open(self.file(entry.segment, "pages"), "rb")
+        reader.seek(entry.offset)
+        header, content = zlib.decompress(reader.read(entry.length)).split(b"\n", 1)
+        return HTTPResponse(content=content, **json.loads(header))
+
+    def get(self, url: str) -> Optional[HTTPResponse]:
+        """The get method reads the newest record of a url.
+
+        Args:
+            url (str): the requested url
+
+        Returns:
+            a HTTPResponse object, None if the url is not in the archive
+        """
+        with self._lock:
+            entry = self.find(url)
+            return None if entry is None else self.read(entry)
+
+    def __iter__(self) -> Iterator[HTTPResponse]:
+        """Iterates the records of the archive, segment by segment."""
+        for segment in sorted(self.sealed) + [self.segment]:
+            with self._lock:
+                index = self.sealed.get(segment)
+                entries = list(index.entries() if index else self.active.values())
+            for entry in sorted(entries, key=lambda entry: entry.offset):
+                with self._lock:
+                    response = self.read(entry)
+                yield response
+
+    def close(self) -> None:
+        """The close method closes every file of the archive."""
+        with self._lock:
+            self.data.close()
+            self.log.close()
+            for index in self.sealed.values():
+                index.close()
+            for reader in self.readers.values():
+                reader.close()
+            self.readers = {}
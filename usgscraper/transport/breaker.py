@@ -0,0 +1,127 @@
+import time
+import threading
+from typing import Iterator, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+
+# --------------------------------------------------------------------
+# errors
+
+
+class FetchError(Exception):
+    """
+    The FetchError object is raised when a request still fails after every retry.
+    """
+
+    def __init__(
+        self, url: str, message: str, status: Optional[int] = None, attempts: int = 1
+    ) -> None:
+        super().__init__(f"{url}: {message}")
+        self.url = url
+        self.status = status
+        self.attempts = attempts
+
+
+class CircuitOpenError(FetchError):
+    """
+    The CircuitOpenError object is raised instead of sending a request to a host whose circuit is open.
+    """
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class HostCircuit:
+    """
+    The HostCircuit object counts the consecutive failures of a single host.
+    """
+
+    failures: int = 0
+    opened_at: Optional[float] = None
+    probing: bool = False
+
+
+# --------------------------------------------------------------------
+# circuit breaker
+
+
+class CircuitBreaker:
+    """
+    The CircuitBreaker object stops sending requests to a host after `failure_threshold`
+    consecutive failures, so that a host that is down fails fast instead of holding every
+    request for its whole timeout and retries.
+
+    After `reset_timeout` seconds a single probe request is let through: the circuit closes
+    again if it succeeds and stays open for another `reset_timeout` if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hosts: dict[str, HostCircuit] = {}
+        self._lock = threading.Lock()
+
+    def check(self, url: str) -> bool:
+        """The check method lets a request to `url` through, or raises CircuitOpenError.
+
+        Args:
+            url (str): the target url
+
+        Returns:
+            a bool, True if the request is the probe of an open circuit
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            circuit = self.hosts.setdefault(host, HostCircuit())
+            if circuit.opened_at is None:
+                return False
+            if circuit.probing or time.monotonic() - circuit.opened_at < self.reset_timeout:
+                raise CircuitOpenError(url, f"circuit open for {host}")
+            circuit.probing = True
+            return True
+
+    def release(self, url: str) -> None:
+        """The release method ends the probe of the host of `url` without counting an outcome,
+        so that the next request after `reset_timeout` probes the host again."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            circuit = self.hosts.get(host)
+            if circuit is not None:
+                circuit.probing = False
+
+    @contextmanager
+    def attempt(self, url: str) -> Iterator[None]:
+        """The attempt method checks a request to `url` and wraps it, so that a probe that ends
+        without `record`, e.g. cancelled or failing to decode, does not keep the circuit open.
+
+        Args:
+            url (str): the target url
+        """
+        probe = self.check(url)
+        try:
+            yield
+        finally:
+            if probe:
+                self.release(url)
+
+    def record(self, url: str, success: bool) -> None:
+        """The record method counts the outcome of a request to `url`.
+
+        Args:
+            url (str): the target url
+            success (bool): whether the host answered without a server error
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            circuit = self.hosts.setdefault(host, HostCircuit())
+            circuit.probing = False
+            if success:
+                circuit.failures, circuit.opened_at = 0, None
+                return
+            circuit.failures += 1
+            if circuit.opened_at is not None or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = time.monotonic()
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from .client import HTTPResponse
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+# the stored header that marks a page which was streamed only as far as its consumer needed
+PARTIAL = "x-usgscraper-partial"
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class CachedResponse:
+    """
+    The CachedResponse object keeps a stored response and the time it was last validated.
+    A `partial` response has only the start of the page, as read by `Transport.astream`.
+    """
+
+    response: HTTPResponse
+    stored_at: float
+    partial: bool = False
+
+    def is_fresh(self, ttl: Optional[float]) -> bool:
+        """The is_fresh method checks whether the response can be served without revalidation.
+
+        Args:
+            ttl (float): the time to live in seconds, None for never expiring
+
+        Returns:
+            a bool
+        """
+        return ttl is None or time.time() - self.stored_at < ttl
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        """The conditional_headers property sets the headers of a conditional GET."""
+        headers = {}
+        if "etag" in self.response.headers:
+            headers["if-none-match"] = self.response.headers["etag"]
+        if "last-modified" in self.response.headers:
+            headers["if-modified-since"] = self.response.headers["last-modified"]
+        return headers
+
+
+# --------------------------------------------------------------------
+# cache
+
+
+class ResponseCache:
+    """
+    The ResponseCache object stores successful responses on disk, keyed by url.
+
+    Entries younger than `ttl` are served directly, older ones are revalidated with
+    ETag/Last-Modified conditional GETs, and the least recently used entries are evicted
+    once the stored content exceeds `max_size` bytes. A page that was streamed only in part
+    is stored as a partial response, which only serves a stream of the same page.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 86400.0,
+        max_size: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self.connection = sqlite3.connect(
+            os.path.join(self.path, "responses.sqlite3"), check_same_thread=False
+        )
+        self.connection.executescript(SCHEMA)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """The get method looks up the stored response of `url` and marks it as recently used.
+
+        Args:
+            url (str): the requested url
+
+        Returns:
+            a CachedResponse object if `url` is stored, None otherwise.
+        """
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT status, headers, content, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        status, headers, content, stored_at = row
+        headers = json.loads(headers)
+        partial = headers.pop(PARTIAL, None) is not None
+        response = HTTPResponse(url=url, status=status, headers=headers, content=content)
+        return CachedResponse(response=response, stored_at=stored_at, partial=partial)
+
+    def store(self, url: str, response: HTTPResponse, partial: bool = False) -> None:
+        """The store method stores `response` under `url` and evicts old entries if needed.
+
+        Args:
+            url (str): the requested url
+            response (HTTPResponse): the response to store
+            partial (bool): whether the content is only the start of the page
+        """
+        headers = {**response.headers, PARTIAL: "1"} if partial else response.headers
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.status,
+                    json.dumps(headers),
+                    response.content,
+                    len(response.content),
+                    now,
+                    now,
+                ),
+            )
+            self.connection.execute(
+                """
+                DELETE FROM responses WHERE url IN (
+                    SELECT url FROM (
+                        SELECT url, SUM(size) OVER (ORDER BY accessed_at DESC) AS total
+                        FROM responses
+                    ) WHERE total > ?
+                )
+                """,
+                (self.max_size,),
+            )
+
+    def revalidate(self, url: str) -> None:
+        """The revalidate method restarts the time to live of `url` after a 304 response.
+
+        Args:
+            url (str): the requested url
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE responses SET stored_at = ? WHERE url = ?", (time.time(), url)
+            )
+
+    def clear(self) -> None:
+        """The clear method removes every stored response."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """The close method closes the database connection."""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,493 @@
+import re
+import time
+import random
+import asyncio
+import weakref
+import aiohttp
+import requests
+import threading
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass, field
+from typing import Optional, Awaitable, Any, Callable, TYPE_CHECKING
+
+from .scheduler import Scheduler
+from .breaker import CircuitBreaker, FetchError
+from usgscraper.util.metrics import get_stats
+
+if TYPE_CHECKING:
+    from .archive import PageArchive
+    from .cache import ResponseCache, CachedResponse
+
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class TransportConfig:
+    """
+    The TransportConfig object keeps the connection pool, timeout and retry settings shared by
+    every downloader. `timeout` bounds a whole request, `connect_timeout` the connection and
+    `read_timeout` every read from the socket.
+    """
+
+    pool_size: int = 100
+    pool_size_per_host: int = 10
+    host_pools: int = 10
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 30.0
+    timeout: float = 60.0
+    connect_timeout: Optional[float] = 10.0
+    read_timeout: Optional[float] = 30.0
+    retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        """The delay method draws the wait before retry `attempt` with full jitter, i.e. uniformly
+        up to `backoff * 2 ** attempt`, capped at `max_backoff`.
+
+        Args:
+            attempt (int): the number of failed attempts so far, minus one
+
+        Returns:
+            a float in seconds
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+@dataclass
+class HTTPResponse:
+    """
+    The HTTPResponse object keeps the fully-read response of a request, independent of the HTTP library.
+    """
+
+    url: str
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+
+    @property
+    def encoding(self) -> str:
+        """The encoding property reads the charset from the content-type header, defaulting to utf-8."""
+        charset = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""))
+        return charset.group(1) if charset else "utf-8"
+
+    @property
+    def text(self) -> str:
+        """The text property decodes the content based on `self.encoding`."""
+        try:
+            return self.content.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+
+# --------------------------------------------------------------------
+# transport
+
+
+class Transport:
+    """
+    The Transport object owns the keep-alive connection pools used by every downloader.
+
+    The blocking side is a single `requests.Session` with one pool per host, the asynchronous
+    side is one `aiohttp.ClientSession` per event loop with a DNS cache and a per-host limit.
+    If a ResponseCache is given, every GET is answered from it or revalidated against it.
+    Asynchronous requests that reach the network wait for a slot of the Scheduler first.
+    Every request that reaches the network is recorded as a call of the `fetch` stage.
+
+    A request that times out, fails to connect or gets a 429/5xx answer is retried up to
+    `config.retries` times with jittered exponential backoff, and a host that keeps failing
+    is cut off by the CircuitBreaker. A request that still fails raises FetchError.
+
+    If a PageArchive is given, every page fetched from the network is captured in it. With
+    `replay=True` nothing is sent at all: every request is answered from the archive, and
+    a page missing from it raises FetchError.
+    """
+
+    def __init__(
+        self,
+        config: Optional[TransportConfig] = None,
+        cache: Optional["ResponseCache"] = None,
+        scheduler: Optional[Scheduler] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        archive: Optional["PageArchive"] = None,
+        replay: bool = False,
+    ) -> None:
+        if replay and archive is None:
+            raise ValueError("replay needs an archive")
+        self.config = config or TransportConfig()
+        self.cache = cache
+        self.scheduler = scheduler or Scheduler(
+            max_per_host=self.config.pool_size_per_host
+        )
+        self.breaker = breaker or CircuitBreaker()
+        self.archive = archive
+        self.replay = replay
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+        self._async_sessions = weakref.WeakKeyDictionary()
+
+    @property
+    def session(self) -> requests.Session:
+        """The session property lazily creates the pooled `requests.Session`."""
+        with self._lock:
+            if self._session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=self.config.host_pools,
+                    pool_maxsize=self.config.pool_size_per_host,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    async def async_session(self) -> aiohttp.ClientSession:
+        """The async_session method returns the pooled `aiohttp.ClientSession` of the running loop.
+
+        Returns:
+            an aiohttp.ClientSession object
+        """
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.pool_size,
+                limit_per_host=self.config.pool_size_per_host,
+                ttl_dns_cache=self.config.dns_cache_ttl,
+                keepalive_timeout=self.config.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.config.timeout,
+                    connect=self.config.connect_timeout,
+                    sock_read=self.config.read_timeout,
+                ),
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    def lookup(
+        self, url: str, headers: Optional[dict[str, str]], partial: bool = False
+    ) -> tuple[Optional["CachedResponse"], Optional[dict[str, str]]]:
+        """The lookup method finds the cached response of `url` and adds the conditional headers.
+
+        Args:
+            url (str): the target url
+            headers (dict): the request headers
+            partial (bool): whether a partial response, i.e. the start of the page, will do
+
+        Returns:
+            a tuple of the cached response (or None) and the headers to send
+        """
+        if self.cache is None:
+            return None, headers
+        cached = self.cache.get(url)
+        if cached is None or (cached.partial and not partial):
+            return None, headers
+        return cached, {**(headers or {}), **cached.conditional_headers}
+
+    def complete(
+        self, url: str, cached: Optional["CachedResponse"], response: HTTPResponse
+    ) -> HTTPResponse:
+        """The complete method stores a fresh response or answers a 304 from the cache, and
+        captures the page in the archive, unless a revalidated page is already in it.
+
+        Args:
+            url (str): the target url
+            cached (CachedResponse): the cached response found by `lookup`
+            response (HTTPResponse): the response from the server
+
+        Returns:
+            a HTTPResponse object
+        """
+        result = response
+        if self.cache is not None:
+            if response.status == 304 and cached is not None:
+                self.cache.revalidate(url)
+                result = cached.response
+            elif response.status == 200:
+                self.cache.store(url, response)
+        if self.archive is not None and result.status == 200:
+            if result is response or url not in self.archive:
+                self.archive.put(url, result)
+        return result
+
+    def replayed(self, url: str) -> HTTPResponse:
+        """The replayed method answers a request from the archive, timed as a call of the `fetch` stage.
+
+        Args:
+            url (str): the target url
+
+        Returns:
+            a HTTPResponse object
+        """
+        with get_stats().timer("fetch") as call:
+            response = self.archive.get(url)
+            if response is None:
+                raise FetchError(url, "not in the archive", 404)
+            call["bytes"] = len(response.content)
+        return response
+
+    def get(self, url: str, headers: Optional[dict[str, str]] = None) -> HTTPResponse:
+        """The get method sends a blocking GET request through the shared session.
+
+        Args:
+            url (str): the target url
+            headers (dict): the request headers
+
+        Returns:
+            a HTTPResponse object
+        """
+        if self.replay:
+            return self.replayed(url)
+        cached, headers = self.lookup(url, headers)
+        if cached is not None and cached.is_fresh(self.cache.ttl):
+            return cached.response
+        for attempt in range(self.config.retries + 1):
+            with self.breaker.attempt(url):
+                try:
+                    with get_stats().timer("fetch") as call:
+                        response = self.session.get(
+                            url,
+                            headers=headers,
+                            timeout=(self.config.connect_timeout, self.config.read_timeout),
+                        )
+                        call["bytes"] = len(response.content)
+                        call["error"] = response.status_code >= 400
+                except requests.RequestException as error:
+                    self.breaker.record(url, False)
+                    if attempt == self.config.retries:
+                        raise FetchError(url, repr(error), attempts=attempt + 1) from error
+                else:
+                    retry = response.status_code in RETRY_STATUS
+                    self.breaker.record(url, not retry)
+                    if not retry:
+                        break
+                    if attempt == self.config.retries:
+                        raise FetchError(
+                            url, f"HTTP {response.status_code}", response.status_code, attempt + 1
+                        )
+            time.sleep(self.config.delay(attempt))
+        return self.complete(
+            url,
+            cached,
+            HTTPResponse(
+                url=response.url,
+                status=response.status_code,
+                headers={key.lower(): value for key, value in response.headers.items()},
+                content=response.content,
+            ),
+        )
+
+    async def retry(
+        self, url: str, request: Callable[[], Awaitable[HTTPResponse]]
+    ) -> HTTPResponse:
+        """The retry method sends `request` until it gets an answer that is not a 429/5xx,
+        waiting a jittered exponential backoff between the attempts.
+
+        Args:
+            url (str): the target url
+            request (Callable): sends the request once
+
+        Returns:
+            a HTTPResponse object
+        """
+        for attempt in range(self.config.retries + 1):
+            with self.breaker.attempt(url):
+                try:
+                    response = await request()
+                except RETRY_ERRORS as error:
+                    self.breaker.record(url, False)
+                    if attempt == self.config.retries or getattr(error, "retryable", True) is False:
+                        raise FetchError(url, repr(error), attempts=attempt + 1) from error
+                else:
+                    retry = response.status in RETRY_STATUS
+                    self.breaker.record(url, not retry)
+                    if not retry:
+                        return response
+                    if attempt == self.config.retries:
+                        raise FetchError(
+                            url, f"HTTP {response.status}", response.status, attempt + 1
+                        )
+            await asyncio.sleep(self.config.delay(attempt))
+
+    async def aget(
+        self, url: str, headers: Optional[dict[str, str]] = None
+    ) -> HTTPResponse:
+        """The aget method sends a GET request through the session of the running loop.
+
+        Args:
+            url (str): the target url
+            headers (dict): the request headers
+
+        Returns:
+            a HTTPResponse object
+        """
+        if self.replay:
+            return self.replayed(url)
+        cached, headers = self.lookup(url, headers)
+        if cached is not None and cached.is_fresh(self.cache.ttl):
+            return cached.response
+        session = await self.async_session()
+
+        async def request() -> HTTPResponse:
+            async with self.scheduler.slot(url):
+                with get_stats().timer("fetch") as call:
+                    async with session.get(url, headers=headers) as response:
+                        content = await response.read()
+                        result = HTTPResponse(
+                            url=str(response.url),
+                            status=response.status,
+                            headers={key.lower(): value for key, value in response.headers.items()},
+                            content=content,
+                        )
+                    call["bytes"], call["error"] = len(content), result.status >= 400
+            self.scheduler.feedback(url, result.status, result.headers)
+            return result
+
+        return self.complete(url, cached, await self.retry(url, request))
+
+    async def astream(
+        self,
+        url: str,
+        consumer: Callable[[bytes], bool],
+        headers: Optional[dict[str, str]] = None,
+        chunk_size: int = 16384,
+    ) -> HTTPResponse:
+        """The astream method feeds the response body to `consumer` chunk by chunk and stops
+        reading as soon as `consumer` returns True.
+
+        A response that is cut short closes its connection instead of returning it to the pool,
+        and is stored in the cache as a partial response, which answers later streams of the
+        page but not `get` or `aget`. A request is only retried if it failed before `consumer`
+        got its first chunk. While pages are captured in an archive, the whole page is read, so
+        that it can be extracted again later.
+
+        Args:
+            url (str): the target url
+            consumer (Callable): called with every chunk, returns True when it needs no more
+            headers (dict): the request headers
+            chunk_size (int): the size of the chunks to read
+
+        Returns:
+            a HTTPResponse object with the content read so far
+        """
+        if self.replay:
+            response = self.replayed(url)
+            consumer(response.content)
+            return response
+        cached, headers = self.lookup(url, headers, partial=True)
+        if cached is not None and cached.is_fresh(self.cache.ttl):
+            consumer(cached.response.content)
+            return cached.response
+        session = await self.async_session()
+        stopped, fed = False, False
+
+        async def request() -> HTTPResponse:
+            nonlocal stopped, fed
+            chunks, satisfied = [], False
+            async with self.scheduler.slot(url):
+                with get_stats().timer("fetch") as call:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status == 200:
+                            try:
+                                async for chunk in response.content.iter_chunked(chunk_size):
+                                    chunks.append(chunk)
+                                    if satisfied:
+                                        continue
+                                    fed = True
+                                    if consumer(chunk):
+                                        satisfied = True
+                                        if self.archive is not None:
+                                            continue
+                                        stopped = True
+                                        response.close()
+                                        break
+                            except RETRY_ERRORS as error:
+                                # the consumer cannot take the page again from its start
+                                error.retryable = not fed
+                                raise
+                        else:
+                            chunks.append(await response.read())
+                        result = HTTPResponse(
+                            url=str(response.url),
+                            status=response.status,
+                            headers={key.lower(): value for key, value in response.headers.items()},
+                            content=b"".join(chunks),
+                        )
+                    call["bytes"], call["error"] = len(result.content), result.status >= 400
+            self.scheduler.feedback(url, result.status, result.headers)
+            return result
+
+        result = await self.retry(url, request)
+        if stopped:
+            if self.cache is not None:
+                self.cache.store(url, result, partial=True)
+            return result
+        completed = self.complete(url, cached, result)
+        if completed is not result:
+            consumer(completed.content)
+        return completed
+
+    async def aclose(self) -> None:
+        """The aclose method closes the session of the running loop."""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    def close(self) -> None:
+        """The close method closes the blocking session, the cache and the archive."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        if self.cache is not None:
+            self.cache.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    def run(self, coroutine: Awaitable[Any]) -> Any:
+        """The run method runs `coroutine` in a new event loop and closes its session afterwards.
+
+        Args:
+            coroutine (Awaitable): the coroutine to run
+
+        Returns:
+            the result of the coroutine
+        """
+
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                await self.aclose()
+
+        return asyncio.run(main())
+
+
+_transport: Optional[Transport] = None
+
+
+def get_transport() -> Transport:
+    """The get_transport function returns the transport shared by all downloaders."""
+    global _transport
+    if _transport is None:
+        _transport = Transport()
+    return _transport
+
+
+def set_transport(transport: Transport) -> None:
+    """The set_transport function replaces the shared transport, e.g. to change the pool size.
+
+    Args:
+        transport (Transport): the new transport
+    """
+    global _transport
+    _transport = transport
@@ -0,0 +1,176 @@
+import time
+import asyncio
+import weakref
+from typing import Optional
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+
+THROTTLED_STATUS = (429, 503)
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class TokenBucket:
+    """
+    The TokenBucket object spaces out requests so that at most `rate` are sent per second,
+    with bursts of up to `burst` requests.
+    """
+
+    rate: float
+    burst: float
+    tokens: float = field(init=False)
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        self.tokens = self.burst
+
+    def reserve(self) -> float:
+        """The reserve method takes a token and returns how long to wait before using it.
+
+        Returns:
+            a float in seconds
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+@dataclass
+class HostState:
+    """
+    The HostState object keeps the adaptive rate of a single host.
+
+    The rate is halved whenever the host answers 429/503 and creeps back up by `recovery`
+    requests per second on every successful response (additive increase, multiplicative decrease).
+    """
+
+    max_rate: float
+    burst: float
+    min_rate: float = 0.2
+    recovery: float = 0.1
+    paused_until: float = 0.0
+    bucket: TokenBucket = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.bucket = TokenBucket(rate=self.max_rate, burst=self.burst)
+
+    def delay(self) -> float:
+        """The delay method returns how long the next request to this host has to wait."""
+        pause = max(0.0, self.paused_until - time.monotonic())
+        return pause + self.bucket.reserve()
+
+    def slow_down(self, retry_after: Optional[float]) -> None:
+        """The slow_down method halves the rate and pauses the host for `retry_after` seconds."""
+        self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+        self.bucket.tokens = min(self.bucket.tokens, 0.0)
+        pause = retry_after if retry_after is not None else 1 / self.bucket.rate
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def speed_up(self) -> None:
+        """The speed_up method raises the rate back towards `max_rate`."""
+        self.bucket.rate = min(self.max_rate, self.bucket.rate + self.recovery)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """The parse_retry_after function converts a Retry-After header to seconds.
+
+    Args:
+        value (str): the header value, either seconds or an HTTP date
+
+    Returns:
+        a float if the header is valid, None otherwise.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# --------------------------------------------------------------------
+# scheduler
+
+
+class Scheduler:
+    """
+    The Scheduler object bounds the asynchronous requests of the transport with a global
+    concurrency cap, a per-host concurrency cap and an adaptive per-host token bucket.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_per_host: int = 8,
+        rate_per_host: float = 10.0,
+        burst: float = 10.0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.hosts: dict[str, HostState] = {}
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def host_state(self, host: str) -> HostState:
+        """The host_state method returns the adaptive rate of `host`, creating it if needed."""
+        if host not in self.hosts:
+            self.hosts[host] = HostState(max_rate=self.rate_per_host, burst=self.burst)
+        return self.hosts[host]
+
+    def semaphores(self, host: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """The semaphores method returns the global and per-host semaphores of the running loop.
+
+        Semaphores are kept per event loop, since the transport may run several loops in a row.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+        total, per_host = self._semaphores[loop]
+        if host not in per_host:
+            per_host[host] = asyncio.Semaphore(self.max_per_host)
+        return total, per_host[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """The slot method waits until a request to `url` may be sent and holds its slot.
+
+        Args:
+            url (str): the target url
+        """
+        host = urlsplit(url).netloc
+        total, per_host = self.semaphores(host)
+        async with per_host:
+            delay = self.host_state(host).delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with total:
+                yield
+
+    def feedback(self, url: str, status: int, headers: dict[str, str]) -> None:
+        """The feedback method adapts the rate of the host of `url` to its response.
+
+        Args:
+            url (str): the requested url
+            status (int): the response status
+            headers (dict): the response headers
+        """
+        state = self.host_state(urlsplit(url).netloc)
+        if status in THROTTLED_STATUS:
+            state.slow_down(parse_retry_after(headers.get("retry-after")))
+        else:
+            state.speed_up()
@@ -1 +1,39 @@
-from .converter import convert
+from .lazy import lazy_module
+
+
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "convert": ".converter",
+        "jsonify": ".converter",
+        "jsonlify": ".converter",
+        "JSONLinesWriter": ".converter",
+        "PaperDatabase": ".database",
+        "sqlitify": ".database",
+        "Manifest": ".manifest",
+        "SeenIndex": ".seen",
+        "Progress": ".progress",
+        "Stats": ".metrics",
+        "get_stats": ".metrics",
+        "set_stats": ".metrics",
+        "measure": ".metrics",
+        "iterate": ".loop",
+    },
+)
+__all__ = [
+    "convert",
+    "jsonify",
+    "jsonlify",
+    "JSONLinesWriter",
+    "PaperDatabase",
+    "sqlitify",
+    "Manifest",
+    "SeenIndex",
+    "Progress",
+    "Stats",
+    "get_stats",
+    "set_stats",
+    "measure",
+    "iterate",
+    "lazy_module",
+]
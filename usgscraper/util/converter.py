@@ -1,36 +1,192 @@
+import os
+import gzip
 import json
+import inspect
 from functools import wraps
+from itertools import chain, tee, zip_longest
+from dataclasses import replace
+from typing import Iterable, Optional, IO
+from .database import sqlitify
+from .metrics import get_stats
 
 
-def jsonify(journal: str, volume: int, issue: int, data: dict) -> None:
+def create_filename(journal: str, volume: int, issue: Optional[int], extension: str) -> str:
+    """The create_filename function creates the output file name of a journal volume or issue.
+
+    Args:
+        journal (str): the journal name
+        volume (int): the volume of a journal
+        issue (int): the issue of a volume
+        extension (str): the file extension, e.g. `json`
+
+    Returns:
+        a str
+    """
+    if issue:
+        return f"{journal} - {volume} - {issue}.{extension}"
+    return f"{journal} - {volume}.{extension}"
+
+
+def jsonify(
+    journal: str, volume: int, issue: int, data: Iterable[dict], append: bool = False
+) -> None:
     """The jsonify function converts the argument `data` to a JSON file.
 
+    The records are written one at a time, so `data` can be a generator. They go to a temporary
+    file that replaces the JSON file once it is complete, so a write that is interrupted, e.g. by
+    KeyboardInterrupt, leaves the earlier file as it was.
+
     Args:
         journal (str): the journal name
         volume (int): the volume of a journal
         issue (int): the issue of a volume
-        data (dict): the target data
+        data (Iterable): the target data
+        append (bool): whether to keep the records of an existing file before `data`
 
     Returns:
         a json file
     """
-    if issue:
-        with open(f"{journal} - {volume} - {issue}.json", "w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False)
-    else:
-        with open(f"{journal} - {volume}.json", "w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False)
+    path = create_filename(journal, volume, issue, "json")
+    if append and os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            data = chain(json.load(file), data)
+    partial = f"{path}.partial"
+    try:
+        with open(partial, "w", encoding="utf-8") as file:
+            file.write("[")
+            for index, record in enumerate(data):
+                with get_stats().timer("write") as call:
+                    text = json.dumps(record, ensure_ascii=False)
+                    file.write(", " + text if index else text)
+                    call["bytes"] = len(text)
+            file.write("]")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+class JSONLinesWriter:
+    """
+    The JSONLinesWriter object appends records to a JSON Lines file, optionally gzip-compressed,
+    and flushes them to disk every `batch_size` records.
+    """
+
+    def __init__(
+        self, path: str, compress: bool = False, batch_size: int = 50, mode: str = "w"
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer: list[str] = []
+        self.file: IO[str] = (
+            gzip.open(path, f"{mode}t", encoding="utf-8")
+            if compress
+            else open(path, mode, encoding="utf-8")
+        )
+
+    def write(self, record: dict) -> None:
+        """The write method buffers a record and flushes the buffer once it is full.
+
+        Args:
+            record (dict): the record to write
+        """
+        with get_stats().timer("write") as call:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            self.buffer.append(line)
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+            call["bytes"] = len(line)
+
+    def flush(self) -> None:
+        """The flush method writes the buffered records and flushes the file."""
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self) -> None:
+        """The close method flushes the remaining records and closes the file."""
+        self.flush()
+        self.file.close()
+
+    def __enter__(self) -> "JSONLinesWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def jsonlify(
+    journal: str,
+    volume: int,
+    issue: int,
+    data: Iterable[dict],
+    compress: bool = False,
+    batch_size: int = 50,
+    append: bool = False,
+) -> None:
+    """The jsonlify function streams the argument `data` to a JSON Lines file.
+
+    Every record already scraped is kept on disk, even if `data` fails halfway.
+
+    Args:
+        journal (str): the journal name
+        volume (int): the volume of a journal
+        issue (int): the issue of a volume
+        data (Iterable): the target data
+        compress (bool): whether to gzip the file
+        batch_size (int): the number of records between flushes
+        append (bool): whether to add the records to the end of an existing file
+
+    Returns:
+        a jsonl or jsonl.gz file
+    """
+    extension = "jsonl.gz" if compress else "jsonl"
+    path = create_filename(journal, volume, issue, extension)
+    mode = "a" if append else "w"
+    with JSONLinesWriter(path, compress=compress, batch_size=batch_size, mode=mode) as writer:
+        for record in data:
+            writer.write(record)
 
 
 def convert(datatype):
     def decorator(func):
+        signature = inspect.signature(func)
+
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            data = list(self.extract_data())
+            # the arguments are bound by name, so positional ones reach the writer as well
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            options = {name: value for name, value in arguments.arguments.items() if name != "self"}
+            # imported here, since the crawl module imports this one
+            from usgscraper.scraper.crawl import Crawl
+
+            crawl, written = Crawl([self], ordered=True), []
+
+            def extract_data():
+                for result in crawl:
+                    # a paper is stored by its key, as in Crawl.write, so a rerun replaces it
+                    yield from zip_longest(result.papers, result.keys[: len(result.papers)])
+                    written.append(replace(result, papers=[]))
+
+            data = extract_data()
+            journal = self.__class__.__name__
+            # with a seen index only the new papers are scraped, so the earlier ones are kept
+            append = self.seen is not None
             if datatype == "json":
-                jsonify(self.__class__.__name__, self.volume, self.issue, data)
+                papers = (paper for paper, _ in data)
+                jsonify(journal, self.volume, self.issue, papers, append=append)
+            if datatype == "jsonl":
+                papers = (paper for paper, _ in data)
+                jsonlify(journal, self.volume, self.issue, papers, append=append, **options)
+            if datatype == "sqlite":
+                data, keys = tee(data)
+                papers, keys = (paper for paper, _ in data), (key for _, key in keys)
+                sqlitify(journal, self.volume, self.issue, papers, keys=keys, **options)
+            for result in written:
+                crawl.mark_written(result)
 
         return wrapper
 
     return decorator
-  
@@ -0,0 +1,235 @@
+import os
+import sqlite3
+from itertools import islice, repeat
+from typing import Any, Iterable, Optional, Union
+from .metrics import measure
+from .seen import paper_key
+
+
+SCHEMA = """
+PRAGMA foreign_keys = ON;
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    journal TEXT NOT NULL,
+    volume INTEGER NOT NULL,
+    issue INTEGER,
+    title TEXT NOT NULL,
+    published_date TEXT,
+    abstract TEXT,
+    keywords TEXT,
+    href TEXT,
+    key TEXT,
+    UNIQUE (journal, key)
+);
+CREATE TABLE IF NOT EXISTS authors (
+    paper_id INTEGER NOT NULL REFERENCES papers (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (paper_id, position)
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    paper_id INTEGER NOT NULL REFERENCES papers (id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS authors_name ON authors (name);
+CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstract, keywords, content='papers', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS papers_insert AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, abstract, keywords)
+    VALUES (new.id, new.title, new.abstract, new.keywords);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_delete AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, keywords)
+    VALUES ('delete', old.id, old.title, old.abstract, old.keywords);
+END;
+"""
+
+
+def create_author_list(authors: Union[str, dict, list]) -> list[str]:
+    """The create_author_list function flattens the authors of a JASA, JSLHR or JPhon record.
+
+    Args:
+        authors: `{'auth-1': name}` (JASA, JSLHR), `[{id: name}]` (JPhon) or 'no author'
+
+    Returns:
+        a list
+    """
+    if isinstance(authors, dict):
+        return list(authors.values())
+    if isinstance(authors, list):
+        return [name for author in authors for name in author.values()]
+    return []
+
+
+def create_keyword_list(keywords: Union[str, list, None]) -> list[str]:
+    """The create_keyword_list function converts the keywords of a record to a list.
+
+    Args:
+        keywords: a list of keywords, the joined keywords of JPhon, or None
+
+    Returns:
+        a list
+    """
+    if isinstance(keywords, list):
+        return keywords
+    if keywords:
+        return [keywords]
+    return []
+
+
+class PaperDatabase:
+    """
+    The PaperDatabase object stores the scraped papers of every journal in one SQLite database,
+    with normalized authors and keywords and an FTS5 index over title, abstract and keywords.
+
+    A paper is identified by its normalized DOI or href, so a paper written again replaces its
+    earlier copy, while different papers with the same title, e.g. errata, are all kept.
+    A paper without a DOI or href is always added.
+    """
+
+    def __init__(self, path: str = "papers.sqlite") -> None:
+        self.path = os.path.expanduser(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(SCHEMA)
+
+    @measure("write")
+    def insert_record(
+        self,
+        journal: str,
+        volume: int,
+        issue: Optional[int],
+        record: dict[str, Any],
+        key: Optional[str] = None,
+    ) -> None:
+        """The insert_record method inserts a single record, replacing an earlier copy of it.
+
+        Args:
+            journal (str): the journal name
+            volume (int): the volume of a journal
+            issue (int): the issue of a volume
+            record (dict): the record of a JASAInfo, JSLHRInfo or JPhonInfo object
+            key (str): the DOI or href of the paper, by default the href of the record
+        """
+        keywords = create_keyword_list(record.get("keywords"))
+        key = key or record.get("href")
+        key = paper_key(key) if key else None
+        if key is not None:
+            self.connection.execute(
+                "DELETE FROM papers WHERE journal = ? AND key = ?", (journal, key)
+            )
+        cursor = self.connection.execute(
+            """
+            INSERT INTO papers (journal, volume, issue, title, published_date, abstract, keywords, href, key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                journal,
+                volume,
+                issue,
+                record["title"],
+                record.get("published_date"),
+                record.get("abstract"),
+                " ".join(keywords) or None,
+                record.get("href"),
+                key,
+            ),
+        )
+        authors = create_author_list(record.get("authors"))
+        self.connection.executemany(
+            "INSERT INTO authors VALUES (?, ?, ?)",
+            [(cursor.lastrowid, position, name) for position, name in enumerate(authors)],
+        )
+        self.connection.executemany(
+            "INSERT INTO keywords VALUES (?, ?)",
+            [(cursor.lastrowid, keyword) for keyword in keywords],
+        )
+
+    def insert(
+        self,
+        journal: str,
+        volume: int,
+        issue: Optional[int],
+        data: Iterable[dict[str, Any]],
+        batch_size: int = 500,
+        keys: Optional[Iterable[Optional[str]]] = None,
+    ) -> int:
+        """The insert method inserts the records of `data`, one transaction per `batch_size` records.
+
+        Args:
+            journal (str): the journal name
+            volume (int): the volume of a journal
+            issue (int): the issue of a volume
+            data (Iterable): the records
+            batch_size (int): the number of records per transaction
+            keys (Iterable): the DOI or href of every record, e.g. the keys of an IssueResult
+
+        Returns:
+            an int, the number of inserted records
+        """
+        records, count = zip(data, repeat(None) if keys is None else keys), 0
+        while batch := list(islice(records, batch_size)):
+            with self.connection:
+                for record, key in batch:
+                    self.insert_record(journal, volume, issue, record, key)
+            count += len(batch)
+        return count
+
+    def search(self, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        """The search method finds the papers matching an FTS5 query, best matches first.
+
+        Args:
+            query (str): the FTS5 query, e.g. 'ultrasound AND tongue'
+            limit (int): the maximum number of papers
+
+        Returns:
+            a list
+        """
+        cursor = self.connection.execute(
+            """
+            SELECT papers.* FROM papers_fts
+            JOIN papers ON papers.id = papers_fts.rowid
+            WHERE papers_fts MATCH ? ORDER BY rank LIMIT ?
+            """,
+            (query, limit),
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self) -> None:
+        """The close method closes the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> "PaperDatabase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def sqlitify(
+    journal: str,
+    volume: int,
+    issue: int,
+    data: Iterable[dict],
+    path: str = "papers.sqlite",
+    batch_size: int = 500,
+    keys: Optional[Iterable[Optional[str]]] = None,
+) -> None:
+    """The sqlitify function stores the argument `data` in the SQLite database at `path`.
+
+    Args:
+        journal (str): the journal name
+        volume (int): the volume of a journal
+        issue (int): the issue of a volume
+        data (Iterable): the target data
+        path (str): the database file
+        batch_size (int): the number of records per transaction
+        keys (Iterable): the DOI or href of every record, see `PaperDatabase.insert`
+
+    Returns:
+        a sqlite file
+    """
+    with PaperDatabase(path) as database:
+        database.insert(journal, volume, issue, data, batch_size=batch_size, keys=keys)
@@ -0,0 +1,26 @@
+import importlib
+from typing import Any, Callable
+
+
+def lazy_module(package: str, exports: dict[str, str]) -> tuple[Callable, Callable]:
+    """The lazy_module function creates the module-level `__getattr__` and `__dir__` of a package
+    that imports its submodules only when one of their names is first accessed.
+
+    Args:
+        package (str): the name of the package, i.e. `__name__`
+        exports (dict): the exported names mapped to the submodule defining them
+
+    Returns:
+        a tuple of the `__getattr__` and `__dir__` functions
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(exports[name], package)
+        return getattr(module, name)
+
+    def __dir__() -> list[str]:
+        return sorted(exports)
+
+    return __getattr__, __dir__
@@ -0,0 +1,49 @@
+import asyncio
+from typing import AsyncIterator, Iterator, TypeVar
+from usgscraper.transport import get_transport
+
+
+T = TypeVar("T")
+
+
+def iterate(results: AsyncIterator[T]) -> Iterator[T]:
+    """The iterate function drives an asynchronous iterator from synchronous code, on a private
+    event loop whose transport session is closed afterwards.
+
+    Inside a running event loop, e.g. in Jupyter or an aiohttp service, iterate the asynchronous
+    iterator with `async for` instead, so that it shares the loop and session of the caller.
+
+    Args:
+        results (AsyncIterator): the asynchronous iterator
+
+    Returns:
+        a generator
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError(
+            "the synchronous API cannot run inside an event loop, use `async for` instead"
+        )
+    loop = asyncio.new_event_loop()
+    step = None
+    try:
+        while True:
+            step = asyncio.ensure_future(results.__anext__(), loop=loop)
+            try:
+                yield loop.run_until_complete(step)
+            except StopAsyncIteration:
+                break
+    finally:
+        if step is not None and not step.done():
+            # interrupted mid-step, e.g. by KeyboardInterrupt, so the iterator is still running
+            step.cancel()
+            try:
+                loop.run_until_complete(step)
+            except BaseException:
+                pass
+        loop.run_until_complete(results.aclose())
+        loop.run_until_complete(get_transport().aclose())
+        loop.close()
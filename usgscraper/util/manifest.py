@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+
+PENDING = "pending"
+FETCHED = "fetched"
+PARSED = "parsed"
+WRITTEN = "written"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    url TEXT PRIMARY KEY,
+    journal TEXT NOT NULL,
+    volume INTEGER NOT NULL,
+    issue INTEGER,
+    state TEXT NOT NULL,
+    record TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS units_volume ON units (journal, volume, issue);
+"""
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class Unit:
+    """
+    The Unit object identifies a page of a crawl, i.e. a table of contents or an article.
+    """
+
+    journal: str
+    volume: int
+    issue: Optional[int]
+    url: str
+
+
+# --------------------------------------------------------------------
+# manifest
+
+
+class Manifest:
+    """
+    The Manifest object records the state of every issue and article of a crawl in SQLite,
+    so that a crawl that died halfway continues from where it stopped.
+
+    A unit goes from `pending` to `fetched` once its page is downloaded, to `parsed` once its
+    record is extracted and stored, and to `written` once the output file has been written.
+    Parsed and written units are never downloaded again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def __getstate__(self) -> dict[str, str]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, str]) -> None:
+        self.__init__(state["path"])
+
+    def state(self, url: str) -> Optional[str]:
+        """The state method gets the state of the unit of `url`.
+
+        Args:
+            url (str): the url of the unit
+
+        Returns:
+            a str if the unit is known, None otherwise.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT state FROM units WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, url: str) -> Optional[Any]:
+        """The record method gets the stored record of `url` if it has been parsed.
+
+        Args:
+            url (str): the url of the unit
+
+        Returns:
+            the record if the unit is parsed or written, None otherwise.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT record FROM units WHERE url = ? AND state IN (?, ?)",
+                (url, PARSED, WRITTEN),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def mark(self, unit: Unit, state: str, record: Optional[Any] = None) -> None:
+        """The mark method sets the state of `unit`, keeping its record if given.
+
+        Args:
+            unit (Unit): the unit
+            state (str): the new state
+            record: the extracted record, stored as JSON
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO units VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    state = excluded.state,
+                    record = COALESCE(excluded.record, units.record),
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    unit.url,
+                    unit.journal,
+                    unit.volume,
+                    unit.issue,
+                    state,
+                    None if record is None else json.dumps(record, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+
+    def mark_written(self, journal: str, volume: int, issue: Optional[int] = None) -> None:
+        """The mark_written method marks the parsed units of a volume, or of one of its issues, as written.
+
+        Args:
+            journal (str): the journal name
+            volume (int): the volume of a journal
+            issue (int): the issue of a volume, None for the whole volume
+        """
+        query = "UPDATE units SET state = ?, updated_at = ? WHERE journal = ? AND volume = ? AND state = ?"
+        params = [WRITTEN, time.time(), journal, volume, PARSED]
+        if issue:
+            query += " AND issue = ?"
+            params.append(issue)
+        with self._lock, self.connection:
+            self.connection.execute(query, params)
+
+    def summary(self) -> dict[str, int]:
+        """The summary method counts the units in every state.
+
+        Returns:
+            a dict
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT state, COUNT(*) FROM units GROUP BY state"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """The close method closes the database connection."""
+        with self._lock:
+            self.connection.close()
+
+
+async def checkpoint(
+    manifest: Optional[Manifest],
+    unit: Unit,
+    fetch: Callable[[], Awaitable[Any]],
+    parse: Callable[[Any], Awaitable[Any]],
+) -> Any:
+    """The checkpoint function fetches and parses `unit`, unless `manifest` already has its record.
+
+    Args:
+        manifest (Manifest): the manifest of the crawl, None to always fetch
+        unit (Unit): the unit
+        fetch (Callable): downloads the page of the unit
+        parse (Callable): extracts the record from the downloaded page
+
+    Returns:
+        the record of the unit
+    """
+    if manifest is None:
+        return await parse(await fetch())
+    record = manifest.record(unit.url)
+    if record is not None:
+        return record
+    manifest.mark(unit, PENDING)
+    page = await fetch()
+    manifest.mark(unit, FETCHED)
+    record = await parse(page)
+    manifest.mark(unit, PARSED, record)
+    return record
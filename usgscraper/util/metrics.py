@@ -0,0 +1,266 @@
+import time
+import inspect
+import threading
+from functools import wraps
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class StageStats:
+    """
+    The StageStats object counts the calls, bytes and errors of a stage and keeps a histogram
+    of their durations, with one count per bucket of `BUCKETS` and one for slower calls.
+    `active` counts the calls that are running now. A batch of `calls` calls, e.g. the papers
+    of an issue, is counted as that many calls of its mean duration.
+    """
+
+    active: int = 0
+    count: int = 0
+    errors: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+    def observe(self, seconds: float, size: int = 0, error: bool = False, calls: int = 1) -> None:
+        self.count += calls
+        self.errors += error
+        self.bytes += size
+        self.seconds += seconds
+        self.buckets[bisect_left(BUCKETS, seconds / max(calls, 1))] += calls
+
+    def merge(self, other: "StageStats") -> None:
+        self.count += other.count
+        self.errors += other.errors
+        self.bytes += other.bytes
+        self.seconds += other.seconds
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def quantile(self, q: float) -> float:
+        """The quantile method estimates a quantile of the durations from the histogram.
+
+        Args:
+            q (float): the quantile, e.g. 0.99
+
+        Returns:
+            a float, the upper bound of the bucket holding the quantile
+        """
+        rank, seen = q * self.count, 0
+        for bound, count in zip((*BUCKETS, float("inf")), self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return 0.0
+
+
+# --------------------------------------------------------------------
+# stats
+
+
+class Stats:
+    """
+    The Stats object collects the timings of the stages of a crawl, i.e. `fetch`, `parse`,
+    `clean_data` and `write`, so that the bottleneck of a slow crawl can be found.
+
+    It can be read with `snapshot`, exported with `to_prometheus`, or printed with `summary`.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self, stage: str, seconds: float, size: int = 0, error: bool = False, calls: int = 1
+    ) -> None:
+        """The observe method records a call of `stage`.
+
+        Args:
+            stage (str): the stage name
+            seconds (float): the duration of the call
+            size (int): the bytes read or written by the call
+            error (bool): whether the call failed
+            calls (int): the calls in a batch, e.g. the papers of an issue
+        """
+        with self._lock:
+            self.stages.setdefault(stage, StageStats()).observe(seconds, size, error, calls)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[dict[str, Any]]:
+        """The timer method times the block of a `with` statement as a call of `stage`, counting
+        it as an error if it raises. The block may set the `bytes`, `error` and `calls` keys of the
+        yielded dict.
+
+        Args:
+            stage (str): the stage name
+        """
+        start, call = time.perf_counter(), {"bytes": 0, "error": False, "calls": 1}
+        self.track(stage, 1)
+        try:
+            yield call
+        except Exception:
+            self.observe(stage, time.perf_counter() - start, call["bytes"], True, call["calls"])
+            raise
+        else:
+            self.observe(
+                stage, time.perf_counter() - start, call["bytes"], call["error"], call["calls"]
+            )
+        finally:
+            self.track(stage, -1)
+
+    def track(self, stage: str, change: int) -> None:
+        """The track method counts the calls of `stage` that started, or with -1, that ended."""
+        with self._lock:
+            stats = self.stages.setdefault(stage, StageStats())
+            # a call that started before a reset ends after it
+            stats.active = max(stats.active + change, 0)
+
+    def merge(self, stages: dict[str, StageStats]) -> None:
+        """The merge method adds the stages recorded by another Stats object, e.g. of a worker process."""
+        with self._lock:
+            for name, stage in stages.items():
+                self.stages.setdefault(name, StageStats()).merge(stage)
+
+    def drain(self) -> dict[str, StageStats]:
+        """The drain method takes the recorded stages out of the object, leaving it empty."""
+        with self._lock:
+            stages, self.stages = self.stages, {}
+        return stages
+
+    def reset(self) -> None:
+        """The reset method forgets every recorded call."""
+        self.drain()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """The snapshot method summarises every stage.
+
+        Returns:
+            a dict: {'fetch': {'active': 3, 'count': 12, 'errors': 0, 'bytes': 1843021, 'seconds': 3.2, 'p50': 0.25, 'p99': 1.0}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    "active": stage.active,
+                    "count": stage.count,
+                    "errors": stage.errors,
+                    "bytes": stage.bytes,
+                    "seconds": round(stage.seconds, 6),
+                    "p50": stage.quantile(0.5),
+                    "p99": stage.quantile(0.99),
+                }
+                for name, stage in self.stages.items()
+            }
+
+    def to_prometheus(self, prefix: str = "usgscraper") -> str:
+        """The to_prometheus method exports every stage in the Prometheus text format.
+
+        Args:
+            prefix (str): the prefix of the metric names
+
+        Returns:
+            a str
+        """
+        with self._lock:
+            stages = sorted(self.stages.items())
+            lines = [
+                f"# HELP {prefix}_stage_seconds The duration of the calls of a crawl stage.",
+                f"# TYPE {prefix}_stage_seconds histogram",
+            ]
+            for name, stage in stages:
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), stage.buckets):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage.seconds}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage.count}')
+            lines.append(f"# HELP {prefix}_stage_active The running calls of a crawl stage.")
+            lines.append(f"# TYPE {prefix}_stage_active gauge")
+            for name, stage in stages:
+                lines.append(f'{prefix}_stage_active{{stage="{name}"}} {stage.active}')
+            for metric, description in (
+                ("bytes", "The bytes read or written by a crawl stage."),
+                ("errors", "The failed calls of a crawl stage."),
+            ):
+                lines.append(f"# HELP {prefix}_stage_{metric}_total {description}")
+                lines.append(f"# TYPE {prefix}_stage_{metric}_total counter")
+                for name, stage in stages:
+                    lines.append(
+                        f'{prefix}_stage_{metric}_total{{stage="{name}"}} {getattr(stage, metric)}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """The summary method formats every stage as a table, e.g. to print at the end of a crawl.
+
+        Returns:
+            a str
+        """
+        rows = [f"{'stage':<12}{'count':>8}{'errors':>8}{'MB':>10}{'total s':>10}{'p50 s':>8}{'p99 s':>8}"]
+        for name, stage in self.snapshot().items():
+            rows.append(
+                f"{name:<12}{stage['count']:>8}{stage['errors']:>8}{stage['bytes'] / 2**20:>10.2f}"
+                f"{stage['seconds']:>10.2f}{stage['p50']:>8}{stage['p99']:>8}"
+            )
+        return "\n".join(rows)
+
+
+_stats: Optional[Stats] = None
+
+
+def get_stats() -> Stats:
+    """The get_stats function returns the stats shared by every stage."""
+    global _stats
+    if _stats is None:
+        _stats = Stats()
+    return _stats
+
+
+def set_stats(stats: Stats) -> None:
+    """The set_stats function replaces the shared stats, e.g. to measure a single crawl.
+
+    Args:
+        stats (Stats): the new stats
+    """
+    global _stats
+    _stats = stats
+
+
+def measure(stage: str) -> Callable[[Callable], Callable]:
+    """The measure function creates a decorator that times every call of a function or coroutine
+    function as a call of `stage`.
+
+    Args:
+        stage (str): the stage name
+
+    Returns:
+        a decorator
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_stats().timer(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_stats().timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,76 @@
+import sys
+import time
+import asyncio
+from typing import IO, Optional, TYPE_CHECKING
+from .metrics import Stats, get_stats
+
+if TYPE_CHECKING:
+    from usgscraper.scraper.crawl import IssueResult
+
+
+class Progress:
+    """
+    The Progress object reports the throughput of a running crawl every `interval` seconds:
+    the papers written per second, the bytes fetched per second and the requests in flight.
+    On a terminal the report is redrawn in place, otherwise every report is a new line.
+    """
+
+    def __init__(
+        self, interval: float = 1.0, stream: Optional[IO[str]] = None, stats: Optional[Stats] = None
+    ) -> None:
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.stats = stats or get_stats()
+        self.papers = 0
+        self.issues = 0
+        self.failures = 0
+        self.started = time.perf_counter()
+        self.initial = self.fetched()[0]
+        self.last = (self.started, 0, self.initial)
+
+    def fetched(self) -> tuple[int, int]:
+        """The fetched method reads the bytes fetched so far and the requests in flight."""
+        fetch = self.stats.snapshot().get("fetch", {})
+        return fetch.get("bytes", 0), fetch.get("active", 0)
+
+    def update(self, result: "IssueResult") -> None:
+        """The update method counts a written issue.
+
+        Args:
+            result (IssueResult): the issue
+        """
+        self.papers += len(result.papers)
+        self.issues += 1
+        self.failures += len(result.failures)
+
+    def line(self, final: bool = False) -> str:
+        """The line method formats the report, with the rates since the last report, or since
+        the start for the final one.
+
+        Returns:
+            a str
+        """
+        now = time.perf_counter()
+        fetched, in_flight = self.fetched()
+        since, papers, bytes = (self.started, 0, self.initial) if final else self.last
+        self.last = (now, self.papers, fetched)
+        seconds = max(now - since, 1e-9)
+        return (
+            f"{now - self.started:7.1f}s {self.papers:>7} papers {(self.papers - papers) / seconds:>7.1f} papers/s "
+            f"{(fetched - bytes) / seconds / 2**20:>6.2f} MB/s {in_flight:>4} in flight "
+            f"{self.issues:>5} issues {self.failures:>4} failures"
+        )
+
+    def report(self, final: bool = False) -> None:
+        """The report method writes the report to `self.stream`."""
+        if self.stream.isatty():
+            self.stream.write(f"\r{self.line(final)}" + ("\n" if final else ""))
+        else:
+            self.stream.write(f"{self.line(final)}\n")
+        self.stream.flush()
+
+    async def run(self) -> None:
+        """The run method reports every `interval` seconds on the running event loop until it is cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            self.report()
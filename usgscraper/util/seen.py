@@ -0,0 +1,123 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+from itertools import islice
+from typing import Any, Iterable, Optional
+
+
+DOI = re.compile(r"10\.\d{4,9}/[^\s?#]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (hash INTEGER PRIMARY KEY);
+"""
+
+
+def paper_key(value: str) -> str:
+    """The paper_key function normalizes the DOI or href of a paper, so that the same paper has
+    the same key whether it comes from a DOI, a doi.org link or a publisher link.
+
+    Args:
+        value (str): the DOI or href of a paper
+
+    Returns:
+        a str: '10.1121/10.0006449'
+    """
+    doi = DOI.search(value)
+    if doi:
+        return doi.group().lower()
+    return value.strip().lower()
+
+
+def key_hash(key: str) -> int:
+    """The key_hash function hashes a key to a signed 64-bit integer."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class SeenIndex:
+    """
+    The SeenIndex object remembers the DOI or href of every paper that has been written, so that
+    a later crawl skips these papers before downloading or parsing them.
+
+    Only a 64-bit hash of every key is kept, as the rowid of a SQLite table, so the index stays
+    small and a lookup is a single B-tree search even with millions of papers.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def __getstate__(self) -> dict[str, str]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, str]) -> None:
+        self.__init__(state["path"])
+
+    def __contains__(self, value: str) -> bool:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM seen WHERE hash = ?", (key_hash(paper_key(value)),)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def unseen(self, values: Iterable[Optional[str]]) -> list[bool]:
+        """The unseen method checks many keys at once, e.g. every paper of an issue.
+
+        Args:
+            values (Iterable): the DOIs or hrefs, None for a paper without one
+
+        Returns:
+            a list of bools, True for the keys that are not in the index, and for None
+        """
+        hashes = [None if value is None else key_hash(paper_key(value)) for value in values]
+        found, pending = set(), iter([value for value in hashes if value is not None])
+        with self._lock:
+            while batch := list(islice(pending, 500)):
+                rows = self.connection.execute(
+                    f"SELECT hash FROM seen WHERE hash IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return [value is None or value not in found for value in hashes]
+
+    def add(self, values: Iterable[Optional[str]]) -> None:
+        """The add method records the DOIs or hrefs of written papers in one transaction.
+
+        Args:
+            values (Iterable): the DOIs or hrefs, None for a paper without one
+        """
+        rows = [(key_hash(paper_key(value)),) for value in values if value is not None]
+        with self._lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO seen VALUES (?)", rows)
+
+    def close(self) -> None:
+        """The close method closes the database connection."""
+        with self._lock:
+            self.connection.close()
+
+
+def keep_unseen(
+    seen: Optional[SeenIndex], items: Iterable[Any], keys: Iterable[Optional[str]]
+) -> list[Any]:
+    """The keep_unseen function drops the items whose key is in `seen`.
+
+    Args:
+        seen (SeenIndex): the index, None to keep every item
+        items (Iterable): e.g. the papers of an issue
+        keys (Iterable): the DOI or href of every item
+
+    Returns:
+        a list
+    """
+    items = list(items)
+    if seen is None:
+        return items
+    return [item for item, unseen in zip(items, seen.unseen(keys)) if unseen]
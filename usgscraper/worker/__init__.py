@@ -0,0 +1,13 @@
+from usgscraper.util.lazy import lazy_module
+
+
+__getattr__, __dir__ = lazy_module(
+    __name__,
+    {
+        "Job": ".jobs",
+        "JobQueue": ".jobs",
+        "Worker": ".worker",
+        "work": ".worker",
+    },
+)
+__all__ = ["Job", "JobQueue", "Worker", "work"]
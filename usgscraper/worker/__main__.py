@@ -0,0 +1,58 @@
+import argparse
+from usgscraper import JASA, JPhon, JSLHR
+from .jobs import FAILED, JobQueue
+from .worker import work
+
+
+JOURNALS = {"JASA": JASA, "JSLHR": JSLHR, "JPhon": JPhon}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m usgscraper.worker",
+        description="Share a crawl between worker processes through a queue file.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="queue the volumes of a journal")
+    submit.add_argument("queue", help="the queue file")
+    submit.add_argument("journal", choices=sorted(JOURNALS))
+    submit.add_argument("first", type=int, help="the first volume")
+    submit.add_argument("last", type=int, nargs="?", help="the last volume, included")
+    worker = commands.add_parser("work", help="run workers until the queue is finished")
+    worker.add_argument("queue", help="the queue file")
+    worker.add_argument("--processes", type=int, default=1)
+    worker.add_argument("--concurrency", type=int, default=8)
+    worker.add_argument("--lease", type=float, default=60.0)
+    merge = commands.add_parser("merge", help="write every finished issue")
+    merge.add_argument("queue", help="the queue file")
+    merge.add_argument("--to", choices=["json", "jsonl", "sqlite"], default="jsonl")
+    merge.add_argument("--database", default="papers.sqlite")
+    status = commands.add_parser("status", help="count the jobs and failures")
+    status.add_argument("queue", help="the queue file")
+    retry = commands.add_parser("retry", help="give the failed jobs back to the queue")
+    retry.add_argument("queue", help="the queue file")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        work(args.queue, args.processes, args.concurrency, args.lease)
+        return
+    queue = JobQueue(args.queue)
+    if args.command == "submit":
+        last = args.first if args.last is None else args.last
+        queue.submit(JOURNALS[args.journal].range(args.first, last + 1))
+    elif args.command == "merge":
+        print(f"{queue.merge(args.to, args.database)} issues written")
+        failed = queue.counts()[FAILED]
+        if failed:
+            print(f"{failed} failed jobs, their issues are not written, see status")
+    elif args.command == "retry":
+        print(f"{queue.retry()} jobs queued again")
+    else:
+        print(", ".join(f"{count} {state}" for state, count in queue.counts().items()))
+        for failure in queue.failures():
+            print(failure.journal, failure.volume, failure.issue, failure.url, failure.message)
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Iterator, Optional
+from usgscraper.scraper.crawl import Crawl, Failure, IssueResult
+from usgscraper.util.database import PaperDatabase
+
+
+VOLUME = "volume"
+ISSUE = "issue"
+ARTICLE = "article"
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    journal TEXT NOT NULL,
+    volume INTEGER NOT NULL,
+    issue INTEGER,
+    scraper BLOB NOT NULL,
+    article TEXT,
+    state TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_until);
+CREATE INDEX IF NOT EXISTS jobs_issue ON jobs (journal, volume, issue);
+CREATE TABLE IF NOT EXISTS results (
+    job INTEGER PRIMARY KEY,
+    papers TEXT NOT NULL,
+    keys TEXT NOT NULL,
+    failures TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS merged (
+    journal TEXT NOT NULL,
+    volume INTEGER NOT NULL,
+    issue INTEGER,
+    UNIQUE (journal, volume, issue)
+);
+"""
+
+
+# --------------------------------------------------------------------
+# helper class
+
+
+@dataclass
+class Job:
+    """
+    The Job object is a unit of work of a JobQueue: a volume to split into issues, an issue to
+    scrape, or for JPhon, whose articles are pages of their own, a single article.
+    """
+
+    id: int
+    kind: str
+    scraper: Any
+    issue: Optional[int] = None
+    article: Optional[dict] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind} {self.scraper.__class__.__name__} {self.scraper.volume} {self.issue}"
+
+
+# --------------------------------------------------------------------
+# queue
+
+
+class JobQueue:
+    """
+    The JobQueue object shares the work of a crawl between worker processes, on one host or on
+    many hosts that see the same file, e.g. on NFS with working locks.
+
+    A worker leases jobs for `lease` seconds and renews the lease with heartbeats while it works,
+    so the jobs of a worker that died are leased again once their lease ran out. A job whose
+    lease ran out or that failed `max_attempts` times is marked failed. The results of the jobs
+    are kept in the queue until `merge` writes them, issue by issue.
+
+    The scrapers are pickled into the queue, so their filter must be picklable, e.g. a TermFilter.
+    """
+
+    def __init__(self, path: str, lease: float = 60.0, max_attempts: int = 3) -> None:
+        self.path = os.path.expanduser(path)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.connection.executescript(SCHEMA)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self.path, "lease": self.lease, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def execute(self, query: str, parameters: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self.connection.execute(query, tuple(parameters)).fetchall()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """The transaction method runs the block of a `with` statement in one transaction that holds
+        the write lock of the file from its start, so that two workers never lease the same job."""
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def insert(
+        self, kind: str, scraper: Any, issue: Optional[int] = None, article: Optional[dict] = None
+    ) -> tuple[str, tuple]:
+        """The insert method creates the query that adds a job, unless the same job is already queued."""
+        journal = scraper.__class__.__name__
+        key = f"{kind}:{journal}:{scraper.volume}:{issue}:{article['href'] if article else ''}"
+        return (
+            "INSERT OR IGNORE INTO jobs (key, kind, journal, volume, issue, scraper, article, state) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                kind,
+                journal,
+                scraper.volume,
+                issue,
+                pickle.dumps(scraper),
+                json.dumps(article) if article else None,
+                PENDING,
+            ),
+        )
+
+    def submit(self, scrapers: Iterable[Any]) -> None:
+        """The submit method adds a volume job per scraper, e.g. of `JASA.range(140, 150)`.
+        A volume that is already in the queue is not added again.
+
+        Args:
+            scrapers (Iterable): JASA, JSLHR or JPhon objects, or a Crawl
+        """
+        if isinstance(scrapers, Crawl):
+            scrapers = scrapers.scrapers
+        with self.transaction() as connection:
+            for scraper in scrapers:
+                connection.execute(*self.insert(VOLUME, scraper))
+
+    def acquire(self, worker: str, count: int = 1) -> list[Job]:
+        """The acquire method leases up to `count` pending jobs, or jobs whose lease ran out.
+
+        Args:
+            worker (str): the name of the worker
+            count (int): the maximum number of jobs
+
+        Returns:
+            a list of Job objects, empty if no job is available now
+        """
+        now = time.time()
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = ?, error = 'lease expired' "
+                "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, LEASED, now, self.max_attempts),
+            )
+            rows = connection.execute(
+                "SELECT id, kind, scraper, issue, article FROM jobs "
+                "WHERE state = ? OR (state = ? AND lease_until < ?) ORDER BY id LIMIT ?",
+                (PENDING, LEASED, now, count),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                [(LEASED, worker, now + self.lease, row[0]) for row in rows],
+            )
+        return [
+            Job(
+                id=id,
+                kind=kind,
+                scraper=pickle.loads(scraper),
+                issue=issue,
+                article=json.loads(article) if article else None,
+            )
+            for id, kind, scraper, issue, article in rows
+        ]
+
+    def heartbeat(self, worker: str, jobs: Iterable[Job]) -> None:
+        """The heartbeat method renews the leases that `worker` still holds on `jobs`."""
+        until = time.time() + self.lease
+        with self.transaction() as connection:
+            connection.executemany(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = ?",
+                [(until, job.id, worker, LEASED) for job in jobs],
+            )
+
+    def complete(
+        self,
+        worker: str,
+        job: Job,
+        result: Optional[IssueResult] = None,
+        children: Iterable[tuple] = (),
+    ) -> None:
+        """The complete method stores the result and the new jobs of `job` and marks it done.
+        Nothing is stored if the lease of `worker` ran out and another worker took the job.
+
+        Args:
+            worker (str): the name of the worker
+            job (Job): the leased job
+            result (IssueResult): the papers and failures of an issue or article job
+            children (Iterable): the new jobs, as returned by `insert`
+        """
+        with self.transaction() as connection:
+            leased = connection.execute(
+                "UPDATE jobs SET state = ?, error = NULL WHERE id = ? AND worker = ? AND state = ?",
+                (DONE, job.id, worker, LEASED),
+            ).rowcount
+            if not leased:
+                return
+            for query, parameters in children:
+                connection.execute(query, parameters)
+            if result is not None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    (
+                        job.id,
+                        json.dumps(result.papers, ensure_ascii=False),
+                        json.dumps(result.keys),
+                        json.dumps([asdict(failure) for failure in result.failures]),
+                    ),
+                )
+
+    def fail(self, worker: str, job: Job, error: Exception) -> None:
+        """The fail method gives `job` back to the queue, or marks it failed after `max_attempts`."""
+        self.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ? "
+            "WHERE id = ? AND worker = ? AND state = ?",
+            (self.max_attempts, FAILED, PENDING, repr(error), job.id, worker, LEASED),
+        )
+
+    def retry(self) -> int:
+        """The retry method gives every failed job back to the queue with new attempts, e.g. once
+        the site is reachable again.
+
+        Returns:
+            an int, the number of jobs
+        """
+        with self.transaction() as connection:
+            return connection.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, attempts = 0, error = NULL WHERE state = ?",
+                (PENDING, FAILED),
+            ).rowcount
+
+    def counts(self) -> dict[str, int]:
+        """The counts method counts the jobs in every state.
+
+        Returns:
+            a dict: {'pending': 12, 'leased': 8, 'done': 140, 'failed': 0}
+        """
+        rows = self.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state")
+        return {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+    def finished(self) -> bool:
+        """The finished method checks whether no job is pending or leased anymore."""
+        counts = self.counts()
+        return not counts[PENDING] and not counts[LEASED]
+
+    def failures(self) -> list[Failure]:
+        """The failures method lists the failures of every result and every failed job.
+
+        Returns:
+            a list of Failure objects
+        """
+        failures = [
+            Failure(**failure)
+            for (row,) in self.execute("SELECT failures FROM results ORDER BY job")
+            for failure in json.loads(row)
+        ]
+        for journal, volume, issue, article, error in self.execute(
+            "SELECT journal, volume, issue, article, error FROM jobs WHERE state = ? ORDER BY id",
+            (FAILED,),
+        ):
+            href = json.loads(article)["href"] if article else None
+            failures.append(Failure(journal, volume, issue, href, "JobFailed", error or ""))
+        return failures
+
+    def merge(self, to: str = "jsonl", path: str = "papers.sqlite", **kwargs) -> int:
+        """The merge method writes every issue whose jobs are all done, in the order of the papers
+        of the issue, and marks it written in the manifest and seen index of its scraper. An issue
+        is written once, so merge can run again while the workers go on. An issue with a failed
+        job is not written: it is listed by `failures`, and merged once `retry` and the workers
+        completed it.
+
+        Args:
+            to (str): `json`, `jsonl` or `sqlite`
+            path (str): the database file if `to` is `sqlite`
+            kwargs: passed to `jsonlify` or `PaperDatabase.insert`, e.g. `compress`
+
+        Returns:
+            an int, the number of issues written
+        """
+        issues = self.execute(
+            "SELECT journal, volume, issue, MIN(scraper) FROM jobs "
+            "WHERE kind != ? AND NOT EXISTS ("
+            "    SELECT 1 FROM merged WHERE merged.journal = jobs.journal "
+            "    AND merged.volume = jobs.volume AND merged.issue IS jobs.issue) "
+            "GROUP BY journal, volume, issue "
+            "HAVING SUM(state != ?) = 0 ORDER BY journal, volume, issue",
+            (VOLUME, DONE),
+        )
+        database = PaperDatabase(path) if to == "sqlite" else None
+        try:
+            for journal, volume, issue, scraper in issues:
+                papers, keys = [], []
+                for row_papers, row_keys in self.execute(
+                    "SELECT papers, keys FROM results JOIN jobs ON jobs.id = results.job "
+                    "WHERE journal = ? AND volume = ? AND issue IS ? ORDER BY job",
+                    (journal, volume, issue),
+                ):
+                    papers.extend(json.loads(row_papers))
+                    keys.extend(json.loads(row_keys))
+                result = IssueResult(journal, volume, issue, papers, keys=keys)
+                Crawl([pickle.loads(scraper)]).write(result, to, database, **kwargs)
+                self.execute("INSERT OR IGNORE INTO merged VALUES (?, ?, ?)", (journal, volume, issue))
+        finally:
+            if database is not None:
+                database.close()
+        return len(issues)
+
+    def close(self) -> None:
+        """The close method closes the database connection."""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,134 @@
+import os
+import socket
+import asyncio
+import multiprocessing
+from typing import Optional
+from usgscraper.scraper.crawl import IssueResult
+from usgscraper.transport import get_transport
+from .jobs import ARTICLE, ISSUE, VOLUME, Job, JobQueue
+
+
+class Worker:
+    """
+    The Worker object runs the jobs of a JobQueue on a single event loop, up to `concurrency`
+    jobs at once, until no job is pending or leased anymore.
+
+    A volume job adds a job per issue of the volume, an issue job of JPhon adds a job per
+    article of the issue, and the other issue and article jobs store their papers in the queue.
+    A job that raises is given back to the queue, which marks it failed after `max_attempts`.
+    The leases of the running jobs are renewed every third of the lease. The queue is only
+    used from the threads of the default executor, so a wait for the lock of the queue file
+    never holds up the fetches of the running jobs.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        name: Optional[str] = None,
+        concurrency: int = 8,
+        poll_interval: float = 0.25,
+    ) -> None:
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.running: dict[asyncio.Task, Job] = {}
+
+    async def run_job(self, job: Job) -> None:
+        """The run_job method runs a single job and stores its outcome in the queue.
+
+        Args:
+            job (Job): the leased job
+        """
+        scraper = job.scraper
+        try:
+            if job.kind == VOLUME:
+                issues = await scraper.discover_issues()
+                children = [self.queue.insert(ISSUE, scraper, issue) for issue in issues]
+                await asyncio.to_thread(self.queue.complete, self.name, job, children=children)
+            elif job.kind == ISSUE and hasattr(scraper, "list_articles"):
+                articles = await scraper.list_articles(job.issue) or []
+                children = [
+                    self.queue.insert(ARTICLE, scraper, job.issue, article) for article in articles
+                ]
+                result = IssueResult(scraper.__class__.__name__, scraper.volume, job.issue, [])
+                await asyncio.to_thread(self.queue.complete, self.name, job, result, children)
+            elif job.kind == ISSUE:
+                # an error reaches `fail`, so the issue is retried until it runs out of attempts
+                result = await scraper.extract_issue(job.issue)
+                await asyncio.to_thread(self.queue.complete, self.name, job, result)
+            else:
+                result = await scraper.extract_articles([job.article], job.issue)
+                if result.failures:
+                    failure = result.failures[0]
+                    raise RuntimeError(f"{failure.error}: {failure.message}")
+                await asyncio.to_thread(self.queue.complete, self.name, job, result)
+        except Exception as error:
+            await asyncio.to_thread(self.queue.fail, self.name, job, error)
+
+    async def heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease / 3)
+            await asyncio.to_thread(self.queue.heartbeat, self.name, list(self.running.values()))
+
+    async def arun(self) -> None:
+        """The arun method runs jobs on the running event loop until the queue is finished."""
+        heartbeat = asyncio.create_task(self.heartbeat())
+        try:
+            while True:
+                jobs = await asyncio.to_thread(
+                    self.queue.acquire, self.name, self.concurrency - len(self.running)
+                )
+                for job in jobs:
+                    self.running[asyncio.create_task(self.run_job(job))] = job
+                if not self.running:
+                    if await asyncio.to_thread(self.queue.finished):
+                        return
+                    # the remaining jobs are leased by other workers, and may add new jobs
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                done, _ = await asyncio.wait(
+                    self.running,
+                    timeout=self.poll_interval if len(self.running) < self.concurrency else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    del self.running[task]
+        finally:
+            heartbeat.cancel()
+            for task in self.running:
+                task.cancel()
+
+    def run(self) -> None:
+        """The run method runs jobs on a private event loop until the queue is finished."""
+        get_transport().run(self.arun())
+
+
+def start_worker(queue: JobQueue, concurrency: int) -> None:
+    Worker(queue, concurrency=concurrency).run()
+
+
+def work(path: str, processes: int = 1, concurrency: int = 8, lease: float = 60.0) -> None:
+    """The work function runs `processes` workers on the queue at `path` and waits for them.
+    Run it on every host that shares the queue to spread a crawl over many hosts.
+
+    Args:
+        path (str): the queue file
+        processes (int): the number of worker processes
+        concurrency (int): the number of jobs run at once by every worker
+        lease (float): the lease of a job in seconds
+    """
+    queue = JobQueue(path, lease=lease)
+    if processes == 1:
+        Worker(queue, concurrency=concurrency).run()
+        return
+    # spawned, so that a worker never inherits the pools and sessions of this process
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=start_worker, args=(queue, concurrency))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()